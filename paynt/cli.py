@@ -4,6 +4,7 @@ from . import version
 import paynt.utils.timer
 import paynt.utils.version_check
 import paynt.parser.sketch
+import paynt.parser.quotient_cache
 
 import paynt.quotient.quotient
 import paynt.quotient.pomdp
@@ -13,7 +14,13 @@ import paynt.quotient.storm_pomdp_control
 
 import paynt.synthesizer.synthesizer
 import paynt.synthesizer.synthesizer_cegis
+import paynt.synthesizer.synthesizer_cegis_multicore
+import paynt.synthesizer.synthesizer_ar
+import paynt.synthesizer.synthesizer_distributed_ar
+import paynt.synthesizer.checkpoint
 import paynt.synthesizer.policy_tree
+import paynt.synthesizer.policy_tree_multicore
+import paynt.synthesizer.synthesizer_multicore_ar
 
 import paynt.dt
 
@@ -67,19 +74,45 @@ def setup_logger(log_path = None):
     help="use exact synthesis (very limited at the moment)")
 @click.option("--timeout", type=int,
     help="timeout (s)")
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+    help="path prefix of files to which the state of AR or policy tree synthesis is periodically saved, each synthesis run uses its own file suffixed by a digest of its task")
+@click.option("--checkpoint-period", type=int, default=300, show_default=True,
+    help="period (s) of saving the checkpoint")
+@click.option("--resume", is_flag=True, default=False,
+    help="continue the synthesis from the states saved in the --checkpoint files")
 
 @click.option("--export",
     type=click.Choice(['jani', 'drn', 'pomdp']),
     help="export the model to specified format and abort")
+@click.option("--quotient-cache", type=click.Path(file_okay=False), default=None,
+    help="directory in which quotients built from PRISM sketches with holes are cached across runs")
 
 @click.option("--method",
-    type=click.Choice(['onebyone', 'ar', 'cegis', 'hybrid', 'ar_multicore']),
+    type=click.Choice(['onebyone', 'ar', 'cegis', 'cegis_multicore', 'hybrid', 'ar_multicore', 'ar_distributed', 'portfolio']),
     default="ar", show_default=True,
     help="synthesis method"
     )
+@click.option("--num-workers", type=int, default=None,
+    help="number of worker processes of multicore AR, CEGIS and policy tree synthesis (default: number of CPUs)")
+@click.option("--frontier",
+    type=click.Choice(['dfs', 'best_bound', 'largest', 'visits']),
+    default="dfs", show_default=True,
+    help="order in which AR explores undecided families: depth-first, best parent bound first, largest family first, or largest expected-visit-weighted splitter score first")
+@click.option("--distributed-address", type=click.STRING, default="localhost:6000", show_default=True,
+    help="host:port on which the coordinator of distributed AR listens and to which its workers connect")
+@click.option("--distributed-authkey", type=click.STRING, default=None,
+    help="key authenticating workers of distributed AR; required unless communicating over a loopback interface, where a default key is used (the coordinator generates a random key if none is given)")
+@click.option("--distributed-worker", is_flag=True, default=False,
+    help="run as a worker of distributed AR: connect to the coordinator and solve the families it sends")
 
 @click.option("--disable-expected-visits", is_flag=True, default=False,
     help="do not compute expected visits for the splitting heuristic")
+@click.option("--incremental-restriction", is_flag=True, default=False,
+    help="derive MDPs of subfamilies from the MDP of their parent (faster, but parent MDPs are kept in memory)")
+@click.option("--dtmc-cache-size", type=int, default=256, show_default=True,
+    help="memory budget (MB) for caching DTMCs of hole assignments, 0 disables the cache")
+@click.option("--double-check-in-place", is_flag=True, default=False,
+    help="double-check assignments of consistent schedulers directly on the quotient instead of building their DTMCs")
 
 @click.option("--fsc-synthesis", is_flag=True, default=False,
     help="enable incremental synthesis of FSCs for a (Dec-)POMDP")
@@ -113,6 +146,8 @@ def setup_logger(log_path = None):
 
 @click.option("--export-synthesis", type=click.Path(), default=None,
     help="base filename to output synthesis result")
+@click.option("--export-metrics", type=click.Path(), default=None,
+    help="file to which synthesis metrics are periodically appended as JSON lines")
 
 @click.option("--mdp-discard-unreachable-choices", is_flag=True, default=False,
     help="if set, unreachable choices will be discarded from the splitting scheduler")
@@ -136,21 +171,24 @@ def setup_logger(log_path = None):
 )
 @click.option("--profiling", is_flag=True, default=False,
     help="run profiling")
+@click.option("--profile-phases", is_flag=True, default=False,
+    help="if set, time spent in fine-grained synthesis phases will be reported in the summary")
 
 def paynt_run(
     project, sketch, props, relative_error, optimum_threshold, precision, exact, timeout,
-    export,
-    method,
-    disable_expected_visits,
+    checkpoint, checkpoint_period, resume,
+    export, quotient_cache,
+    method, num_workers, frontier, distributed_address, distributed_authkey, distributed_worker,
+    disable_expected_visits, incremental_restriction, dtmc_cache_size, double_check_in_place,
     fsc_synthesis, fsc_memory_size, posterior_aware,
     storm_pomdp, iterative_storm, get_storm_result, storm_options, prune_storm,
     use_storm_cutoffs, unfold_strategy_storm,
-    export_synthesis,
+    export_synthesis, export_metrics,
     mdp_discard_unreachable_choices,
     tree_depth, tree_enumeration, tree_map_scheduler, add_dont_care_action,
     constraint_bound,
     ce_generator,
-    profiling
+    profiling, profile_phases
 ):
 
     profiler = None
@@ -158,14 +196,38 @@ def paynt_run(
         profiler = cProfile.Profile()
         profiler.enable()
     paynt.utils.timer.GlobalTimer.start(timeout)
+    if resume and checkpoint is None:
+        raise click.UsageError("--resume requires --checkpoint")
 
     logger.info("This is Paynt version {}.".format(version()))
     paynt.utils.version_check.check_stormpy_compatibility()
 
     # set CLI parameters
+    paynt.parser.quotient_cache.QuotientCache.cache_dir = quotient_cache
+    paynt.synthesizer.checkpoint.Checkpoint.path = checkpoint
+    paynt.synthesizer.checkpoint.Checkpoint.period_seconds = checkpoint_period
+    paynt.synthesizer.checkpoint.Checkpoint.resume = resume
     paynt.quotient.quotient.Quotient.disable_expected_visits = disable_expected_visits
+    paynt.quotient.quotient.Quotient.incremental_restriction = incremental_restriction
+    paynt.quotient.quotient.Quotient.dtmc_cache_size_mb = dtmc_cache_size
     paynt.synthesizer.synthesizer.Synthesizer.export_synthesis_filename_base = export_synthesis
+    paynt.synthesizer.statistic.Statistic.metrics_export_path = export_metrics
+    paynt.utils.timer.PhaseTimer.fine_grained = profile_phases
     paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS.conflict_generator_type = ce_generator
+    paynt.synthesizer.synthesizer_ar.SynthesizerAR.frontier_strategy = frontier
+    paynt.synthesizer.synthesizer_ar.SynthesizerAR.double_check_in_place = double_check_in_place
+    paynt.synthesizer.synthesizer_multicore_ar.SynthesizerMultiCoreAR.num_workers = num_workers
+    paynt.synthesizer.policy_tree_multicore.SynthesizerPolicyTreeMultiCore.num_workers = num_workers
+    paynt.synthesizer.synthesizer_cegis_multicore.SynthesizerCEGISMultiCore.num_workers = num_workers
+    host,_,port = distributed_address.rpartition(":")
+    paynt.synthesizer.synthesizer_distributed_ar.SynthesizerDistributedAR.address = (host, int(port))
+    if not paynt.synthesizer.synthesizer_distributed_ar.is_loopback((host, int(port))):
+        if distributed_authkey is not None and distributed_authkey.encode() == paynt.synthesizer.synthesizer_distributed_ar.DEFAULT_AUTHKEY:
+            raise click.UsageError("the default --distributed-authkey may be used only on a loopback interface")
+        if distributed_worker and distributed_authkey is None:
+            raise click.UsageError("--distributed-worker requires --distributed-authkey outside of a loopback interface")
+    if distributed_authkey is not None:
+        paynt.synthesizer.synthesizer_distributed_ar.SynthesizerDistributedAR.authkey = distributed_authkey.encode()
     paynt.quotient.pomdp.PomdpQuotient.initial_memory_size = fsc_memory_size
     paynt.quotient.pomdp.PomdpQuotient.posterior_aware = posterior_aware
     paynt.quotient.decpomdp.DecPomdpQuotient.initial_memory_size = fsc_memory_size
@@ -191,8 +253,11 @@ def paynt_run(
     sketch_path = os.path.join(project, sketch)
     properties_path = os.path.join(project, props)
     quotient = paynt.parser.sketch.Sketch.load_sketch(sketch_path, properties_path, export, relative_error, precision, constraint_bound, exact)
-    synthesizer = paynt.synthesizer.synthesizer.Synthesizer.choose_synthesizer(quotient, method, fsc_synthesis, storm_control)
-    synthesizer.run(optimum_threshold)
+    if distributed_worker:
+        paynt.synthesizer.synthesizer_distributed_ar.run_worker(quotient)
+    else:
+        synthesizer = paynt.synthesizer.synthesizer.Synthesizer.choose_synthesizer(quotient, method, fsc_synthesis, storm_control)
+        synthesizer.run(optimum_threshold)
 
     if profiling:
         profiler.disable()
@@ -102,7 +102,8 @@ class DtSynthesizer(paynt.synthesizer.synthesizer_ar.SynthesizerAR):
 
     def verify_family(self, family):
         self.num_families_considered += 1
-        self.quotient.build(family)
+        with paynt.utils.timer.PhaseTimer.phase("build"):
+            self.quotient.build(family)
 
         self.stat.iteration(family.mdp)
         if family.parent_info is not None:
@@ -120,10 +121,12 @@ class DtSynthesizer(paynt.synthesizer.synthesizer_ar.SynthesizerAR):
                 return
 
         self.num_families_model_checked += 1
-        self.check_specification(family)
+        with paynt.utils.timer.PhaseTimer.phase("model check"):
+            self.check_specification(family)
         if not family.analysis_result.can_improve:
             return
-        self.harmonize_inconsistent_scheduler(family)
+        with paynt.utils.timer.PhaseTimer.phase("harmonization"):
+            self.harmonize_inconsistent_scheduler(family)
 
     def compute_normalized_value(self, value, opt, random):
         return (value-random)/(opt-random) if opt-random != 0 else 1.0
@@ -22,6 +22,32 @@ class ParentInfo():
         self.selected_choices = None
         self.constraint_indices = None
         self.refinement_depth = None
+        # hole that was split and the MDP of the parent, used to derive MDPs of subfamilies incrementally; the MDP is
+        # released once all subfamilies were built
+        self.splitter = None
+        self.mdp = None
+        self.num_unbuilt_subfamilies = None
+        # for each (property,alt) pair, the check result of the parent MDP, used to warm-start model checking of
+        # subfamilies; results are associated with the states of the parent MDP given by the state map, the index of
+        # quotient states in the parent MDP is built once needed
+        self.result_hints = None
+        self.result_hints_state_map = None
+        self.result_hints_state_index = None
+        # score of the hole that was split, used to prioritize subfamilies
+        self.splitter_score = None
+        # primary value of the optimality property for the parent, bounds the values achievable in subfamilies
+        self.optimality_bound = None
+
+    def release_subfamily(self):
+        '''
+        Record that a subfamily no longer needs the MDP of the parent: its MDP was derived from it, or the subfamily was
+        pruned or packed. The MDP is released once no subfamily needs it.
+        '''
+        if self.mdp is None:
+            return
+        self.num_unbuilt_subfamilies -= 1
+        if self.num_unbuilt_subfamilies == 0:
+            self.mdp = None
 
 
 class Family:
@@ -125,6 +151,21 @@ class Family:
             subfamily.hole_set_options(hole,options)
         return subfamily
 
+    def pack(self):
+        ''' Packed bitset representation of hole options (without hole names and option labels). '''
+        return self.family.pack()
+
+    def assume_packed_options_copy(self, packed):
+        '''
+        Create a copy and assume hole options described by a packed representation obtained via Family.pack().
+        @note this does not check whether the packed options are actually suboptions of this family.
+        '''
+        subfamily = Family()
+        subfamily.family = payntbind.synthesis.Family.unpack(packed)
+        subfamily.hole_to_name = self.hole_to_name
+        subfamily.hole_to_option_labels = self.hole_to_option_labels
+        return subfamily
+
     def split(self, splitter, suboptions):
         return [self.assume_hole_options_copy(splitter,options) for options in suboptions]
 
@@ -159,6 +200,9 @@ class Family:
         pi.refinement_depth = self.refinement_depth
         cr = self.analysis_result.constraints_result
         pi.constraint_indices = cr.undecided_constraints if cr is not None else []
+        opt = self.analysis_result.optimality_result
+        if opt is not None and opt.primary is not None:
+            pi.optimality_bound = opt.primary.value
         return pi
 
     def encode(self, smt_solver):
@@ -1,3 +1,5 @@
+import payntbind
+
 import sys
 import z3
 
@@ -11,6 +13,12 @@ logger = logging.getLogger(__name__)
 
 
 class FamilyEncoding():
+    '''
+    Encoding of a family via an activation literal implying that each hole takes one of the options of the family.
+    The implication is asserted in the solver once, the family is then considered by passing its literal as an
+    assumption to the solver. Since the solver is never reset, conflicts and clauses learned within one family are
+    kept when the search moves to another one.
+    '''
 
     def __init__(self, smt_solver, family):
 
@@ -21,9 +29,15 @@ class FamilyEncoding():
         self.hole_clauses = None
         # SMT formula describing the family
         self.encoding = None
+        # activation literal of the encoding (index of the family encoding if the native solver is used)
+        self.literal = None
         # set to False as soon as pick_assignment returns None
         self.has_assignments = True
 
+        if smt_solver.use_native:
+            self.literal = smt_solver.solver.addFamily(family.family)
+            return
+
         hole_clauses = []
         for hole in range(family.num_holes):
             all_clauses = smt_solver.solver_clauses[hole]
@@ -34,7 +48,7 @@ class FamilyEncoding():
                 if smt_solver.use_python_z3:
                     or_clause = z3.Or(clauses)
                 elif smt_solver.use_cvc:
-                    smt_solver = smt_solver.solver.mkTerm(pycvc5.Kind.Or, clauses)
+                    or_clause = smt_solver.solver.mkTerm(pycvc5.Kind.Or, clauses)
                 else:
                     pass
             hole_clauses.append(or_clause)
@@ -49,48 +63,118 @@ class FamilyEncoding():
             else:
                 pass
 
+        family_index = smt_solver.num_families
+        if smt_solver.use_python_z3:
+            literal = z3.Bool(f"family_{family_index}")
+            smt_solver.solver.add(z3.Implies(literal, encoding))
+        elif smt_solver.use_cvc:
+            literal = smt_solver.solver.mkConst(smt_solver.solver.getBooleanSort(), f"family_{family_index}")
+            smt_solver.solver.assertFormula(smt_solver.solver.mkTerm(pycvc5.Kind.Implies, literal, encoding))
+        smt_solver.num_families += 1
+
         self.hole_clauses = hole_clauses
         self.encoding = encoding
+        self.literal = literal
 
 
-    def pick_assignment(self):
-        
-        if not self.has_assignments:
-            return None
-        
+    def check_assumptions(self, assumptions):
+        ''' :return for each hole, its option in a model satisfying the assumptions, or None if there is no model '''
         if self.smt_solver.use_python_z3:
-            solver_result = self.smt_solver.solver.check(self.encoding)
+            solver_result = self.smt_solver.solver.check(*assumptions)
             if solver_result == z3.unsat:
-                self.has_assignments = False
                 return None
             sat_model = self.smt_solver.solver.model()
-            hole_options = []
-            for hole_index,var in enumerate(self.smt_solver.solver_vars):
-                option = sat_model[var].as_long()
-                hole_options.append([option])
+            return [sat_model[var].as_long() for var in self.smt_solver.solver_vars]
         elif self.smt_solver.use_cvc:
-            solver_result = self.smt_solver.solver.checkSatAssuming(self.encoding)
+            solver_result = self.smt_solver.solver.checkSatAssuming(*assumptions)
             if solver_result.isUnsat():
-                self.has_assignments = False
                 return None
-            hole_options = []
-            for hole_index,var in enumerate(self.smt_solver.solver_vars):
-                option = self.smt_solver.solver.getValue(var).getIntegerValue()
-                hole_options.append([option])
+            return [self.smt_solver.solver.getValue(var).getIntegerValue() for var in self.smt_solver.solver_vars]
+        else:
+            pass
+
+    def pick_assignment(self):
+        
+        if not self.has_assignments:
+            return None
+        
+        if self.smt_solver.use_native:
+            hole_to_option = self.smt_solver.solver.pickAssignment(self.literal)
         else:
-            pass            
+            hole_to_option = self.check_assumptions([self.literal])
+        if hole_to_option is None:
+            self.has_assignments = False
+            return None
         
+        hole_options = [[option] for option in hole_to_option]
         assignment = self.family.assume_options_copy(hole_options)
         return assignment
 
+    def pick_assignments(self, num_assignments):
+        '''
+        Pick distinct unexplored assignments. Picked assignments are blocked by clauses guarded by a fresh literal that
+        is disabled afterwards, the assignments are thus excluded only by the conflicts constructed for them.
+        :return a list of at most num_assignments assignments, empty if no assignment remains
+        '''
+        if not self.has_assignments:
+            return []
+
+        smt_solver = self.smt_solver
+        if smt_solver.use_native:
+            hole_to_option_list = smt_solver.solver.pickAssignments(self.literal, num_assignments)
+        else:
+            literal_name = f"batch_{smt_solver.num_batches}"
+            smt_solver.num_batches += 1
+            if smt_solver.use_python_z3:
+                blocking_literal = z3.Bool(literal_name)
+            elif smt_solver.use_cvc:
+                blocking_literal = smt_solver.solver.mkConst(smt_solver.solver.getBooleanSort(), literal_name)
+            hole_to_option_list = []
+            while len(hole_to_option_list) < num_assignments:
+                hole_to_option = self.check_assumptions([self.literal, blocking_literal])
+                if hole_to_option is None:
+                    break
+                hole_to_option_list.append(hole_to_option)
+                clauses = [smt_solver.solver_clauses[hole][option] for hole,option in enumerate(hole_to_option)]
+                if smt_solver.use_python_z3:
+                    smt_solver.solver.add(z3.Implies(blocking_literal, z3.Not(z3.And(clauses))))
+                elif smt_solver.use_cvc:
+                    block = smt_solver.solver.mkTerm(pycvc5.Kind.And, clauses).notTerm() if len(clauses) > 1 else clauses[0].notTerm()
+                    smt_solver.solver.assertFormula(smt_solver.solver.mkTerm(pycvc5.Kind.Implies, blocking_literal, block))
+            if smt_solver.use_python_z3:
+                smt_solver.solver.add(z3.Not(blocking_literal))
+            elif smt_solver.use_cvc:
+                smt_solver.solver.assertFormula(blocking_literal.notTerm())
+
+        if len(hole_to_option_list) == 0:
+            self.has_assignments = False
+        return [
+            self.family.assume_options_copy([[option] for option in hole_to_option])
+            for hole_to_option in hole_to_option_list
+        ]
+
+    def release(self):
+        ''' Disable the encoding once the family is no longer explored, allowing the solver to drop its clauses. '''
+        if self.smt_solver.use_native:
+            self.smt_solver.solver.releaseFamily(self.literal)
+        elif self.smt_solver.use_python_z3:
+            self.smt_solver.solver.add(z3.Not(self.literal))
+        elif self.smt_solver.use_cvc:
+            self.smt_solver.solver.assertFormula(self.literal.notTerm())
+        self.has_assignments = False
+
         
 class SmtSolver():
 
+    # if True, the native Z3 solver of payntbind is used
+    use_native_solver = True
+
     def __init__(self, family):
 
         # SMT solver containing description of the unexplored design space
         self.solver = None
         # SMT solver choice
+        self.use_native = False
         self.use_python_z3 = False
         self.use_cvc = False
     
@@ -100,11 +184,17 @@ class SmtSolver():
         #   where h is the corresponding solver variable
         self.solver_clauses = None
 
-        # current depth of push/pop solving
-        self.solver_depth = 0
+        # number of family encodings and of batches of picked assignments, used to name their literals
+        self.num_families = 0
+        self.num_batches = 0
 
         # choose solver
-        if "pycvc5" in sys.modules:
+        if SmtSolver.use_native_solver:
+            logger.debug("using native Z3 for SMT solving.")
+            self.use_native = True
+            self.solver = payntbind.synthesis.FamilySmtSolver(family.family)
+            return
+        elif "pycvc5" in sys.modules:
             logger.debug("using CVC5 for SMT solving.")
             self.use_cvc = True
         else:
@@ -156,6 +246,14 @@ class SmtSolver():
         family.encode(self)
         return family.encoding.pick_assignment()
 
+    def pick_assignments(self, family, num_assignments):
+        '''
+        :return a list of at most num_assignments distinct unexplored hole assignments from the family, empty if no
+            instance remains
+        '''
+        family.encode(self)
+        return family.encoding.pick_assignments(num_assignments)
+
     def pick_assignment_priority(self, family, priority_subfamily):
 
         if priority_subfamily is None:
@@ -189,11 +287,18 @@ class SmtSolver():
         :param conflict indices of relevant holes in the corresponding counterexample
         :return estimate of pruned assignments
         '''
-        assert family.encoding is not None
-        
         if family.encoding is None:
             family.encoding = FamilyEncoding(self, family)
 
+        if self.use_native:
+            pruning_estimate = 1
+            for hole in range(family.num_holes):
+                if hole not in conflict:
+                    pruning_estimate *= family.hole_num_options(hole)
+            hole_to_option = [assignment.hole_options(hole)[0] for hole in range(family.num_holes)]
+            self.solver.excludeConflict(family.family, hole_to_option, list(conflict))
+            return pruning_estimate
+
         pruning_estimate = 1
         counterexample_clauses = []
         for hole,var in enumerate(self.solver_vars):
@@ -225,19 +330,7 @@ class SmtSolver():
         return pruning_estimate
 
 
-    def level(self, refinement_depth):
-        ''' Reset solver depth level to correspond to refinement level. '''
-
-        if refinement_depth == 0:
-            # fresh family, nothing to do
-            return
-
-        # reset to the scope of the parent (refinement_depth - 1)
-        while self.solver_depth >= refinement_depth:
-            self.solver.pop()
-            self.solver_depth -= 1
-
-        # create new scope
-        self.solver.push()
-        self.solver_depth += 1
-
+    def release(self, family):
+        ''' Disable the encoding of a family that will not be explored anymore. '''
+        if family.encoding is not None:
+            family.encoding.release()
@@ -19,6 +19,8 @@ class Mdp:
     def __init__(self, model):
         # Mdp.assert_no_overlapping_guards(model)
         self.model = model
+        # if not None, a dictionary (property,alt) -> check result of already analyzed properties
+        self.check_results = None
         if len(model.initial_states) > 1:
             logger.warning("WARNING: obtained model with multiple initial states")
 
@@ -34,9 +36,20 @@ class Mdp:
     def initial_state(self):
         return self.model.initial_states[0]
 
-    def model_check_property(self, prop, alt=False):
-        formula = prop.formula if not alt else prop.formula_alt
-        result = paynt.verification.property.Property.model_check(self.model,formula)
+    def memoize_results(self):
+        ''' Remember model checking results such that each property is analyzed only once. '''
+        if self.check_results is None:
+            self.check_results = {}
+
+    def model_check_property(self, prop, alt=False, result_hint=None):
+        result = None
+        if self.check_results is not None:
+            result = self.check_results.get((prop,alt))
+        if result is None:
+            formula = prop.formula if not alt else prop.formula_alt
+            result = paynt.verification.property.Property.model_check(self.model,formula,result_hint)
+            if self.check_results is not None:
+                self.check_results[(prop,alt)] = result
         value = result.at(self.initial_state)
         return paynt.verification.property_result.PropertyResult(prop, result, value)
 
@@ -66,6 +79,14 @@ class SubMdp(Mdp):
         self.quotient_choice_map = quotient_choice_map
         self.quotient_state_map = quotient_state_map
 
+    def values_from_parent(self, parent_result, parent_state_index):
+        '''
+        Map state values of an MDP containing this sub-MDP to the states of this sub-MDP.
+        :param parent_result check result of the parent MDP
+        :param parent_state_index dictionary mapping quotient states to the states of the parent MDP
+        '''
+        return [parent_result.at(parent_state_index[state]) for state in self.quotient_state_map]
+
 
 class Smg(Mdp):
 
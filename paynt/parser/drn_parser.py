@@ -20,6 +20,12 @@ class DrnParser:
     def parse_drn(cls, sketch_path, use_exact=False):
         # try to read a drn file and return POSMG or POMDP based on the type
         # ValueError if file is not dnr or the model is of unsupported type
+        if not use_exact:
+            # single-pass reader, falls back to the Storm parser for features it does not support
+            try:
+                return payntbind.synthesis.readDrn(sketch_path)
+            except Exception as e:
+                logger.debug(f"native DRN reader failed ({e}), using the Storm parser instead")
         explicit_model = None
         try:
             type = DrnParser.decide_type_of_drn(sketch_path)
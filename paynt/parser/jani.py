@@ -39,23 +39,7 @@ class JaniUnfolder:
     def __init__(self, prism, hole_expressions, specification, family, use_exact=False):
 
         logger.debug("constructing JANI program...")
-        
-        # pack properties and translate Prism to Jani
-        properties_old = specification.all_properties()
-        stormpy_properties = [p.property for p in properties_old]
-        jani,properties = prism.to_jani(stormpy_properties)
-
-        # upon translation, some properties may change their atoms, so we need to re-wrap all properties
-        properties_unpacked = []
-        for index,prop_old in enumerate(properties_old):
-            prop_new = properties[index]
-            if type(prop_old) == paynt.verification.property.Property:
-                p = paynt.verification.property.Property(prop_new)
-            else:
-                epsilon = prop_old.epsilon
-                p = paynt.verification.property.OptimalityProperty(prop_new,epsilon,use_exact)
-            properties_unpacked.append(p)
-        self.specification = paynt.verification.property.Specification(properties_unpacked)
+        jani,self.specification = JaniUnfolder.translate_specification(prism, specification, use_exact)
         self.jani_unfolded,edge_to_hole_options = JaniUnfolder.unfold_jani(jani, family, hole_expressions)
 
         logger.debug("constructing the quotient...")
@@ -93,6 +77,27 @@ class JaniUnfolder:
         self.choice_to_hole_options = choice_to_hole_options
         return
 
+    @staticmethod
+    def translate_specification(prism, specification, use_exact=False):
+        ''' Translate Prism to Jani and adapt the specification to the Jani program. '''
+        # pack properties and translate Prism to Jani
+        properties_old = specification.all_properties()
+        stormpy_properties = [p.property for p in properties_old]
+        jani,properties = prism.to_jani(stormpy_properties)
+
+        # upon translation, some properties may change their atoms, so we need to re-wrap all properties
+        properties_unpacked = []
+        for index,prop_old in enumerate(properties_old):
+            prop_new = properties[index]
+            if type(prop_old) == paynt.verification.property.Property:
+                p = paynt.verification.property.Property(prop_new)
+            else:
+                epsilon = prop_old.epsilon
+                p = paynt.verification.property.OptimalityProperty(prop_new,epsilon,use_exact)
+            properties_unpacked.append(p)
+        specification = paynt.verification.property.Specification(properties_unpacked)
+        return jani,specification
+
     @staticmethod
     def unfold_jani(jani, family, hole_expressions):
         # ensure that jani.constants are in the same order as our holes
@@ -4,6 +4,7 @@ import payntbind
 import paynt.family.family
 import paynt.verification.property
 import paynt.parser.jani
+import paynt.parser.quotient_cache
 import paynt.models.model_builder
 
 import os
@@ -17,7 +18,7 @@ logger = logging.getLogger(__name__)
 class PrismParser:
 
     @classmethod
-    def read_prism(cls, sketch_path, properties_path, relative_error, use_exact=False):
+    def read_prism(cls, sketch_path, properties_path, relative_error, use_exact=False, use_cache=True):
 
         # parse the program
         prism, hole_definitions = PrismParser.load_sketch_prism(sketch_path)
@@ -49,17 +50,30 @@ class PrismParser:
         obs_evaluator = None
         if family is not None:
             assert prism_model_type in ["DTMC","MDP","POMDP"], "hole detected, but the program is neither DTMC nor (PO)MDP"
-            # unfold hole options via Jani
-            jani_unfolder = paynt.parser.jani.JaniUnfolder(prism, hole_expressions, specification, family, use_exact=use_exact)
-            specification = jani_unfolder.specification
-            quotient_mdp = jani_unfolder.quotient_mdp
-            coloring = payntbind.synthesis.Coloring(family.family, quotient_mdp.nondeterministic_choice_indices, jani_unfolder.choice_to_hole_options)
-            if prism.model_type == stormpy.storage.PrismModelType.POMDP:
-                obs_evaluator = payntbind.synthesis.ObservationEvaluator(prism, quotient_mdp)
-            if use_exact:
-                quotient_mdp = payntbind.synthesis.addChoiceLabelsFromJaniExact(quotient_mdp)
+            QuotientCache = paynt.parser.quotient_cache.QuotientCache
+            cache_key = None
+            cached_quotient = None
+            if use_cache and QuotientCache.enabled(use_exact) and prism_model_type != "POMDP":
+                cache_key = QuotientCache.key(sketch_path, specification)
+                cached_quotient = QuotientCache.load(cache_key, family)
+            if cached_quotient is not None:
+                _,specification = paynt.parser.jani.JaniUnfolder.translate_specification(prism, specification, use_exact)
+                quotient_mdp,choice_to_hole_options = cached_quotient
+                coloring = payntbind.synthesis.Coloring(family.family, quotient_mdp.nondeterministic_choice_indices, choice_to_hole_options)
             else:
-                quotient_mdp = payntbind.synthesis.addChoiceLabelsFromJani(quotient_mdp)
+                # unfold hole options via Jani
+                jani_unfolder = paynt.parser.jani.JaniUnfolder(prism, hole_expressions, specification, family, use_exact=use_exact)
+                specification = jani_unfolder.specification
+                quotient_mdp = jani_unfolder.quotient_mdp
+                coloring = payntbind.synthesis.Coloring(family.family, quotient_mdp.nondeterministic_choice_indices, jani_unfolder.choice_to_hole_options)
+                if prism.model_type == stormpy.storage.PrismModelType.POMDP:
+                    obs_evaluator = payntbind.synthesis.ObservationEvaluator(prism, quotient_mdp)
+                if use_exact:
+                    quotient_mdp = payntbind.synthesis.addChoiceLabelsFromJaniExact(quotient_mdp)
+                else:
+                    quotient_mdp = payntbind.synthesis.addChoiceLabelsFromJani(quotient_mdp)
+                if cache_key is not None:
+                    QuotientCache.store(cache_key, family, quotient_mdp, jani_unfolder.choice_to_hole_options)
         else:
             quotient_mdp = paynt.models.model_builder.ModelBuilder.from_prism(prism, specification, use_exact)
 
@@ -0,0 +1,105 @@
+import payntbind
+
+import paynt
+
+import hashlib
+import json
+import os
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class QuotientCache:
+    '''
+    On-disk cache of quotients constructed from PRISM sketches with holes. For each sketch, the quotient together with
+    the hole options associated with its choices is stored in a memory-mappable binary file, such that repeated runs
+    on the same sketch can skip unfolding of the Jani program and construction of the quotient. Holes of the family
+    are stored alongside and are used to validate the cached entry. Entries are keyed by the content of the sketch and
+    by the parts of the specification the quotient depends on, such that e.g. changing a threshold reuses the entry.
+    @note specification is re-parsed from the properties file since stormpy formulae cannot be serialized
+    '''
+
+    # directory in which quotients are cached; if None, caching is disabled
+    cache_dir = None
+
+    # to be bumped whenever the format of the cached entries changes
+    FORMAT_VERSION = 1
+
+    @classmethod
+    def enabled(cls, use_exact=False):
+        # only quotients over doubles can be stored
+        return cls.cache_dir is not None and not use_exact
+
+    @classmethod
+    def specification_signature(cls, specification):
+        '''
+        :return normalized parts of the specification the quotient depends on: the reward models and the path
+            formulae, whose labels and expressions become labels of the quotient (a single property also determines
+            its terminal states); thresholds and optimization directions do not affect the quotient
+        '''
+        properties = specification.all_properties()
+        formulae = sorted({
+            (str(prop.get_reward_name()) if prop.reward else "", str(prop.formula.subformula)) for prop in properties
+        })
+        return f"{len(properties) == 1};{formulae}"
+
+    @classmethod
+    def key(cls, sketch_path, specification):
+        digest = hashlib.sha256()
+        digest.update(f"{QuotientCache.FORMAT_VERSION};{paynt.version()};".encode())
+        with open(sketch_path, "rb") as file:
+            digest.update(file.read())
+        digest.update(f";{cls.specification_signature(specification)}".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def entry_paths(cls, key):
+        return os.path.join(cls.cache_dir, f"{key}.quotient"), os.path.join(cls.cache_dir, f"{key}.json")
+
+    @classmethod
+    def family_to_json(cls, family):
+        return {
+            "hole_names": [family.hole_name(hole) for hole in range(family.num_holes)],
+            "hole_option_labels": [list(family.hole_to_option_labels[hole]) for hole in range(family.num_holes)],
+        }
+
+    @classmethod
+    def load(cls, key, family):
+        '''
+        Load the quotient cached under the given key.
+        :param family family of the sketch, used to validate the cached entry
+        :return the quotient and hole options associated with its choices, or None if the quotient is not cached
+        '''
+        quotient_path,family_path = cls.entry_paths(key)
+        if not os.path.isfile(quotient_path) or not os.path.isfile(family_path):
+            return None
+        try:
+            with open(family_path) as file:
+                cached_family = json.load(file)
+            if cached_family != cls.family_to_json(family):
+                logger.warning(f"WARNING: holes of the quotient cached in {quotient_path} do not match the sketch")
+                return None
+            quotient_mdp,choice_to_hole_options = payntbind.synthesis.readQuotient(quotient_path)
+        except Exception as e:
+            logger.warning(f"WARNING: failed to load the cached quotient from {quotient_path}: {e}")
+            return None
+        logger.info(f"loaded quotient from {quotient_path}")
+        return quotient_mdp,choice_to_hole_options
+
+    @classmethod
+    def store(cls, key, family, quotient_mdp, choice_to_hole_options):
+        ''' Cache the quotient under the given key, failures are reported but otherwise ignored. '''
+        quotient_path,family_path = cls.entry_paths(key)
+        try:
+            os.makedirs(cls.cache_dir, exist_ok=True)
+            # write to temporary files first to not leave corrupted entries behind
+            payntbind.synthesis.writeQuotient(quotient_path + ".tmp", quotient_mdp, choice_to_hole_options)
+            with open(family_path + ".tmp", "w") as file:
+                json.dump(cls.family_to_json(family), file)
+            os.replace(quotient_path + ".tmp", quotient_path)
+            os.replace(family_path + ".tmp", family_path)
+        except Exception as e:
+            logger.warning(f"WARNING: failed to cache the quotient: {e}")
+            return
+        logger.info(f"cached quotient to {quotient_path}")
@@ -50,7 +50,7 @@ class Sketch:
         try:
             logger.info(f"assuming sketch in PRISM format...")
             prism, explicit_quotient, specification, family, coloring, jani_unfolder, obs_evaluator = PrismParser.read_prism(
-                        sketch_path, properties_path, relative_error, use_exact)
+                        sketch_path, properties_path, relative_error, use_exact, use_cache=export is None)
             filetype = "prism"
         except SyntaxError:
             pass
@@ -125,7 +125,7 @@ class Sketch:
             logger.info("export OK, aborting...")
             exit(0)
 
-        if jani_unfolder is not None:
+        if coloring is not None:
             if prism.model_type == stormpy.storage.PrismModelType.DTMC:
                 quotient_container = paynt.quotient.quotient.Quotient(explicit_quotient, family, coloring, specification, use_exact=use_exact)
             elif prism.model_type == stormpy.storage.PrismModelType.MDP:
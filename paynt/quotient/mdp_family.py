@@ -139,6 +139,16 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         return json_whole
 
     
+    def family_selected_choices(self, family):
+        '''
+        Choices of the quotient compatible with the family. These are selected when the MDP of the family is built,
+        families that were not built here (e.g. restored from a checkpoint or solved by another process) select them
+        on demand.
+        '''
+        if family.selected_choices is None:
+            family.selected_choices = self.coloring.selectCompatibleChoices(family.family)
+        return family.selected_choices
+
     def fix_and_apply_policy_to_family(self, family, policy):
         '''
         Apply policy to the quotient MDP for the given family. Every undefined action in a policy is set to an arbitrary
@@ -150,7 +160,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
         policy_choices = []
         for state,action in enumerate(policy):
             policy_choices += self.state_action_choices[state][action]
-        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, family.selected_choices)
+        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, self.family_selected_choices(family))
 
         # build MDP and keep only reachable states in policy
         mdp = self.build_from_choice_mask(choices)
@@ -171,7 +181,7 @@ class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
                     policy_choices += choice
             else:
                 policy_choices += self.state_action_choices[state][action]
-        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, family.selected_choices)
+        choices = payntbind.synthesis.policyToChoicesForFamily(policy_choices, self.family_selected_choices(family))
 
         mdp = self.build_from_choice_mask(choices)
 
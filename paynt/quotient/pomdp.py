@@ -6,7 +6,6 @@ import paynt.family.family
 import paynt.quotient.quotient
 import paynt.quotient.fsc
 
-import math
 import re
 import collections
 
@@ -28,8 +27,6 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         self.quotient_mdp = None
         self.family = None
         self.coloring = None
-        # to each hole-option pair a list of actions colored by this combination (reverse coloring)
-        self.hole_option_to_actions = None
 
         # attributes associated with a (folded) POMDP
 
@@ -337,7 +334,6 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         # reset attributes
         self.quotient_mdp = None
         self.coloring = None
-        self.hole_option_to_actions = None
 
         self.observation_action_holes = None
         self.observation_memory_holes = None
@@ -355,14 +351,6 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
 
         self.coloring = payntbind.synthesis.Coloring(self.family.family, self.quotient_mdp.nondeterministic_choice_indices, choice_to_hole_options)
 
-        # to each hole-option pair a list of actions colored by this combination
-        self.hole_option_to_actions = [[] for hole in range(self.family.num_holes)]
-        for hole in range(self.family.num_holes):
-            self.hole_option_to_actions[hole] = [[] for option in self.family.hole_options(hole)]
-        for choice in range(self.quotient_mdp.nr_choices):
-            for hole,option in choice_to_hole_options[choice]:
-                self.hole_option_to_actions[hole][option].append(choice)
-
 
 
 
@@ -371,64 +359,10 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         if PomdpQuotient.posterior_aware:
             return super().estimate_scheduler_difference(mdp,quotient_choice_map,inconsistent_assignments,choice_values,expected_visits)
 
-        # note: the code below is optimized for posterior-unaware unfolding
-
-        # create inverse quotient-choice-to-mdp-choice map
-        # TODO optimize this for multiple properties
-        quotient_to_restricted_action_map = [None] * self.quotient_mdp.nr_choices
-        for choice in range(mdp.nr_choices):
-            quotient_to_restricted_action_map[quotient_choice_map[choice]] = choice
-
-        # map choices to their origin states
-        choice_to_state = []
-        tm = mdp.transition_matrix
-        for state in range(mdp.nr_states):
-            for choice in tm.get_rows_for_group(state):
-                choice_to_state.append(state)
-
-        # for each hole, compute its difference sum and a number of affected states
-        inconsistent_differences = {}
-        for hole_index,options in inconsistent_assignments.items():
-            difference_sum = 0
-            states_affected = 0
-            edges_0 = self.hole_option_to_actions[hole_index][options[0]]
-            for choice_index,_ in enumerate(edges_0):
-
-                choice_0_global = edges_0[choice_index]
-                choice_0 = quotient_to_restricted_action_map[choice_0_global]
-                if choice_0 is None:
-                    continue
-
-                source_state = choice_to_state[choice_0]
-                source_state_visits = expected_visits[source_state]
-
-                # assert source_state_visits != 0
-                if source_state_visits == 0:
-                    continue
-
-                state_values = []
-                for option in options:
-
-                    assert len(self.hole_option_to_actions[hole_index][option]) > choice_index
-                    choice_global = self.hole_option_to_actions[hole_index][option][choice_index]
-                    choice = quotient_to_restricted_action_map[choice_global]
-                    choice_value = choice_values[choice]
-                    state_values.append(choice_value)
-
-                min_value = min(state_values)
-                max_value = max(state_values)
-                difference = (max_value - min_value) * source_state_visits
-                assert not math.isnan(difference)
-                difference_sum += difference
-                states_affected += 1
-
-            if states_affected == 0:
-                hole_score = 0
-            else:
-                hole_score = difference_sum / states_affected
-            inconsistent_differences[hole_index] = hole_score
-
-        return inconsistent_differences
+        # posterior-unaware unfolding: choices of different options of the same hole are aligned
+        return payntbind.synthesis.computeInconsistentHoleDifference(
+            self.coloring, mdp.nondeterministic_choice_indices, quotient_choice_map, choice_values,
+            inconsistent_assignments, expected_visits)
 
 
 
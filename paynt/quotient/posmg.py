@@ -254,6 +254,10 @@ class PosmgQuotient(paynt.quotient.quotient.Quotient):
 
         return paynt.models.models.Smg(stormpy.storage.SparseSmg(components))
 
+    def collect_result_hints(self, family):
+        ''' Results of the family are associated with the game, not with the MDP: no hints. '''
+        return None
+
     def scheduler_selection(self, mdp, scheduler):
         ''' Get hole options involved in the scheduler selection. '''
         assert scheduler.memoryless and scheduler.deterministic
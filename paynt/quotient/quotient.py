@@ -3,10 +3,19 @@ import payntbind
 
 import paynt.family.family
 import paynt.models.models
+import paynt.utils.lru_cache
+import paynt.utils.timer
+import paynt.verification.property_result
 
 import math
 import itertools
 
+# numpy is an optional dependency used to vectorize computations on choice and state values
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -15,12 +24,30 @@ class Quotient:
 
     # if True, expected visits will not be computed for hole scoring
     disable_expected_visits = False
+    # if True, MDPs of subfamilies will be derived from the MDP of their parent family instead of the quotient MDP
+    # @note the MDP of the parent family is kept in memory until all of its subfamilies are built
+    incremental_restriction = False
+    # if True, model checking of subfamilies will be warm-started with the values obtained for the parent family
+    warm_start = True
+
+    # memory budget (in MB) for caching DTMCs of hole assignments, 0 disables the cache
+    dtmc_cache_size_mb = 256
+    # maximum number of cached DTMCs of hole assignments
+    dtmc_cache_max_items = 65536
+
+    # maximum number of iterations of the batched value iteration
+    batch_max_iterations = 1000000
 
     # label associated with un-labelled choices
     EMPTY_LABEL = "__no_label__"
 
     @staticmethod
     def make_vector_defined(vector):
+        ''' Replace infinite values with the average of the finite ones (infinity counting as 0). '''
+        if numpy is not None and isinstance(vector, numpy.ndarray):
+            is_inf = vector == math.inf
+            default_value = numpy.where(is_inf, 0, vector).sum() / len(vector)
+            return numpy.where(is_inf, default_value, vector)
         vector_noinf = [ value if value != math.inf else 0 for value in vector]
         default_value = sum(vector_noinf) / len(vector)
         vector_valid = [ value if value != math.inf else default_value for value in vector]
@@ -48,6 +75,20 @@ class Quotient:
             else:
                 self.choice_destinations = payntbind.synthesis.computeChoiceDestinations(self.quotient_mdp)
 
+        # for each property, a model checker of sub-MDPs of the quotient
+        self.batch_model_checkers = {}
+        # quotient MDP associated with the batch model checkers
+        self.batch_model_checkers_mdp = None
+        # for each specification, whether its properties can be checked by the batch model checkers
+        self.choice_mask_checking_supported = {}
+
+        # DTMCs of recently built hole assignments (together with their model checking results)
+        self.dtmc_cache = paynt.utils.lru_cache.LruCache(
+            Quotient.dtmc_cache_size_mb * 2**20, Quotient.dtmc_cache_max_items
+        )
+        # coloring associated with the cached DTMCs
+        self.dtmc_cache_coloring = None
+
 
     def export_result(self, dtmc):
         ''' to be overridden '''
@@ -79,15 +120,152 @@ class Quotient:
         mdp,state_map,choice_map = self.restrict_quotient(choices)
         return paynt.models.models.SubMdp(mdp, state_map, choice_map)
 
+    def restrict_submdp(self, submdp, choices):
+        '''
+        Restrict a sub-MDP of the quotient to the selected actions.
+        :param choices a bitvector of selected actions of the quotient, must be a subset of actions of the sub-MDP
+        '''
+        if submdp.model.is_exact:
+            restrict = payntbind.synthesis.restrictSubMdpExact
+        else:
+            restrict = payntbind.synthesis.restrictSubMdp
+        mdp,state_map,choice_map = restrict(submdp.model, submdp.quotient_state_map, submdp.quotient_choice_map, choices)
+        return paynt.models.models.SubMdp(mdp, state_map, choice_map)
+
     def build(self, family):
         ''' Construct the quotient MDP for the family. '''
-        # select actions compatible with the family and restrict the quotient
-        choices = self.coloring.selectCompatibleChoices(family.family)
-        family.mdp = self.build_from_choice_mask(choices)
+        parent_info = family.parent_info
+        if parent_info is None or parent_info.mdp is None:
+            # select actions compatible with the family and restrict the quotient
+            choices = self.coloring.selectCompatibleChoices(family.family)
+            family.mdp = self.build_from_choice_mask(choices)
+        else:
+            # only the options of the splitter have changed: restrict the MDP of the parent
+            choices = self.coloring.selectCompatibleChoices(family.family, parent_info.selected_choices, parent_info.splitter)
+            family.mdp = self.restrict_submdp(parent_info.mdp, choices)
+            parent_info.release_subfamily()
         family.selected_choices = choices
         family.mdp.family = family
 
 
+    def batch_model_checker(self, prop, alt=False):
+        '''
+        :param alt if True, the checker optimizes in the direction opposite to the property
+        '''
+        if self.batch_model_checkers_mdp is not self.quotient_mdp:
+            # the quotient has changed
+            self.batch_model_checkers = {}
+            self.batch_model_checkers_mdp = self.quotient_mdp
+        if (prop,alt) not in self.batch_model_checkers:
+            assert not self.use_exact, "batched model checking is not supported for exact synthesis"
+            assert prop.formula.subformula.is_eventually_formula and not prop.is_discounted_reward, \
+                "batched model checking supports only reachability properties"
+            target_states = self.identify_target_states(prop=prop)
+            reward_name = prop.get_reward_name() if prop.reward else None
+            self.batch_model_checkers[(prop,alt)] = payntbind.synthesis.BatchMdpModelChecker(
+                self.quotient_mdp, target_states, reward_name, prop.minimizing != alt,
+                paynt.verification.property.Property.model_checking_precision, Quotient.batch_max_iterations
+            )
+        return self.batch_model_checkers[(prop,alt)]
+
+    def model_check_choice_masks(self, prop, choice_masks):
+        '''
+        Model check sub-MDPs of the quotient at once, in a single pass over the quotient matrix per iteration.
+        :param prop reachability (reward) property
+        :param choice_masks for each sub-MDP, a bitvector of selected actions of the quotient
+        :return for each sub-MDP, a triple (value, state values, state-to-choice scheduler), where state values
+            and the scheduler are associated with the states of the quotient; the scheduler is defined only for the
+            states reachable in the sub-MDP
+        @note values are sound lower bounds obtained by value iteration from below, see batch_value_bounds() for
+            results that decide pruning or optimum updates
+        '''
+        checker = self.batch_model_checker(prop)
+        checker.check(choice_masks)
+        num_choices = self.quotient_mdp.nr_choices
+        results = []
+        for value,state_values,state_to_choice in zip(
+            checker.solution_value, checker.solution_state_values, checker.solution_state_to_quotient_choice
+        ):
+            state_to_choice = [choice if choice < num_choices else None for choice in state_to_choice]
+            state_to_choice = self.discard_unreachable_choices(state_to_choice)
+            results.append((value,state_values,state_to_choice))
+        return results
+
+    def batch_value_bounds(self, prop, choice_masks, alt=False):
+        '''
+        Model check sub-MDPs of the quotient at once and bound their values soundly.
+        :param alt if True, the sub-MDPs are optimized in the direction opposite to the property
+        :return for each sub-MDP, a pair (lower bound, upper bound) on the value of its initial state; the upper
+            bound is trivial if it could not be verified, e.g. due to end components with zero reward
+        '''
+        checker = self.batch_model_checker(prop, alt)
+        checker.check(choice_masks, extract_schedulers=False)
+        return list(zip(checker.solution_value, checker.solution_upper_value))
+
+    def supports_property_choice_mask_checking(self, prop):
+        ''' :return whether the property can be checked via the batch model checkers '''
+        if self.use_exact:
+            return False
+        subformula = prop.formula.subformula
+        if not subformula.is_eventually_formula or prop.is_discounted_reward:
+            return False
+        if not isinstance(subformula.subformula, (stormpy.logic.AtomicLabelFormula, stormpy.logic.AtomicExpressionFormula)):
+            return False
+        if not self.quotient_mdp.labeling.contains_label(prop.get_target_label()):
+            return False
+        if prop.reward and prop.get_reward_name() not in self.quotient_mdp.reward_models:
+            return False
+        return True
+
+    def supports_choice_mask_checking(self, specification):
+        ''' :return whether all properties of the specification can be checked via model_check_choice_masks() '''
+        if specification not in self.choice_mask_checking_supported:
+            self.choice_mask_checking_supported[specification] = all(
+                self.supports_property_choice_mask_checking(prop) for prop in specification.all_properties()
+            )
+        return self.choice_mask_checking_supported[specification]
+
+    def check_assignment_in_place(self, family, specification):
+        '''
+        Check the specification on the DTMC induced by a hole assignment without constructing the DTMC: the choices
+        compatible with the assignment are evaluated directly on the quotient using the batch model checkers, which
+        only visit the states reachable under the assignment. Results are decided by sound bounds on the values; an
+        assignment that might improve the optimum is left to the exact model checker, which computes the value the
+        optimum is updated to.
+        @note assumes that supports_choice_mask_checking(specification) holds
+        :return SpecificationResult, or None if the result could not be decided
+        '''
+        assert family.size == 1, "expecting family of size 1"
+        choices = self.coloring.selectCompatibleChoices(family.family)
+        assert choices.number_of_set_bits() > 0
+
+        results = []
+        for constraint in specification.constraints:
+            lower,upper = self.batch_value_bounds(constraint, [choices])[0]
+            if constraint.satisfies_threshold(lower) != constraint.satisfies_threshold(upper):
+                return None
+            results.append(paynt.verification.property_result.PropertyResult(constraint, None, lower))
+        spec_result = paynt.verification.property_result.SpecificationResult()
+        spec_result.constraints_result = paynt.verification.property_result.ConstraintsResult(results)
+        if specification.has_optimality and spec_result.constraints_result.sat:
+            optimality = specification.optimality
+            lower,upper = self.batch_value_bounds(optimality, [choices])[0]
+            if optimality.improves_optimum(lower) or optimality.improves_optimum(upper):
+                return None
+            spec_result.optimality_result = paynt.verification.property_result.PropertyResult(optimality, None, lower)
+        return spec_result
+
+    def validate_dtmc_cache(self):
+        ''' Drop cached DTMCs if the quotient has changed. '''
+        if self.dtmc_cache_coloring is not self.coloring:
+            self.dtmc_cache.clear()
+            self.dtmc_cache_coloring = self.coloring
+
+    def cached_assignment(self, family):
+        ''' :return the cached DTMC induced by a hole assignment, or None if the DTMC is not cached '''
+        self.validate_dtmc_cache()
+        return self.dtmc_cache.peek(family.pack())
+
     @staticmethod
     def mdp_to_dtmc(mdp):
         tm = mdp.transition_matrix
@@ -102,8 +280,32 @@ class Quotient:
             dtmc = stormpy.storage.SparseDtmc(components)
             return dtmc
 
+    @staticmethod
+    def estimate_model_memory(model):
+        ''' Rough estimate of the memory (in bytes) occupied by a sparse model and its state mapping. '''
+        return 16*model.nr_transitions + 64*model.nr_states
+
     def build_assignment(self, family):
+        '''
+        Construct the DTMC induced by a hole assignment. DTMCs are cached: a DTMC of an assignment that was built
+        recently is returned together with its memoized model checking results.
+        '''
         assert family.size == 1, "expecting family of size 1"
+        if self.dtmc_cache.memory_budget == 0:
+            return self.build_assignment_dtmc(family)
+        self.validate_dtmc_cache()
+        key = family.pack()
+        dtmc = self.dtmc_cache.get(key)
+        if dtmc is None:
+            dtmc = self.build_assignment_dtmc(family)
+            dtmc.memoize_results()
+            # the key and the memoized results (one value per state and property) are accounted for as well
+            size = Quotient.estimate_model_memory(dtmc.model) + len(key) + \
+                8 * dtmc.model.nr_states * self.specification.num_properties
+            self.dtmc_cache.put(key, dtmc, size)
+        return dtmc
+
+    def build_assignment_dtmc(self, family):
         choices = self.coloring.selectCompatibleChoices(family.family)
         assert choices.number_of_set_bits() > 0
         mdp,state_map,choice_map = self.restrict_quotient(choices)
@@ -170,6 +372,14 @@ class Quotient:
         - mc(s') is the model checking result in state s'
         '''
 
+        if numpy is not None and not mdp.is_exact:
+            state_values = numpy.asarray(state_values, dtype=numpy.float64)
+            choice_values = payntbind.synthesis.multiply_with_array(mdp.transition_matrix, state_values)
+            choice_values = Quotient.make_vector_defined(choice_values)
+            if prop.reward:
+                choice_values += payntbind.synthesis.state_action_rewards_array(mdp, prop.formula.reward_name)
+            return choice_values
+
         # multiply probability with model checking results
         if mdp.is_exact:
             choice_values = payntbind.synthesis.multiply_with_vector_exact(mdp.transition_matrix, state_values)
@@ -202,6 +412,15 @@ class Quotient:
         dtmc = Quotient.mdp_to_dtmc(sub_mdp)
         dtmc_visits = paynt.verification.property.Property.compute_expected_visits(dtmc)
 
+        if numpy is not None and isinstance(dtmc_visits, numpy.ndarray):
+            if prop.minimizing:
+                dtmc_visits = Quotient.make_vector_defined(dtmc_visits)
+            else:
+                dtmc_visits = numpy.where(dtmc_visits == math.inf, 0, dtmc_visits)
+            expected_visits = numpy.zeros(mdp.nr_states)
+            expected_visits[numpy.asarray(state_map, dtype=numpy.int64)] = dtmc_visits
+            return expected_visits
+
         # handle infinity- and zero-visits
         if prop.minimizing:
             dtmc_visits = Quotient.make_vector_defined(dtmc_visits)
@@ -249,7 +468,7 @@ class Quotient:
 
     def scheduler_scores(self, mdp, prop, result, selection):
         inconsistent_assignments = {hole:options for hole,options in enumerate(selection) if len(options) > 1 }
-        choice_values = self.choice_values(mdp.model, prop, result.get_values())
+        choice_values = self.choice_values(mdp.model, prop, paynt.verification.property.Property.result_values(result))
         choices = result.scheduler.compute_action_support(mdp.model.nondeterministic_choice_indices)
         expected_visits = self.compute_expected_visits(mdp.model, prop, choices)
         scores = self.estimate_scheduler_difference(mdp.model, mdp.quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
@@ -286,6 +505,31 @@ class Quotient:
         with_max_score = [hole_index for hole_index in hole_score if hole_score[hole_index] == max_score]
         return with_max_score
 
+    def collect_result_hints(self, family):
+        '''
+        Collect results of the MDP analysis of the family that can warm-start the analysis of its subfamilies. Values
+        of a subfamily can only be worse than the ones of the family, hence the results of the family are lower bounds
+        only for minimizing objectives. Maximizing objectives get no hints since the solver (e.g. optimistic value
+        iteration) must be started from below.
+        :return a dictionary (property,alt) -> check result of the family MDP, whose values are associated with the
+            states of family.mdp
+        '''
+        if self.use_exact:
+            return None
+        hints = {}
+        spec_result = family.analysis_result
+        results = []
+        if spec_result.constraints_result is not None:
+            results += [result for result in spec_result.constraints_result.results if result is not None]
+        if spec_result.optimality_result is not None:
+            results.append(spec_result.optimality_result)
+        for result in results:
+            for alt,property_result in [(False,result.primary),(True,result.secondary)]:
+                if property_result is None or result.prop.minimizing == alt:
+                    continue
+                hints[(result.prop,alt)] = property_result.result
+        return hints
+
     def split(self, family):
 
         mdp = family.mdp
@@ -294,7 +538,8 @@ class Quotient:
         # split family wrt last undecided result
         result = family.analysis_result.undecided_result()
         hole_assignments = result.primary_selection
-        scores = self.scheduler_scores(mdp, result.prop, result.primary.result, result.primary_selection)
+        with paynt.utils.timer.PhaseTimer.phase("scores", fine_grained=True):
+            scores = self.scheduler_scores(mdp, result.prop, result.primary.result, result.primary_selection)
         if scores is None:
             scores = {hole:0 for hole in range(mdp.family.num_holes) if mdp.family.hole_num_options(hole) > 1}
 
@@ -315,7 +560,15 @@ class Quotient:
 
         # construct corresponding subfamilies
         parent_info = family.collect_parent_info(self.specification)
+        parent_info.splitter_score = scores[splitter]
+        if Quotient.warm_start:
+            parent_info.result_hints = self.collect_result_hints(family)
+            parent_info.result_hints_state_map = family.mdp.quotient_state_map
         subfamilies = family.split(splitter,suboptions)
+        if Quotient.incremental_restriction:
+            parent_info.splitter = splitter
+            parent_info.mdp = family.mdp
+            parent_info.num_unbuilt_subfamilies = len(subfamilies)
         for subfamily in subfamilies:
             subfamily.add_parent_info(parent_info)
         return subfamilies
@@ -0,0 +1,140 @@
+import paynt.verification.property
+
+import hashlib
+import os
+import pickle
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    '''
+    Periodic snapshots of a running synthesis that allow a run interrupted by a timeout or by a preemption of the host
+    to be resumed. Besides the algorithm-specific state (e.g. the stack of undecided families), the checkpoint stores
+    the current optimum, the best assignment, the number of explored family members and the statistic counters.
+    Families are stored in the compact form obtained via Family.pack().
+    Each synthesis run is identified by a digest of its task, such that runs nested within other runs (e.g. AR
+    invoked repeatedly by POMDP synthesis) save their states into different files.
+    @note families are stored without the analysis hints inherited from their parents, resumed families are thus
+        analyzed from scratch
+    '''
+
+    # prefix of the files to which the synthesis state is periodically saved, the file of a synthesis run is suffixed
+    # by the digest of its task; if None, checkpointing is disabled
+    path = None
+    # if True, the synthesis will continue from the state stored in the checkpoint file, if available
+    resume = False
+    # period (s) of saving the checkpoint
+    period_seconds = 300
+
+    # to be bumped whenever the format of the checkpoint changes
+    FORMAT_VERSION = 2
+
+    @classmethod
+    def enabled(cls):
+        return cls.path is not None
+
+    def __init__(self, synthesizer, family):
+        '''
+        :param synthesizer synthesizer whose state is checkpointed
+        :param family family on which the synthesis was initiated, used to validate the stored checkpoint
+        '''
+        self.synthesizer = synthesizer
+        self.family = family
+        self.signature = Checkpoint.task_digest(synthesizer, family)
+        self.path = None
+        if Checkpoint.enabled():
+            self.path = f"{Checkpoint.path}.{self.signature[:16]}"
+        self.last_saved = time.time()
+
+    @staticmethod
+    def task_digest(synthesizer, family):
+        '''
+        :return digest of the synthesis task: the method, the family, the specification (properties with their
+            thresholds, the optimality epsilon), the model checking precision and the quotient
+        '''
+        quotient = synthesizer.quotient
+        specification = quotient.specification
+        optimality = specification.optimality
+        task = [
+            synthesizer.method_name, family.hole_to_name, family.pack(),
+            [str(constraint) for constraint in specification.constraints],
+            str(optimality) if optimality is not None else None,
+            str(optimality.epsilon) if optimality is not None else None,
+            paynt.verification.property.Property.model_checking_precision,
+            type(quotient).__name__, quotient.quotient_mdp.nr_states, quotient.quotient_mdp.nr_choices,
+        ]
+        return hashlib.sha256(repr(task).encode()).hexdigest()
+
+    def due(self):
+        ''' :return True if the checkpoint is enabled and the last save is older than the checkpoint period '''
+        return Checkpoint.enabled() and time.time() - self.last_saved >= Checkpoint.period_seconds
+
+    def save(self, state):
+        ''' Save the synthesizer state together with the algorithm-specific state, failures are only reported. '''
+        if not Checkpoint.enabled():
+            return
+        synthesizer = self.synthesizer
+        optimality = synthesizer.quotient.specification.optimality
+        best_assignment = synthesizer.best_assignment
+        if best_assignment is not None:
+            best_assignment = best_assignment.pack()
+        checkpoint = {
+            "version": Checkpoint.FORMAT_VERSION,
+            "signature": self.signature,
+            "state": state,
+            "optimum": optimality.optimum if optimality is not None else None,
+            "best_assignment": best_assignment,
+            "best_assignment_value": synthesizer.best_assignment_value,
+            "explored": synthesizer.explored,
+            "stat": synthesizer.stat.counters(),
+        }
+        try:
+            # write to a temporary file first to not leave a corrupted checkpoint behind
+            with open(self.path + ".tmp", "wb") as file:
+                pickle.dump(checkpoint, file)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            logger.warning(f"WARNING: failed to save the checkpoint: {e}")
+            return
+        self.last_saved = time.time()
+        logger.info(f"saved checkpoint to {self.path}")
+
+    def load(self):
+        '''
+        Restore the synthesizer state from the checkpoint if resuming is enabled.
+        :return the algorithm-specific state, or None if there is no valid checkpoint to resume from
+        '''
+        if not Checkpoint.enabled() or not Checkpoint.resume:
+            return None
+        if not os.path.isfile(self.path):
+            logger.warning(f"WARNING: no checkpoint found in {self.path}, starting from scratch")
+            return None
+        try:
+            with open(self.path, "rb") as file:
+                checkpoint = pickle.load(file)
+        except Exception as e:
+            logger.warning(f"WARNING: failed to load the checkpoint from {self.path}: {e}")
+            return None
+        if checkpoint.get("version") != Checkpoint.FORMAT_VERSION or checkpoint["signature"] != self.signature:
+            logger.warning(f"WARNING: checkpoint in {self.path} does not match the synthesis task, ignoring it")
+            return None
+
+        synthesizer = self.synthesizer
+        optimality = synthesizer.quotient.specification.optimality
+        if checkpoint["optimum"] is not None and optimality.improves_optimum(checkpoint["optimum"]):
+            optimality.update_optimum(checkpoint["optimum"])
+        if checkpoint["best_assignment"] is not None:
+            synthesizer.best_assignment = self.family.assume_packed_options_copy(checkpoint["best_assignment"])
+            synthesizer.best_assignment_value = checkpoint["best_assignment_value"]
+        synthesizer.explored = checkpoint["explored"]
+        synthesizer.stat.restore_counters(checkpoint["stat"])
+        logger.info(f"resuming from checkpoint {self.path}")
+        return checkpoint["state"]
+
+    def remove(self):
+        ''' Remove the checkpoint once the synthesis is complete. '''
+        if Checkpoint.enabled() and os.path.isfile(self.path):
+            os.remove(self.path)
@@ -6,6 +6,9 @@ logger = logging.getLogger(__name__)
 
 class ConflictGeneratorDtmc():
 
+    # maximum number of threads constructing conflicts for different properties, hardware concurrency if None
+    num_threads = None
+
     def __init__(self, quotient):
         self.quotient = quotient
         self.counterexample_generator = None
@@ -34,18 +37,28 @@ class ConflictGeneratorDtmc():
         
         self.prepare_model(dtmc)
         
-        conflicts = []
+        formula_indices = []
+        formula_bounds = []
+        mdp_bounds = []
         for request in conflict_requests:
             index,prop,family_result = request
-
-            threshold = prop.threshold
-
+            formula_indices.append(index)
+            formula_bounds.append(prop.threshold)
             bounds = None
-            scheduler_selection = None
             if family_result is not None:
                 bounds = family_result.primary.result
+            mdp_bounds.append(bounds)
 
-            conflict = self.counterexample_generator.construct_conflict(index, threshold, bounds, family.mdp.quotient_state_map)
-            conflicts.append(conflict)
-        
-        return conflicts
+        return self.construct_conflicts_batch(formula_indices, formula_bounds, mdp_bounds, family.mdp.quotient_state_map)
+
+    def construct_conflicts_batch(self, formula_indices, formula_bounds, mdp_bounds, quotient_state_map):
+        ''' Construct conflicts for the prepared model, for multiple formulae in parallel. '''
+        if len(formula_indices) <= 1 or ConflictGeneratorDtmc.num_threads == 1:
+            return [
+                self.counterexample_generator.construct_conflict(index, bound, bounds, quotient_state_map)
+                for index,bound,bounds in zip(formula_indices, formula_bounds, mdp_bounds)
+            ]
+        num_threads = ConflictGeneratorDtmc.num_threads or 0
+        return self.counterexample_generator.construct_conflicts_batch(
+            formula_indices, formula_bounds, mdp_bounds, quotient_state_map, num_threads
+        )
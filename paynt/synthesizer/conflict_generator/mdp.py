@@ -23,3 +23,10 @@ class ConflictGeneratorMdp(paynt.synthesizer.conflict_generator.dtmc.ConflictGen
 
     def prepare_model(self, model):
         self.counterexample_generator.prepare_mdp(model.model, model.quotient_state_map)
+
+    def construct_conflicts_batch(self, formula_indices, formula_bounds, mdp_bounds, quotient_state_map):
+        ''' The MDP generator constructs conflicts sequentially. '''
+        return [
+            self.counterexample_generator.construct_conflict(index, bound, bounds, quotient_state_map)
+            for index,bound,bounds in zip(formula_indices, formula_bounds, mdp_bounds)
+        ]
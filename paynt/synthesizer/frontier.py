@@ -0,0 +1,201 @@
+import paynt.family.family
+
+import heapq
+import io
+import itertools
+import pickle
+import tempfile
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Frontier:
+    '''
+    Undecided families waiting to be analyzed by AR. The default frontier is a stack, i.e. families are explored in
+    the DFS order.
+    '''
+
+    @staticmethod
+    def create(strategy):
+        if strategy == "dfs":
+            return Frontier()
+        if strategy == "best_bound":
+            return BestBoundFrontier()
+        if strategy == "largest":
+            return LargestFamilyFrontier()
+        if strategy == "visits":
+            return ExpectedVisitsFrontier()
+        raise ValueError("invalid frontier strategy")
+
+    def __init__(self):
+        self.families = []
+
+    def __len__(self):
+        return len(self.families)
+
+    def __iter__(self):
+        return iter(self.families)
+
+    def push(self, families, parent=None):
+        '''
+        :param families families to be explored
+        :param parent analyzed family that was split into these families, None for the initial families
+        '''
+        self.families += families
+
+    def pop(self):
+        return self.families.pop(-1)
+
+
+class PriorityFrontier(Frontier):
+    '''
+    Frontier in which families are ordered wrt the priority assigned by priority(), lower values first; ties are
+    broken in the DFS order. To bound the memory, once the heap is full, its worse half is packed (see Family.pack())
+    and written to a temporary file as a sorted run. Popping remains best-first across the heap and the runs, of which
+    only the first entries are kept in memory: at most max_size families and one packed family per run are held.
+    @note spilled families keep the optimality bound of their parent, such that they can be pruned without building
+        their MDPs, but they are restored without the remaining hints inherited from their parents, e.g. warm-start
+        values or the parent MDP
+    '''
+
+    # maximum number of unpacked families in the frontier
+    max_size = 100000
+
+    def __init__(self):
+        self.heap = []
+        # temporary file with sorted runs of spilled entries
+        # (priority, tie-breaker, packed options, refinement depth, constraint indices, optimality bound)
+        self.spill_file = None
+        # for each run, the offset of its next unread entry and the number of unread entries
+        self.runs = []
+        # heap of the first entries of non-empty runs (priority, tie-breaker, run, entry)
+        self.run_heads = []
+        self.num_spilled = 0
+        # family used to restore hole names and option labels of spilled families
+        self.template = None
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap) + self.num_spilled
+
+    def __iter__(self):
+        return itertools.chain(
+            (family for _,_,family in self.heap),
+            (self.unpack(entry) for entry in self.spilled_entries())
+        )
+
+    def priority(self, family, parent):
+        ''' to be overridden '''
+        return 0
+
+    def spill(self):
+        ''' Pack the worse half of the heap and write it to the spill file as a sorted run. '''
+        if self.template is None:
+            logger.warning(f"frontier exceeded {PriorityFrontier.max_size} families, spilling packed families to disk")
+            family = self.heap[0][2]
+            self.template = family.assume_packed_options_copy(family.pack())
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile()
+        self.heap.sort()
+        keep = PriorityFrontier.max_size // 2
+        entries = []
+        for priority,counter,family in self.heap[keep:]:
+            optimality_bound = None
+            if family.parent_info is not None:
+                optimality_bound = family.parent_info.optimality_bound
+                family.parent_info.release_subfamily()
+            entries.append(
+                (priority, counter, family.pack(), family.refinement_depth, family.constraint_indices, optimality_bound)
+            )
+        # a sorted list is a heap
+        del self.heap[keep:]
+
+        self.spill_file.seek(0, io.SEEK_END)
+        offset = self.spill_file.tell()
+        for entry in entries[1:]:
+            pickle.dump(entry, self.spill_file)
+        run = len(self.runs)
+        self.runs.append((offset, len(entries)-1))
+        heapq.heappush(self.run_heads, (entries[0][0], entries[0][1], run, entries[0]))
+        self.num_spilled += len(entries)
+
+    def spilled_entries(self):
+        for _,_,run,entry in self.run_heads:
+            yield entry
+            offset,num_unread = self.runs[run]
+            self.spill_file.seek(offset)
+            for _ in range(num_unread):
+                yield pickle.load(self.spill_file)
+
+    def pop_spilled(self):
+        ''' Pop the best spilled entry and read the next entry of its run. '''
+        _,_,run,entry = heapq.heappop(self.run_heads)
+        self.num_spilled -= 1
+        offset,num_unread = self.runs[run]
+        if num_unread > 0:
+            self.spill_file.seek(offset)
+            head = pickle.load(self.spill_file)
+            self.runs[run] = (self.spill_file.tell(), num_unread-1)
+            heapq.heappush(self.run_heads, (head[0], head[1], run, head))
+        if self.num_spilled == 0:
+            self.spill_file.close()
+            self.spill_file = None
+            self.runs = []
+        return entry
+
+    def unpack(self, entry):
+        _,_,packed,refinement_depth,constraint_indices,optimality_bound = entry
+        family = self.template.assume_packed_options_copy(packed)
+        family.refinement_depth = refinement_depth
+        family.constraint_indices = constraint_indices
+        family.parent_info = paynt.family.family.ParentInfo()
+        family.parent_info.optimality_bound = optimality_bound
+        return family
+
+    def push(self, families, parent=None):
+        for family in families:
+            if len(self.heap) >= PriorityFrontier.max_size:
+                self.spill()
+            # families pushed later are preferred on ties, as in DFS
+            heapq.heappush(self.heap, (self.priority(family,parent), -next(self.counter), family))
+
+    def pop(self):
+        if self.run_heads and (not self.heap or self.run_heads[0][:2] < self.heap[0][:2]):
+            return self.unpack(self.pop_spilled())
+        return heapq.heappop(self.heap)[2]
+
+
+class BestBoundFrontier(PriorityFrontier):
+    '''
+    Families whose parent has the best primary value of the undecided property are explored first. For the optimality
+    property, this is the bound on the value achievable within the family, hence a good assignment is likely to be
+    found early.
+    '''
+
+    def priority(self, family, parent):
+        if parent is None:
+            return 0
+        result = parent.analysis_result.undecided_result()
+        value = float(result.primary.value)
+        return value if result.minimizing else -value
+
+
+class LargestFamilyFrontier(PriorityFrontier):
+    ''' Largest families are explored first. '''
+
+    def priority(self, family, parent):
+        return -family.size
+
+
+class ExpectedVisitsFrontier(PriorityFrontier):
+    '''
+    Families whose parent was split wrt a hole having the largest score are explored first. The score of a hole
+    estimates the difference in the values of its options weighted by the expected number of visits of the states in
+    which the hole is relevant, hence such families resolve the most of the uncertainty of the abstraction.
+    '''
+
+    def priority(self, family, parent):
+        if family.parent_info is None or family.parent_info.splitter_score is None:
+            return 0
+        return -family.parent_info.splitter_score
@@ -3,6 +3,7 @@ import payntbind
 
 import paynt.family.family
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.checkpoint
 
 import paynt.quotient.quotient
 import paynt.verification.property_result
@@ -13,6 +14,11 @@ import paynt.family.smt
 import paynt.synthesizer.conflict_generator.dtmc
 import paynt.synthesizer.conflict_generator.mdp
 
+# numpy is an optional dependency used to store policies in compact arrays and to vectorize operations on them
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 import logging
 logger = logging.getLogger(__name__)
@@ -23,7 +29,34 @@ import graphviz
 logging.disable(logging.NOTSET)
 
 
+# Policies of the policy tree are stored as pairs (policy,mask), where mask lists states in which the policy is
+# defined. If numpy is available, the policy is an int32 array in which POLICY_UNDEFINED marks states without an
+# action and the mask is an array; otherwise, the policy is a list in which such states are None.
+POLICY_UNDEFINED = -1
+
+def pack_policy(policy):
+    ''' Convert a policy given as a list (None for undefined states) into the representation used in the tree. '''
+    if numpy is None:
+        mask = [state for state,action in enumerate(policy) if action is not None]
+        return (policy,mask)
+    policy = numpy.array([action if action is not None else POLICY_UNDEFINED for action in policy], dtype=numpy.int32)
+    return (policy, numpy.flatnonzero(policy != POLICY_UNDEFINED))
+
+def unpack_policy(policy):
+    ''' Convert a policy of the tree into a pair (list,mask) with None for undefined states. '''
+    if numpy is None:
+        return policy
+    policy,mask = policy
+    return (policy_array_to_list(policy), mask.tolist())
+
+def policy_array_to_list(policy):
+    return [action if action != POLICY_UNDEFINED else None for action in policy.tolist()]
+
 def policies_are_compatible(policy1, policy2):
+    if numpy is not None:
+        policy1,policy1_mask = policy1
+        actions2 = policy2[0][policy1_mask]
+        return not numpy.any((actions2 != POLICY_UNDEFINED) & (actions2 != policy1[policy1_mask]))
     policy1,policy1_mask = policy1
     policy2,_ = policy2
     for state in policy1_mask:
@@ -42,11 +75,24 @@ def merge_policies(policy1, policy2):
         return None
     policy1,_ = policy1
     policy2,_ = policy2
-    policy = [a1 or policy2[state] for state,a1 in enumerate(policy1)]
+    if numpy is not None:
+        policy = numpy.where(policy1 != POLICY_UNDEFINED, policy1, policy2)
+        return (policy, numpy.flatnonzero(policy != POLICY_UNDEFINED))
+    policy = [a1 if a1 is not None else policy2[state] for state,a1 in enumerate(policy1)]
     mask = [state for state,action in enumerate(policy) if action is not None]
     return (policy,mask)
 
 def merge_policies_exclusively(policy1, policy2):
+    '''
+    :return policy1 completed by policy2 and policy2 completed by policy1, both as lists with None for undefined
+        states
+    '''
+    if numpy is not None:
+        policy1,_ = policy1
+        policy2,_ = policy2
+        policy12 = numpy.where(policy1 != POLICY_UNDEFINED, policy1, policy2)
+        policy21 = numpy.where(policy2 != POLICY_UNDEFINED, policy2, policy1)
+        return policy_array_to_list(policy12), policy_array_to_list(policy21)
     policy1,_ = policy1
     policy2,_ = policy2
     policy12 = policy1.copy()
@@ -59,9 +105,33 @@ def merge_policies_exclusively(policy1, policy2):
             policy21[state] = a1
     return policy12,policy21
 
+def add_native_policy(postprocessor, policy):
+    ''' Add a policy of the tree to the native PolicyTreePostprocessor. :return its index '''
+    policy,_ = policy
+    if numpy is not None:
+        return postprocessor.add_policy_array(policy)
+    num_actions = postprocessor.num_actions
+    return postprocessor.add_policy([action if action is not None else num_actions for action in policy])
+
+def get_native_policy(postprocessor, index):
+    ''' :return a policy of the native PolicyTreePostprocessor as a policy of the tree, or None if it was removed '''
+    if numpy is not None:
+        policy = postprocessor.get_policy_array(index)
+        if policy is None:
+            return None
+        return (policy, numpy.flatnonzero(policy != POLICY_UNDEFINED))
+    policy = postprocessor.get_policy(index)
+    if policy is None:
+        return None
+    num_actions = postprocessor.num_actions
+    return pack_policy([action if action != num_actions else None for action in policy])
+
 
 class PolicyTreeNode:
 
+    # number of siblings whose completed policies are model checked at once when merging siblings natively
+    candidates_per_batch = 8
+
     def __init__(self, family):
         self.family = family
         
@@ -103,7 +173,7 @@ class PolicyTreeNode:
             result = self.family.mdp.model_check_property(prop)
             assert not result.sat
         else:
-            SynthesizerPolicyTree.double_check_policy(quotient, self.family, prop, policies[self.policy_index][0])
+            SynthesizerPolicyTree.double_check_policy(quotient, self.family, prop, unpack_policy(policies[self.policy_index])[0])
 
 
     def merge_children_indices(self, indices):
@@ -169,14 +239,14 @@ class PolicyTreeNode:
         policy_result = mdp.model_check_property(prop, alt=True)
         PolicyTreeNode.mdps_model_checked += 1
         if policy_result.sat:
-            return policy
+            return pack_policy(policy[0])
 
         # try policy2 for family1
         policy,mdp = quotient.fix_and_apply_policy_to_family(node1.family, policy21)
         policy_result = mdp.model_check_property(prop, alt=True)
         PolicyTreeNode.mdps_model_checked += 2
         if policy_result.sat:
-            return policy
+            return pack_policy(policy[0])
 
         # neither fits
         return None
@@ -208,6 +278,88 @@ class PolicyTreeNode:
             self.merge_children_indices(join_to_i)
             i += 1
 
+    def find_completed_policy(self, quotient, postprocessor, check_choice_masks, child1, batch):
+        '''
+        Find the first child in the batch such that the policy of child1 completed by the policy of the child
+        satisfies the property for the family of the child, or vice versa; the former is preferred for the same child.
+        :return a pair (position of the child in the batch, (pair of policy indices, family choices)) describing the
+            satisfying candidate, or None
+        '''
+        policy1 = child1.policy_index
+        # try policy1 completed by policy2 for family2
+        pairs = [(policy1, self.child_nodes[j].policy_index) for j in batch]
+        families = [quotient.family_selected_choices(self.child_nodes[j].family) for j in batch]
+        found = check_choice_masks(postprocessor.prepare_candidates(pairs, families))
+        candidate = None if found is None else (found, (pairs[found], families[found]))
+
+        # try policy2 completed by policy1 for family1 for the children preceding the one found
+        limit = len(batch) if found is None else found
+        if limit > 0:
+            pairs = [(self.child_nodes[j].policy_index, policy1) for j in batch[:limit]]
+            families = [quotient.family_selected_choices(child1.family)] * limit
+            found = check_choice_masks(postprocessor.prepare_candidates(pairs, families))
+            if found is not None:
+                candidate = (found, (pairs[found], families[found]))
+        return candidate
+
+    def merge_children_having_compatible_policies_natively(self, quotient, postprocessor, check_choice_masks):
+        '''
+        Same as merge_children_having_compatible_policies(), with policies held by the native post-processor. MDPs
+        induced by completed policies are checked in batches of consecutive siblings until one of them can be merged.
+        :param postprocessor PolicyTreePostprocessor holding the policies of the tree
+        :param check_choice_masks a function that, given a list of choice masks of the quotient, returns the index of
+            the first induced MDP that satisfies the property, or None
+        '''
+        if self.is_leaf:
+            return
+        i = 0
+        while i < len(self.child_nodes):
+            child1 = self.child_nodes[i]
+            if child1.sat is not True:
+                i += 1
+                continue
+
+            join_to_i = [i]
+            # other children that can be merged to i
+            candidates = [j for j in range(i+1,len(self.child_nodes)) if self.child_nodes[j].sat is True]
+            while candidates:
+                policy1 = child1.policy_index
+                # the first child having a compatible policy is merged without model checking, the MDPs are checked
+                # only for the children preceding it
+                compatible = len(candidates)
+                for position,j in enumerate(candidates):
+                    if postprocessor.policies_are_compatible(policy1, self.child_nodes[j].policy_index):
+                        compatible = position
+                        break
+                merged = compatible
+                adopted = None
+                for start in range(0, compatible, PolicyTreeNode.candidates_per_batch):
+                    batch = candidates[start:min(start+PolicyTreeNode.candidates_per_batch, compatible)]
+                    candidate = self.find_completed_policy(quotient, postprocessor, check_choice_masks, child1, batch)
+                    if candidate is not None:
+                        position,adopted = candidate
+                        merged = start + position
+                        break
+
+                if merged == len(candidates):
+                    # no other child can be merged
+                    break
+                j = candidates[merged]
+                if adopted is None:
+                    postprocessor.merge_policies(policy1, self.child_nodes[j].policy_index)
+                else:
+                    # the prepared candidate might have been replaced by a subsequent check
+                    pair,family_choices = adopted
+                    postprocessor.prepare_candidates([pair], [family_choices])
+                    postprocessor.adopt_candidate(policy1, 0)
+                postprocessor.remove_policy(self.child_nodes[j].policy_index)
+                join_to_i.append(j)
+                # children preceding the merged one cannot be merged to i
+                candidates = candidates[merged+1:]
+
+            self.merge_children_indices(join_to_i)
+            i += 1
+
     def skip_redundant_children(self):
         ''' Adopt grandchildren of each child that uses the same splitter as self. '''
         if self.splitter is None:
@@ -263,10 +415,48 @@ class PolicyTree:
 
     def new_policy(self, policy):
         policy_index = len(self.policies)
-        mask = [state for state,action in enumerate(policy) if action is not None]
-        self.policies.append( (policy,mask) )
+        self.policies.append(pack_policy(policy))
         return policy_index
 
+    def pack(self, undecided_leaves):
+        '''
+        Compact representation of the partially built tree used for checkpointing. Nodes are listed in BFS order
+        (see collect_all()), each node is represented by its packed family, the splitter, the suboptions, the index
+        of the first child node and the number of child nodes.
+        :param undecided_leaves leaves yet to be solved, stored as node indices
+        '''
+        nodes = self.collect_all()
+        node_to_index = {node:index for index,node in enumerate(nodes)}
+        packed_nodes = []
+        for node in nodes:
+            first_child = node_to_index[node.child_nodes[0]] if node.child_nodes else None
+            packed_nodes.append((
+                node.family.pack(), node.splitter, node.suboptions, first_child, len(node.child_nodes),
+                node.sat, node.policy_index
+            ))
+        return packed_nodes, self.policies, [node_to_index[node] for node in undecided_leaves]
+
+    @classmethod
+    def unpack(cls, family, packed_tree):
+        '''
+        Reconstruct the tree obtained via pack().
+        :param family family associated with the root of the tree
+        :return the tree and its undecided leaves
+        '''
+        packed_nodes,policies,undecided_indices = packed_tree
+        policy_tree = cls(family)
+        policy_tree.policies = policies
+        nodes = [policy_tree.root] + [
+            PolicyTreeNode(family.assume_packed_options_copy(packed_node[0])) for packed_node in packed_nodes[1:]
+        ]
+        for node,packed_node in zip(nodes,packed_nodes):
+            _,node.splitter,node.suboptions,first_child,num_children,node.sat,node.policy_index = packed_node
+            if num_children > 0:
+                node.child_nodes = nodes[first_child:first_child+num_children]
+        for node in nodes:
+            node.family.candidate_policy = None
+        return policy_tree, [nodes[index] for index in undecided_indices]
+
     def collect_all(self):
         node_queue = [self.root]
         all_nodes = []
@@ -405,27 +595,71 @@ class PolicyTree:
                 self.policies[policy2_index] = None
         
         return policy_old_to_new_map
-    
+
+    @staticmethod
+    def choice_mask_checker(quotient, prop):
+        '''
+        :return a function that, given a list of choice masks of the quotient, model checks the induced MDPs wrt the
+            property in the alternative direction and returns the index of the first satisfying MDP, or None
+        @note the MDPs are checked at once via the batch model checker; an MDP whose bounds do not decide the
+            property is built and checked by Storm
+        '''
+        def check_choice_masks(choice_masks):
+            PolicyTreeNode.mdps_model_checked += len(choice_masks)
+            for index,(lower,upper) in enumerate(quotient.batch_value_bounds(prop, choice_masks, alt=True)):
+                sat = prop.satisfies_threshold(lower)
+                if sat != prop.satisfies_threshold(upper):
+                    mdp = quotient.build_from_choice_mask(choice_masks[index])
+                    sat = mdp.model_check_property(prop, alt=True).sat
+                if sat:
+                    return index
+            return None
+        return check_choice_masks
+
     def postprocess(self, quotient, prop):
 
         postprocessing_timer = paynt.utils.timer.Timer()
         postprocessing_timer.start()
         logger.info("post-processing the policy tree...")
 
+        # if the MDPs induced by completed policies can be checked in batches, policies are processed natively where
+        # they are indexed by the states in which they are defined; otherwise, each MDP is built and checked by Storm
+        postprocessor = None
+        if quotient.supports_property_choice_mask_checking(prop):
+            postprocessor = payntbind.synthesis.PolicyTreePostprocessor(
+                quotient.quotient_mdp, quotient.num_actions, quotient.choice_to_action)
+            for policy in self.policies:
+                add_native_policy(postprocessor, policy)
+
         logger.info("merging SAT siblings solved by non-exclusively compatible policies...")
         PolicyTreeNode.mdps_model_checked = 0
         nodes_before = self.root.num_nodes()
-        for node in reversed(self.collect_all()):
-            node.merge_children_having_compatible_policies(quotient, prop, self.policies)
-        self.discard_unused_policies()
+        if postprocessor is not None:
+            check_choice_masks = PolicyTree.choice_mask_checker(quotient, prop)
+            for node in reversed(self.collect_all()):
+                node.merge_children_having_compatible_policies_natively(quotient, postprocessor, check_choice_masks)
+        else:
+            for node in reversed(self.collect_all()):
+                node.merge_children_having_compatible_policies(quotient, prop, self.policies)
+            self.discard_unused_policies()
         nodes_removed = nodes_before - self.root.num_nodes()
         logger.info("additional {} MDPs were model checked".format(PolicyTreeNode.mdps_model_checked))
         logger.info("removed {} nodes".format(nodes_removed))
 
         logger.info("merging all exclusively compatible policies...")
-        policies_before = len(self.policies)
-        policy_indices = [index for index,_ in enumerate(self.policies)]
-        policy_old_to_new_map = self.merge_compatible_policies(policy_indices)
+        if postprocessor is not None:
+            policy_indices = [index for index,_ in enumerate(self.policies) if postprocessor.has_policy(index)]
+            policy_old_to_new_map = postprocessor.merge_compatible_policies(policy_indices)
+            # only the policies changed by merging are converted back
+            for index,_ in enumerate(self.policies):
+                if not postprocessor.has_policy(index):
+                    self.policies[index] = None
+                elif postprocessor.policy_modified(index):
+                    self.policies[index] = get_native_policy(postprocessor, index)
+        else:
+            policy_indices = [index for index,_ in enumerate(self.policies)]
+            policy_old_to_new_map = self.merge_compatible_policies(policy_indices)
+        policies_before = len(policy_indices)
         for leaf in self.collect_sat():
             leaf.policy_index = policy_old_to_new_map[leaf.policy_index]
         self.discard_unused_policies()
@@ -454,7 +688,7 @@ class PolicyTree:
     
     def extract_policies(self, quotient):
         return {
-            f"p{policy_index}" : quotient.policy_to_state_valuation_actions(policy)
+            f"p{policy_index}" : quotient.policy_to_state_valuation_actions(unpack_policy(policy))
             for policy_index,policy in enumerate(self.policies)
         }
 
@@ -559,15 +793,18 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
 
     def verify_family(self, family, game_solver, prop):
         # logger.info("investigating family of size {}".format(family.size))
-        self.quotient.build(family)
+        with paynt.utils.timer.PhaseTimer.phase("build"):
+            self.quotient.build(family)
         mdp_family_result = MdpFamilyResult()
 
         if family.size == 1:
-            mdp_family_result.policy = self.solve_singleton(family,prop)
+            with paynt.utils.timer.PhaseTimer.phase("model check"):
+                mdp_family_result.policy = self.solve_singleton(family,prop)
             return mdp_family_result
         
         if family.candidate_policy is None:
-            game_policy,game_sat = self.solve_game_abstraction(family,prop,game_solver)
+            with paynt.utils.timer.PhaseTimer.phase("game"):
+                game_policy,game_sat = self.solve_game_abstraction(family,prop,game_solver)
         else:
             game_policy = family.candidate_policy
             game_sat = False
@@ -578,7 +815,8 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
             return mdp_family_result
 
         # solve primary direction for the MDP abstraction
-        mdp_result = family.mdp.model_check_property(prop)
+        with paynt.utils.timer.PhaseTimer.phase("model check"):
+            mdp_result = family.mdp.model_check_property(prop)
         mdp_value = mdp_result.value
         self.stat.iteration(family.mdp)
         # logger.debug("primary-primary direction solved, value is {}".format(mdp_value))
@@ -587,9 +825,9 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
             return mdp_family_result
 
         # undecided: choose scheduler choices to be used for splitting
-        scheduler_choices,hole_selection,state_values = self.parse_game_scheduler(game_solver)
-
-        splitter = self.choose_splitter(family,prop,scheduler_choices,state_values,hole_selection)
+        with paynt.utils.timer.PhaseTimer.phase("splitter"):
+            scheduler_choices,hole_selection,state_values = self.parse_game_scheduler(game_solver)
+            splitter = self.choose_splitter(family,prop,scheduler_choices,state_values,hole_selection)
         mdp_family_result.splitter = splitter
         mdp_family_result.hole_selection = hole_selection
         return mdp_family_result
@@ -611,7 +849,8 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
                 return hole
         
         # compute scores for inconsistent holes
-        scores = self.compute_scores(prop, scheduler_choices, state_values, inconsistent_assignments)
+        with paynt.utils.timer.PhaseTimer.phase("scores", fine_grained=True):
+            scores = self.compute_scores(prop, scheduler_choices, state_values, inconsistent_assignments)
         splitters = self.quotient.holes_with_max_score(scores)
         splitter = splitters[0]
         return splitter
@@ -669,14 +908,29 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
         return suboptions,subfamilies
 
     
-    def evaluate_all(self, family, prop, keep_value_only=False):
-        assert not prop.reward, "expecting reachability probability propery"
+    def decide_leaf(self, policy_tree, policy_tree_node, policy):
+        '''
+        :param policy a policy satisfying all members of the family of the leaf, or False if all members are UNSAT
+        '''
+        self.explore(policy_tree_node.family)
+        if policy is False:
+            policy_tree_node.sat = False
+        else:
+            policy_tree_node.sat = True
+            policy_tree_node.policy_index = policy_tree.new_policy(policy)
+
+    def expand_policy_tree(self, policy_tree, undecided_leaves, prop, checkpoint):
+        '''
+        Solve undecided leaves of the policy tree, leaves that cannot be decided are split.
+        :return True if all leaves were decided, False if the synthesis was interrupted due to a resource limit
+        '''
         game_solver = self.quotient.build_game_abstraction_solver(prop)
-        family.candidate_policy = None
-        policy_tree = PolicyTree(family)
-
-        undecided_leaves = [policy_tree.root]
         while undecided_leaves:
+            if self.resource_limit_reached():
+                checkpoint.save(policy_tree.pack(undecided_leaves))
+                return False
+            if checkpoint.due():
+                checkpoint.save(policy_tree.pack(undecided_leaves))
 
             # gi = self.stat.iterations_game
             # if gi is not None and gi > 1000:
@@ -688,22 +942,33 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
             family.candidate_policy = None
 
             if result.policy is not None:
-                self.explore(family)
                 if policy_tree_node != policy_tree.root:
                     family.mdp = None
-                if result.policy is False:
-                    policy_tree_node.sat = False
-                else:
-                    policy_tree_node.sat = True
-                    policy_tree_node.policy_index = policy_tree.new_policy(result.policy)
+                self.decide_leaf(policy_tree, policy_tree_node, result.policy)
                 continue
 
             # refine
-            suboptions,subfamilies = self.split(family, prop, result.hole_selection, result.splitter, result.game_policy)
+            with paynt.utils.timer.PhaseTimer.phase("split"):
+                suboptions,subfamilies = self.split(family, prop, result.hole_selection, result.splitter, result.game_policy)
             if policy_tree_node != policy_tree.root:
                 family.mdp = None
             policy_tree_node.split(result.splitter,suboptions,subfamilies)
             undecided_leaves += policy_tree_node.child_nodes
+        return True
+
+    def evaluate_all(self, family, prop, keep_value_only=False):
+        assert not prop.reward, "expecting reachability probability propery"
+        family.candidate_policy = None
+        policy_tree = PolicyTree(family)
+
+        undecided_leaves = [policy_tree.root]
+        checkpoint = paynt.synthesizer.checkpoint.Checkpoint(self, family)
+        packed_tree = checkpoint.load()
+        if packed_tree is not None:
+            policy_tree,undecided_leaves = PolicyTree.unpack(family, packed_tree)
+        if not self.expand_policy_tree(policy_tree, undecided_leaves, prop, checkpoint):
+            return None
+        checkpoint.remove()
 
         if SynthesizerPolicyTree.double_check_policy_tree_leaves:
             policy_tree.double_check(self.quotient, prop)
@@ -714,7 +979,8 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
         self.stat.num_nodes = len(policy_tree.collect_all())
         self.stat.num_leaves = len(policy_tree.collect_leaves())
         self.stat.num_policies = len(policy_tree.policies)
-        postprocessing_time = policy_tree.postprocess(self.quotient, prop)
+        with paynt.utils.timer.PhaseTimer.phase("postprocessing"):
+            postprocessing_time = policy_tree.postprocess(self.quotient, prop)
         policy_tree.print_stats()
         self.stat.postprocessing_time = postprocessing_time
         self.stat.num_nodes_merged = len(policy_tree.collect_all())
@@ -725,7 +991,7 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
         # convert policy tree to family evaluation
         evaluations = []
         for node in policy_tree.collect_leaves():
-            policy = policy_tree.policies[node.policy_index] if node.sat else None
+            policy = unpack_policy(policy_tree.policies[node.policy_index]) if node.sat else None
             evaluation = paynt.synthesizer.synthesizer.FamilyEvaluation(node.family,None,node.sat,policy=policy)
             evaluations.append(evaluation)
         return evaluations
@@ -736,6 +1002,9 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
 
 
     def export_evaluation_result(self, evaluations, export_filename_base):
+        if evaluations is None:
+            # synthesis was interrupted, nothing to export
+            return
         import json
         policies = self.policy_tree.extract_policies(self.quotient)
         policies_json = {}
@@ -0,0 +1,120 @@
+import paynt.synthesizer.statistic
+import paynt.synthesizer.synthesizer_multicore_ar
+from paynt.synthesizer.policy_tree import SynthesizerPolicyTree
+
+import os
+import queue
+import multiprocessing
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# global variables
+# when a new process is spawned (forked), it will inherit these variables from the parent
+synthesizer = None
+quotient = None
+prop = None
+# game abstraction solver of the worker process
+game_solver = None
+
+
+def init_worker():
+    global game_solver
+    game_solver = quotient.build_game_abstraction_solver(prop)
+
+def solve_leaf(packed, candidate_policy):
+    '''
+    Solve the family of a leaf and, if it cannot be decided, split it.
+    :param packed family of the leaf packed via Family.pack()
+    :param candidate_policy policy to be tried for the family instead of solving the game abstraction, or None
+    :return a tuple (policy, splitter, suboptions, subfamilies, counters), where policy is a satisfying policy, False
+        if all members are UNSAT, or None if the family was split; subfamilies are pairs of a packed family and its
+        candidate policy; counters are iteration counters of the worker
+    '''
+    family = quotient.family.assume_packed_options_copy(packed)
+    family.candidate_policy = candidate_policy
+    # fresh statistic to count iterations for this leaf only
+    synthesizer.stat = paynt.synthesizer.statistic.Statistic(synthesizer)
+    result = synthesizer.verify_family(family, game_solver, prop)
+    if result.policy is not None:
+        return (result.policy, None, None, None, synthesizer.stat.counters())
+    suboptions,subfamilies = synthesizer.split(family, prop, result.hole_selection, result.splitter, result.game_policy)
+    subfamilies = [(subfamily.pack(), subfamily.candidate_policy) for subfamily in subfamilies]
+    return (None, result.splitter, suboptions, subfamilies, synthesizer.stat.counters())
+
+
+class SynthesizerPolicyTreeMultiCore(SynthesizerPolicyTree):
+    '''
+    Policy tree synthesis where undecided leaves are solved by a pool of worker processes, each having its own game
+    abstraction solver. The coordinator keeps the policy tree and dispatches leaves in the DFS order; results of the
+    workers are merged into the tree as they arrive.
+    '''
+
+    # number of worker processes, os.cpu_count() if None
+    num_workers = None
+    # number of leaves dispatched per worker in advance to hide the IPC latency
+    leaves_per_worker = 2
+    # period (s) of checking the resource limits while waiting for the workers
+    poll_seconds = 1
+
+    @property
+    def method_name(self):
+        return "AR (policy tree, multicore)"
+
+    def expand_policy_tree(self, policy_tree, undecided_leaves, prop_, checkpoint):
+        global synthesizer, quotient, prop
+        synthesizer = self
+        quotient = self.quotient
+        prop = prop_
+
+        num_workers = SynthesizerPolicyTreeMultiCore.num_workers
+        if num_workers is None:
+            num_workers = os.cpu_count()
+        max_pending = num_workers * SynthesizerPolicyTreeMultiCore.leaves_per_worker
+
+        results = queue.SimpleQueue()
+        # leaves dispatched to the workers
+        pending = set()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes=num_workers, initializer=init_worker) as pool:
+            while undecided_leaves or pending:
+                if self.resource_limit_reached():
+                    checkpoint.save(policy_tree.pack(undecided_leaves + list(pending)))
+                    return False
+                if checkpoint.due():
+                    checkpoint.save(policy_tree.pack(undecided_leaves + list(pending)))
+
+                # keep every worker busy
+                while undecided_leaves and len(pending) < max_pending:
+                    node = undecided_leaves.pop(-1)
+                    family = node.family
+                    pool.apply_async(
+                        solve_leaf, (family.pack(), family.candidate_policy),
+                        callback=lambda result, node=node: results.put((node,result)),
+                        error_callback=lambda error, node=node: results.put((node,error))
+                    )
+                    family.candidate_policy = None
+                    pending.add(node)
+
+                # process the first available result
+                try:
+                    node,result = results.get(timeout=SynthesizerPolicyTreeMultiCore.poll_seconds)
+                except queue.Empty:
+                    continue
+                pending.remove(node)
+                if isinstance(result, BaseException):
+                    paynt.synthesizer.synthesizer_multicore_ar.raise_worker_error(pool, result)
+                policy,splitter,suboptions,subfamilies,counters = result
+                self.stat.add_counters(counters)
+                if policy is not None:
+                    self.decide_leaf(policy_tree, node, policy)
+                    continue
+                families = []
+                for packed,candidate_policy in subfamilies:
+                    subfamily = self.quotient.family.assume_packed_options_copy(packed)
+                    subfamily.candidate_policy = candidate_policy
+                    families.append(subfamily)
+                node.split(splitter, suboptions, families)
+                undecided_leaves += node.child_nodes
+        return True
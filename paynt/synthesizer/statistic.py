@@ -5,6 +5,7 @@ import paynt.synthesizer.synthesizer
 import paynt.models.models
 
 import math
+import json
 
 import logging
 logger = logging.getLogger(__name__)
@@ -29,6 +30,12 @@ class Statistic:
     # parameters
     status_period_seconds = 3
     synthesis_timer_total = paynt.utils.timer.Timer()
+    # if set, synthesis metrics will be appended to this file as JSON lines every status period
+    metrics_export_path = None
+    # iteration counters that are stored in checkpoints
+    COUNTERS = [
+        "iterations_dtmc", "acc_size_dtmc", "iterations_mdp", "acc_size_mdp", "iterations_game", "acc_size_game"
+    ]
     
     def __init__(self, synthesizer):
         
@@ -61,6 +68,8 @@ class Statistic:
         self.family_size = None
         self.synthesis_timer = paynt.utils.timer.Timer()
         self.status_horizon = Statistic.status_period_seconds
+        # phase timers at the start of the synthesis
+        self.phase_snapshot = None
 
 
     def start(self, family):
@@ -69,6 +78,7 @@ class Statistic:
         self.synthesis_timer.start()
         if not self.synthesis_timer_total.running:
             self.synthesis_timer_total.start()
+        self.phase_snapshot = paynt.utils.timer.PhaseTimer.snapshot()
     
     def iteration(self, model):
         ''' Identify the type of the model and count corresponding iteration. '''
@@ -102,6 +112,26 @@ class Statistic:
         self.acc_size_game += size_game
         self.print_status()
 
+    def counters(self):
+        ''' Collect iteration counters and the elapsed synthesis time, e.g. to store them in a checkpoint. '''
+        counters = {attr: getattr(self, attr) for attr in Statistic.COUNTERS}
+        counters["time"] = self.synthesis_timer.read()
+        return counters
+
+    def restore_counters(self, counters):
+        ''' Restore counters collected via counters(), the elapsed time is added to the synthesis timer. '''
+        for attr in Statistic.COUNTERS:
+            setattr(self, attr, counters[attr])
+        self.synthesis_timer.time += counters["time"]
+
+    def add_counters(self, counters):
+        ''' Add iteration counters collected via counters() in another process. '''
+        for attr in Statistic.COUNTERS:
+            if counters[attr] is None:
+                continue
+            setattr(self, attr, (getattr(self, attr) or 0) + counters[attr])
+        self.print_status()
+
     def new_fsc_found(self, value, assignment, size):
         time_elapsed = round(self.synthesis_timer_total.read(),1)
         # print(f'new opt: {value}')
@@ -160,18 +190,69 @@ class Statistic:
         if not self.synthesis_timer.read() > self.status_horizon:
             return
         print(self.status(), flush=True)
+        self.export_metrics("status")
         self.status_horizon = self.synthesis_timer.read() + Statistic.status_period_seconds
 
+    def metrics(self):
+        ''' Collect current synthesis metrics in a JSON-serializable dictionary. '''
+        iterations = {}
+        avg_size = {}
+        for model_type,iters,acc_size in [
+            ("game", self.iterations_game, self.acc_size_game),
+            ("mdp", self.iterations_mdp, self.acc_size_mdp),
+            ("dtmc", self.iterations_dtmc, self.acc_size_dtmc)
+        ]:
+            if iters is None:
+                continue
+            iterations[model_type] = iters
+            avg_size[model_type] = safe_division(acc_size, iters)
+
+        optimum = None
+        spec = self.quotient.specification
+        if spec.has_optimality:
+            optimum = self.synthesizer.best_assignment_value
+            if optimum is None:
+                optimum = spec.optimality.optimum
+            if optimum is not None:
+                optimum = float(optimum)
+
+        explored = None
+        if self.synthesizer.explored is not None and self.family_size is not None:
+            explored = safe_division(self.synthesizer.explored, self.family_size)
+
+        return {
+            "time": self.synthesis_timer.read(),
+            "method": self.synthesizer.method_name,
+            "explored": explored,
+            "iterations": iterations,
+            "avg_size": avg_size,
+            "optimum": optimum,
+            "feasible": self.synthesizer.best_assignment is not None,
+            "memory_rss_mb": paynt.utils.timer.GlobalMemoryLimit.allocated_mb(),
+            "phases": paynt.utils.timer.PhaseTimer.summary(since=self.phase_snapshot),
+        }
+
+    def export_metrics(self, event):
+        ''' Append a record of the current metrics to the metrics file, which is closed right after writing. '''
+        if Statistic.metrics_export_path is None:
+            return
+        record = {"event": event}
+        record.update(self.metrics())
+        with open(Statistic.metrics_export_path, "a") as metrics_file:
+            metrics_file.write(json.dumps(record) + "\n")
+
 
     def finished_synthesis(self):
         self.job_type = "synthesis"
         self.synthesis_timer.stop()
         self.synthesized_assignment = self.synthesizer.best_assignment
+        self.export_metrics("finished_synthesis")
 
     def finished_evaluation(self, evaluations):
         self.job_type = "evaluation"
         self.synthesis_timer.stop()
         self.evaluations = evaluations
+        self.export_metrics("finished_evaluation")
         
 
     def get_summary_specification(self):
@@ -199,8 +280,28 @@ class Statistic:
             avg_size = round(safe_division(self.acc_size_dtmc, self.iterations_dtmc))
             type_stats = f"DTMC stats: avg DTMC size: {avg_size}, iterations: {self.iterations_dtmc}"
             iterations += f"{type_stats}\n"
+
+        cache = self.quotient.dtmc_cache
+        if cache.hits + cache.misses > 0:
+            hit_rate = round(safe_division(cache.hits, cache.hits + cache.misses) * 100, 1)
+            cache_stats = f"DTMC cache: hits: {cache.hits}, misses: {cache.misses} ({hit_rate}% hits), evictions: {cache.evictions}"
+            iterations += f"{cache_stats}\n"
         return iterations
 
+    def get_summary_phases(self):
+        phase_summary = paynt.utils.timer.PhaseTimer.summary(since=self.phase_snapshot)
+        if not phase_summary:
+            return ""
+        phases = "phases:\n"
+        for phase in sorted(phase_summary.keys()):
+            time = phase_summary[phase]["time"]
+            percentage = round(safe_division(time, self.synthesis_timer.read()) * 100, 1)
+            calls = phase_summary[phase]["calls"]
+            indent = "  " * (phase.count("/") + 1)
+            name = phase.split("/")[-1]
+            phases += f"{indent}{name}: {round(time, 2)} s ({percentage} %), calls: {calls}\n"
+        return phases
+
     def get_summary_synthesis(self):
         spec = self.quotient.specification
         if spec.has_optimality and spec.optimality.optimum is not None:
@@ -234,6 +335,7 @@ class Statistic:
         timing = f"method: {self.synthesizer.method_name}, synthesis time: {round(self.synthesis_timer.time, 2)} s"
 
         iterations = self.get_summary_iterations()
+        phases = self.get_summary_phases()
         
         if self.job_type == "synthesis":
             result = self.get_summary_synthesis()
@@ -244,7 +346,7 @@ class Statistic:
         summary = f"{sep}"\
                 f"Synthesis summary:\n" \
                 f"{specification}\n{timing}\n{design_space}\n{explored}\n" \
-                f"{iterations}\n{result}\n"\
+                f"{iterations}{phases}\n{result}\n"\
                 f"{sep}"
         return summary
     
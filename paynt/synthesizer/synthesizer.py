@@ -19,6 +19,9 @@ class Synthesizer:
     # base filename (i.e. without extension) to export synthesis result
     export_synthesis_filename_base = None
 
+    # if set, this callback is invoked with every new best assignment
+    assignment_listener = None
+
     @staticmethod
     def choose_synthesizer(quotient, method, fsc_synthesis=False, storm_control=None):
 
@@ -30,12 +33,16 @@ class Synthesizer:
         import paynt.synthesizer.synthesizer_onebyone
         import paynt.synthesizer.synthesizer_ar
         import paynt.synthesizer.synthesizer_cegis
+        import paynt.synthesizer.synthesizer_cegis_multicore
         import paynt.synthesizer.synthesizer_hybrid
         import paynt.synthesizer.synthesizer_multicore_ar
+        import paynt.synthesizer.synthesizer_portfolio
+        import paynt.synthesizer.synthesizer_distributed_ar
         import paynt.synthesizer.synthesizer_pomdp
         import paynt.synthesizer.synthesizer_decpomdp
         import paynt.synthesizer.synthesizer_posmg
         import paynt.synthesizer.policy_tree
+        import paynt.synthesizer.policy_tree_multicore
 
         from paynt.dt import DtColoredMdpFactory, DtSynthesizer
 
@@ -54,6 +61,8 @@ class Synthesizer:
         if isinstance(quotient, paynt.quotient.mdp_family.MdpFamilyQuotient):
             if method == "onebyone":
                 return paynt.synthesizer.synthesizer_onebyone.SynthesizerOneByOne(quotient)
+            elif method == "ar_multicore":
+                return paynt.synthesizer.policy_tree_multicore.SynthesizerPolicyTreeMultiCore(quotient)
             else:
                 return paynt.synthesizer.policy_tree.SynthesizerPolicyTree(quotient)
         # FSC synthesis for POSMGs
@@ -67,10 +76,16 @@ class Synthesizer:
             return paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient)
         if method == "cegis":
             return paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS(quotient)
+        if method == "cegis_multicore":
+            return paynt.synthesizer.synthesizer_cegis_multicore.SynthesizerCEGISMultiCore(quotient)
         if method == "hybrid":
             return paynt.synthesizer.synthesizer_hybrid.SynthesizerHybrid(quotient)
         if method == "ar_multicore":
             return paynt.synthesizer.synthesizer_multicore_ar.SynthesizerMultiCoreAR(quotient)
+        if method == "ar_distributed":
+            return paynt.synthesizer.synthesizer_distributed_ar.SynthesizerDistributedAR(quotient)
+        if method == "portfolio":
+            return paynt.synthesizer.synthesizer_portfolio.SynthesizerPortfolio(quotient)
         raise ValueError("invalid method name")
 
 
@@ -87,6 +102,16 @@ class Synthesizer:
         ''' to be overridden '''
         pass
 
+    @property
+    def best_assignment(self):
+        return self._best_assignment
+
+    @best_assignment.setter
+    def best_assignment(self, assignment):
+        self._best_assignment = assignment
+        if assignment is not None and self.assignment_listener is not None:
+            self.assignment_listener(assignment)
+
     def time_limit_reached(self):
         if (self.synthesis_timer is not None and self.synthesis_timer.time_limit_reached()) or \
             paynt.utils.timer.GlobalTimer.time_limit_reached():
@@ -1,17 +1,64 @@
 import paynt.quotient.posmg
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.checkpoint
+import paynt.synthesizer.frontier
 import paynt.quotient.pomdp
 import paynt.verification.property_result
+import paynt.utils.timer
 
 import logging
 logger = logging.getLogger(__name__)
 
 class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
 
+    # strategy for choosing the next family to explore, see Frontier.create()
+    frontier_strategy = "dfs"
+    # if True, assignments induced by consistent schedulers are double-checked directly on the quotient (if the
+    # specification allows it) instead of constructing their DTMCs; assignments that cannot be decided this way, e.g.
+    # those improving the optimum, are still checked on their DTMCs, and assignments attaining an MDP bound that
+    # improves the optimum are checked on their DTMCs right away
+    double_check_in_place = False
+
     @property
     def method_name(self):
         return "AR"
 
+    def model_check_property(self, family, model, prop, alt=False):
+        ''' Model check the property, warm-started with the values obtained for the parent family if available. '''
+        with paynt.utils.timer.PhaseTimer.phase("mdp", fine_grained=True):
+            return self.model_check_property_warm(family, model, prop, alt)
+
+    def model_check_property_warm(self, family, model, prop, alt):
+        parent_info = family.parent_info
+        if model is not family.mdp or parent_info is None or parent_info.result_hints is None:
+            return model.model_check_property(prop, alt)
+        parent_result = parent_info.result_hints.get((prop,alt))
+        if parent_result is None:
+            return model.model_check_property(prop, alt)
+        if parent_info.result_hints_state_index is None:
+            parent_info.result_hints_state_index = {
+                state:index for index,state in enumerate(parent_info.result_hints_state_map)
+            }
+        result_hint = family.mdp.values_from_parent(parent_result, parent_info.result_hints_state_index)
+        return model.model_check_property(prop, alt, result_hint)
+
+    def check_assignment(self, assignment, in_place=True):
+        '''
+        Double-check the specification on the DTMC induced by a consistent scheduler.
+        :param in_place if False, the DTMC is always constructed, e.g. when the assignment is expected to improve the
+            optimum, which the in-place check leaves undecided
+        '''
+        spec = self.quotient.specification
+        if in_place and SynthesizerAR.double_check_in_place and not isinstance(self.quotient, paynt.quotient.posmg.PosmgQuotient) \
+                and self.quotient.supports_choice_mask_checking(spec) and self.quotient.cached_assignment(assignment) is None:
+            with paynt.utils.timer.PhaseTimer.phase("dtmc in place", fine_grained=True):
+                result = self.quotient.check_assignment_in_place(assignment, spec)
+            if result is not None:
+                return result
+        with paynt.utils.timer.PhaseTimer.phase("dtmc", fine_grained=True):
+            dtmc = self.quotient.build_assignment(assignment)
+            return dtmc.check_specification(self.quotient.specification)
+
     def check_specification(self, family):
         ''' Check specification for mdp or smg based on self.quotient '''
         mdp = family.mdp
@@ -33,23 +80,23 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
             results[index] = result
 
             # check primary direction
-            result.primary = model.model_check_property(constraint)
+            result.primary = self.model_check_property(family, model, constraint)
             if result.primary.sat is False:
                 result.sat = False
                 break
 
             # check if the primary scheduler is consistent
-            result.primary_selection,consistent = self.quotient.scheduler_is_consistent(mdp, constraint, result.primary.result)
+            with paynt.utils.timer.PhaseTimer.phase("consistency", fine_grained=True):
+                result.primary_selection,consistent = self.quotient.scheduler_is_consistent(mdp, constraint, result.primary.result)
             if consistent:
                 assignment = family.assume_options_copy(result.primary_selection)
-                dtmc = self.quotient.build_assignment(assignment)
-                res = dtmc.check_specification(self.quotient.specification)
+                res = self.check_assignment(assignment)
                 if res.accepting_dtmc(self.quotient.specification):
                     result.sat = True
                     admissible_assignment = assignment
 
             # primary direction is SAT: check secondary direction to see whether all SAT
-            result.secondary = model.model_check_property(constraint, alt=True)
+            result.secondary = self.model_check_property(family, model, constraint, alt=True)
             if mdp.is_deterministic and result.primary.value != result.secondary.value:
                 logger.warning("WARNING: model is deterministic but min<max")
             if result.secondary.sat:
@@ -65,20 +112,21 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
             result = paynt.verification.property_result.MdpOptimalityResult(opt)
 
             # check primary direction
-            result.primary = model.model_check_property(opt)
+            result.primary = self.model_check_property(family, model, opt)
             if not result.primary.improves_optimum:
                 # OPT <= LB
                 result.can_improve = False
             else:
                 # LB < OPT, check if LB is tight
-                result.primary_selection,consistent = self.quotient.scheduler_is_consistent(mdp, opt, result.primary.result)
+                with paynt.utils.timer.PhaseTimer.phase("consistency", fine_grained=True):
+                    result.primary_selection,consistent = self.quotient.scheduler_is_consistent(mdp, opt, result.primary.result)
                 result.can_improve = True
                 if consistent:
-                    # LB < OPT and it's tight, double-check the constraints and the value on the DTMC
+                    # LB < OPT and it's tight, double-check the constraints and the value on the DTMC; the assignment
+                    # attains the bound improving the optimum, hence it is not checked in place
                     result.can_improve = False
                     assignment = family.assume_options_copy(result.primary_selection)
-                    dtmc = self.quotient.build_assignment(assignment)
-                    res = dtmc.check_specification(self.quotient.specification)
+                    res = self.check_assignment(assignment, in_place=False)
                     if res.constraints_result.sat and spec.optimality.improves_optimum(res.optimality_result.value):
                         result.improving_assignment = assignment
                         result.improving_value = res.optimality_result.value
@@ -88,7 +136,8 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
         family.analysis_result = spec_result
 
     def verify_family(self, family):
-        self.quotient.build(family)
+        with paynt.utils.timer.PhaseTimer.phase("build"):
+            self.quotient.build(family)
 
         # TODO include iteration_game in iteration? is it necessary?
         if isinstance(self.quotient, paynt.quotient.posmg.PosmgQuotient):
@@ -96,7 +145,22 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
         else:
             self.stat.iteration(family.mdp)
 
-        self.check_specification(family)
+        with paynt.utils.timer.PhaseTimer.phase("model check"):
+            self.check_specification(family)
+
+    def bound_improves_optimum(self, bound):
+        ''' :return False if the bound on the optimality value shows that the current optimum cannot be improved '''
+        spec = self.quotient.specification
+        return bound is None or not spec.has_optimality or spec.optimality.improves_optimum(bound)
+
+    def parent_bound_improves_optimum(self, family):
+        '''
+        Cheap pre-check of a family using the bound of its parent: the optimum might have improved since the family
+        was created, in which case the family can be discarded without building its MDP.
+        '''
+        if family.parent_info is None:
+            return True
+        return self.bound_improves_optimum(family.parent_info.optimality_bound)
 
     def update_optimum(self, family):
         ia = family.analysis_result.improving_assignment
@@ -116,11 +180,25 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
             self.stat.new_fsc_found(family.analysis_result.improving_value, ia, self.quotient.policy_size(ia))
 
     def synthesize_one(self, family):
-        families = [family]
+        checkpoint = paynt.synthesizer.checkpoint.Checkpoint(self, family)
+        families = paynt.synthesizer.frontier.Frontier.create(SynthesizerAR.frontier_strategy)
+        packed_families = checkpoint.load()
+        if packed_families is not None:
+            families.push([family.assume_packed_options_copy(packed) for packed in packed_families])
+        else:
+            families.push([family])
         while families:
             if self.resource_limit_reached():
-                break
-            family = families.pop(-1)
+                checkpoint.save([family.pack() for family in families])
+                return self.best_assignment
+            if checkpoint.due():
+                checkpoint.save([family.pack() for family in families])
+            family = families.pop()
+            if not self.parent_bound_improves_optimum(family):
+                if family.parent_info is not None:
+                    family.parent_info.release_subfamily()
+                self.explore(family)
+                continue
             self.verify_family(family)
             self.update_optimum(family)
             if not self.quotient.specification.has_optimality and self.best_assignment is not None:
@@ -130,6 +208,8 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
                 self.explore(family)
                 continue
             # undecided
-            subfamilies = self.quotient.split(family)
-            families = families + subfamilies
+            with paynt.utils.timer.PhaseTimer.phase("split"):
+                subfamilies = self.quotient.split(family)
+            families.push(subfamilies, parent=family)
+        checkpoint.remove()
         return self.best_assignment
@@ -101,6 +101,8 @@ class SynthesizerCEGIS(paynt.synthesizer.synthesizer.Synthesizer):
             conflicts, accepting_assignment = self.analyze_family_assignment_cegis(family, assignment)
             if accepting_assignment is not None:
                 self.best_assignment = accepting_assignment
+                if self.quotient.specification.has_optimality:
+                    self.best_assignment_value = self.quotient.specification.optimality.optimum
                 if not self.quotient.specification.can_be_improved():
                     return self.best_assignment
 
@@ -0,0 +1,122 @@
+import paynt.synthesizer.statistic
+import paynt.synthesizer.synthesizer_multicore_ar
+from paynt.synthesizer.synthesizer_cegis import SynthesizerCEGIS
+import paynt.synthesizer.conflict_generator.dtmc
+import paynt.family.smt
+
+import os
+import multiprocessing
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# global variables
+# when a new process is spawned (forked), it will inherit these variables from the parent
+synthesizer = None
+quotient = None
+# family explored by CEGIS
+cegis_family = None
+
+
+def init_worker():
+    # workers already run in parallel, each constructs its conflicts in a single thread
+    paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc.num_threads = 1
+
+def check_assignment(packed, optimum):
+    '''
+    Model check the DTMC of an assignment and construct conflicts for the violated properties.
+    :param packed assignment packed via Family.pack()
+    :param optimum the optimum known to the coordinator, or None
+    :return a tuple (conflicts, accepting, improving value, counters), where counters are iteration counters of the
+        worker
+    '''
+    assignment = cegis_family.assume_packed_options_copy(packed)
+    optimality = quotient.specification.optimality
+    if optimum is not None and optimality.improves_optimum(optimum):
+        optimality.update_optimum(optimum)
+    # fresh statistic to count iterations for this assignment only
+    synthesizer.stat = paynt.synthesizer.statistic.Statistic(synthesizer)
+    conflicts, accepting_assignment = synthesizer.analyze_family_assignment_cegis(cegis_family, assignment)
+    accepting = accepting_assignment is not None
+    improving_value = None
+    if accepting and quotient.specification.has_optimality:
+        # accepting assignment improved the optimum
+        improving_value = optimality.optimum
+    conflicts = [list(conflict) for conflict in conflicts]
+    return (conflicts, accepting, improving_value, synthesizer.stat.counters())
+
+
+class SynthesizerCEGISMultiCore(SynthesizerCEGIS):
+    '''
+    CEGIS where each SMT call picks a batch of distinct assignments whose DTMCs are then model checked, and whose
+    conflicts are constructed, by a pool of worker processes. Conflicts of the whole batch are excluded together
+    before the next batch is picked.
+    @note conflicts constructed by a worker wrt an outdated optimum are weaker but still sound
+    '''
+
+    # number of worker processes, os.cpu_count() if None
+    num_workers = None
+    # number of assignments picked per worker in a single SMT call
+    assignments_per_worker = 2
+    # period (s) of checking the resource limits while waiting for the workers
+    poll_seconds = 1
+
+    @property
+    def method_name(self):
+        return "CEGIS " + self.conflict_generator.name + " (multicore)"
+
+    def synthesize_one(self, family):
+        global synthesizer, quotient, cegis_family
+
+        # build the quotient, map mdp states to hole indices
+        self.quotient.build(family)
+        self.conflict_generator.initialize()
+        smt_solver = paynt.family.smt.SmtSolver(self.quotient.family)
+
+        synthesizer = self
+        quotient = self.quotient
+        cegis_family = family
+        num_workers = SynthesizerCEGISMultiCore.num_workers
+        if num_workers is None:
+            num_workers = os.cpu_count()
+        batch_size = num_workers * SynthesizerCEGISMultiCore.assignments_per_worker
+        specification = self.quotient.specification
+
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes=num_workers, initializer=init_worker) as pool:
+            # CEGIS loop
+            assignments = smt_solver.pick_assignments(family, batch_size)
+            while assignments:
+                if self.resource_limit_reached():
+                    break
+                optimum = specification.optimality.optimum if specification.has_optimality else None
+                pending = pool.starmap_async(check_assignment, [(assignment.pack(), optimum) for assignment in assignments])
+                results = None
+                while results is None and not self.resource_limit_reached():
+                    try:
+                        results = pending.get(timeout=SynthesizerCEGISMultiCore.poll_seconds)
+                    except multiprocessing.TimeoutError:
+                        continue
+                    except Exception as error:
+                        paynt.synthesizer.synthesizer_multicore_ar.raise_worker_error(pool, error)
+                if results is None:
+                    break
+
+                for assignment,result in zip(assignments,results):
+                    conflicts,accepting,improving_value,counters = result
+                    self.stat.add_counters(counters)
+                    if improving_value is not None and specification.optimality.improves_optimum(improving_value):
+                        specification.optimality.update_optimum(improving_value)
+                        self.best_assignment = assignment
+                        self.best_assignment_value = improving_value
+                    elif accepting and not specification.has_optimality:
+                        self.best_assignment = assignment
+                    if self.best_assignment is not None and not specification.can_be_improved():
+                        return self.best_assignment
+                    pruned = smt_solver.exclude_conflicts(family, assignment, conflicts)
+                    self.explored += pruned
+
+                # construct next assignments
+                assignments = smt_solver.pick_assignments(family, batch_size)
+        return self.best_assignment
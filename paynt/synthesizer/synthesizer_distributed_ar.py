@@ -0,0 +1,288 @@
+from paynt.synthesizer.synthesizer_ar import SynthesizerAR
+
+import collections
+import ipaddress
+import multiprocessing
+import multiprocessing.connection
+import queue
+import secrets
+import socket
+import threading
+import time
+import traceback
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# key authenticating workers if the coordinator listens on a loopback interface and no key is given
+DEFAULT_AUTHKEY = b"paynt"
+
+
+def is_loopback(address):
+    ''' :return whether the host of the address resolves to a loopback interface '''
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(address[0])).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def check_authkey(address, authkey):
+    '''
+    Messages are pickled, so anyone knowing the key can execute code on the coordinator and on the workers: outside
+    of the loopback interface, the key must be given explicitly and must differ from the default one.
+    :return the key to be used
+    '''
+    if is_loopback(address):
+        return authkey if authkey is not None else DEFAULT_AUTHKEY
+    if authkey is None:
+        raise ValueError(f"an authentication key is required when communicating over {address[0]}")
+    if authkey == DEFAULT_AUTHKEY:
+        raise ValueError(f"refusing the default authentication key when communicating over {address[0]}")
+    return authkey
+
+
+def coordinator_authkey(address, authkey):
+    '''
+    :return the key authenticating workers of the coordinator, a random key is generated if none is given and the
+        coordinator does not listen on a loopback interface
+    '''
+    if authkey is None and not is_loopback(address):
+        authkey = secrets.token_hex(16).encode()
+        logger.warning(f"generated authentication key {authkey.decode()}, pass it to the workers")
+    return check_authkey(address, authkey)
+
+
+def family_signature(quotient):
+    ''' Identification of the design space used to check that the coordinator and a worker load the same sketch. '''
+    family = quotient.family
+    return (family.hole_to_name, family.pack(), quotient.quotient_mdp.nr_states, quotient.quotient_mdp.nr_choices)
+
+
+def solve_family(synthesizer, packed, optimum):
+    '''
+    Build the quotient, analyze it and, if necessary, split into subfamilies.
+    :param optimum the best optimum known to the coordinator, or None
+    '''
+    quotient = synthesizer.quotient
+    family = quotient.family.assume_packed_options_copy(packed)
+    if optimum is not None and quotient.specification.optimality.improves_optimum(optimum):
+        quotient.specification.optimality.update_optimum(optimum)
+
+    quotient.build(family)
+    synthesizer.check_specification(family)
+    res = family.analysis_result
+    improving_assignment = res.improving_assignment
+    if improving_assignment is not None:
+        improving_assignment = improving_assignment.pack()
+
+    subfamilies = []
+    if res.can_improve:
+        subfamilies = quotient.split(family)
+    explored = family.size - sum([subfamily.size for subfamily in subfamilies])
+    subfamilies = [subfamily.pack() for subfamily in subfamilies]
+    return (explored, family.mdp.states, res.improving_value, improving_assignment, subfamilies)
+
+
+def run_worker(quotient, address=None, authkey=None):
+    '''
+    Connect to the coordinator and solve families it sends until it asks the worker to stop.
+    :param quotient quotient of the same sketch as the one loaded by the coordinator
+    '''
+    if address is None:
+        address = SynthesizerDistributedAR.address
+    if authkey is None:
+        authkey = SynthesizerDistributedAR.authkey
+    authkey = check_authkey(address, authkey)
+    synthesizer = SynthesizerAR(quotient)
+    logger.info(f"connecting to the coordinator at {address[0]}:{address[1]} ...")
+    connect_start = time.time()
+    while True:
+        try:
+            connection = multiprocessing.connection.Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            # the coordinator might still be loading the sketch
+            if time.time() - connect_start > SynthesizerDistributedAR.connect_timeout:
+                raise
+            time.sleep(0.5)
+    with connection:
+        connection.send(("hello", family_signature(quotient)))
+        num_families = 0
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                logger.info("coordinator closed the connection")
+                break
+            if message[0] == "stop":
+                break
+            if message[0] == "reject":
+                logger.error("coordinator rejected the worker, is the same sketch loaded?")
+                break
+            _,packed,optimum = message
+            try:
+                result = solve_family(synthesizer, packed, optimum)
+            except Exception:
+                # let the coordinator fail instead of handing the family to the next worker
+                logger.error("worker failed to solve a family")
+                connection.send(("error", traceback.format_exc()))
+                raise
+            connection.send(("result", result))
+            num_families += 1
+    logger.info(f"worker finished after solving {num_families} families")
+
+
+class SynthesizerDistributedAR(SynthesizerAR):
+    '''
+    AR distributed over workers that may run on other machines. Each worker loads the same sketch, connects to the
+    coordinator over TCP (see run_worker()) and repeatedly receives a family packed via Family.pack() together with
+    the best known optimum; it answers with the number of explored members, the size of the MDP, the improving value
+    and assignment and the packed subfamilies, or with the traceback of an error, which the coordinator re-raises.
+    The coordinator keeps all undecided families in a single stack.
+    '''
+
+    # address on which the coordinator listens and to which workers connect
+    address = ("localhost", 6000)
+    # key authenticating the workers, the messages are pickled, so only trusted workers may know it; if None, the
+    # default key is used on a loopback interface and a random one is generated otherwise, see coordinator_authkey()
+    authkey = None
+    # number of families dispatched per worker in advance to hide the network latency
+    families_per_worker = 2
+    # time (s) for which a worker keeps retrying to connect to the coordinator
+    connect_timeout = 60
+    # time (s) within which a connected worker has to identify itself, otherwise it is dropped
+    handshake_timeout = 10
+
+    @property
+    def method_name(self):
+        return "AR (distributed)"
+
+    def accept_workers(self, listener, connections, signature):
+        '''
+        Accept incoming connections of workers that loaded the same sketch, to be run in a separate thread such that
+        the handshakes do not block the coordinator.
+        :param signature family_signature() of the quotient of the coordinator
+        '''
+        while True:
+            try:
+                connection = listener.accept()
+            except multiprocessing.AuthenticationError:
+                logger.warning("a worker failed to authenticate")
+                continue
+            except OSError:
+                # the listener was closed
+                return
+            if self.register_worker(connection, signature):
+                connections.put(connection)
+
+    def register_worker(self, connection, signature):
+        ''' Check that the worker loaded the same sketch. '''
+        try:
+            if not connection.poll(SynthesizerDistributedAR.handshake_timeout):
+                logger.warning("a worker did not identify itself in time, dropping...")
+                connection.close()
+                return False
+            message = connection.recv()
+        except (EOFError,OSError):
+            connection.close()
+            return False
+        if message[0] != "hello" or message[1] != signature:
+            logger.warning("a worker with a different sketch tried to connect, rejecting...")
+            connection.send(("reject",))
+            connection.close()
+            return False
+        return True
+
+    def raise_worker_error(self, worker_traceback):
+        ''' Re-raise an error a worker encountered while solving a family. '''
+        logger.error("Worker encountered an error.")
+        raise RuntimeError(f"worker failed to solve a family:\n{worker_traceback}")
+
+    def drop_worker(self, connection, dispatched, families):
+        ''' Forget a disconnected worker, families dispatched to it have to be solved again. '''
+        logger.warning("worker disconnected, re-scheduling its families...")
+        families.extend(dispatched.pop(connection))
+        connection.close()
+
+    def update_optimum_distributed(self, improving_value, improving_assignment):
+        if improving_assignment is None:
+            return
+        assignment = self.quotient.family.assume_packed_options_copy(improving_assignment)
+        if not self.quotient.specification.has_optimality:
+            self.best_assignment = assignment
+            return
+        if not self.quotient.specification.optimality.improves_optimum(improving_value):
+            return
+        self.quotient.specification.optimality.update_optimum(improving_value)
+        self.best_assignment = assignment
+        self.best_assignment_value = improving_value
+
+    def synthesize_one(self, family):
+        address = SynthesizerDistributedAR.address
+        authkey = coordinator_authkey(address, SynthesizerDistributedAR.authkey)
+        listener = multiprocessing.connection.Listener(address, authkey=authkey)
+        logger.info(f"coordinator listening on {listener.address[0]}:{listener.address[1]}")
+        new_connections = queue.SimpleQueue()
+        signature = family_signature(self.quotient)
+        threading.Thread(target=self.accept_workers, args=(listener,new_connections,signature), daemon=True).start()
+
+        # DFS order: packed subfamilies are pushed to and popped from the right end of the stack
+        families = collections.deque([family.pack()])
+        # for each connected worker, families dispatched to it, in the order of dispatching
+        dispatched = {}
+        num_workers_connected = 0
+        try:
+            while families or any(dispatched.values()):
+                if self.resource_limit_reached():
+                    break
+                while not new_connections.empty():
+                    dispatched[new_connections.get()] = collections.deque()
+                    num_workers_connected += 1
+                    logger.info(f"worker connected, {len(dispatched)} workers in total")
+
+                # keep every worker busy
+                optimum = None
+                if self.quotient.specification.has_optimality:
+                    optimum = self.quotient.specification.optimality.optimum
+                for connection,pending in list(dispatched.items()):
+                    try:
+                        while families and len(pending) < SynthesizerDistributedAR.families_per_worker:
+                            connection.send(("family", families[-1], optimum))
+                            pending.append(families.pop())
+                    except OSError:
+                        self.drop_worker(connection, dispatched, families)
+
+                # process available results
+                ready = multiprocessing.connection.wait(list(dispatched.keys()), timeout=1) if dispatched else []
+                for connection in ready:
+                    try:
+                        message,result = connection.recv()
+                    except (EOFError,OSError):
+                        self.drop_worker(connection, dispatched, families)
+                        continue
+                    if message == "error":
+                        self.raise_worker_error(result)
+                    dispatched[connection].popleft()
+                    explored, mdp_states, improving_value, improving_assignment, subfamilies = result
+                    self.stat.iteration_mdp(mdp_states)
+                    self.update_optimum_distributed(improving_value, improving_assignment)
+                    self.explored += explored
+                    families.extend(subfamilies)
+                if not self.quotient.specification.has_optimality and self.best_assignment is not None:
+                    break
+                if not dispatched:
+                    if num_workers_connected > 0 and families:
+                        raise RuntimeError("all workers disconnected before the design space was explored")
+                    # no worker is connected yet
+                    time.sleep(0.1)
+        finally:
+            for connection in dispatched.keys():
+                try:
+                    connection.send(("stop",))
+                    connection.close()
+                except OSError:
+                    pass
+            listener.close()
+
+        return self.best_assignment
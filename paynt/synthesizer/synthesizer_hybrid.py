@@ -107,9 +107,6 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
             # choose family
             family = families.pop(-1)
 
-            # reset SMT solver level
-            smt_solver.level(family.refinement_depth)
-
             # analyze the family
             self.verify_family(family)
             self.update_optimum(family)
@@ -154,6 +151,9 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
 
                 # assignment is UNSAT: move on to the next assignment
 
+            # conflicts remain asserted in the solver, only the family encodings are disabled
+            smt_solver.release(family)
+            smt_solver.release(priority_subfamily)
             if family_explored:
                 continue
         
@@ -2,143 +2,185 @@ from paynt.synthesizer.synthesizer import Synthesizer
 from paynt.synthesizer.synthesizer_ar import SynthesizerAR
 
 import os
-import time
+import math
+import ctypes
+import queue
+import collections
 import multiprocessing
 
 import logging
 logger = logging.getLogger(__name__)
 
 
-import cProfile, pstats
-
 # global variables
 # when a new process is spawned (forked), it will inherit these variables from the parent
+synthesizer = None
 quotient = None
-profiler = None
+# optimum shared by the coordinator and all workers, NaN if no optimum is known yet
+shared_optimum = None
 
 # helper functions for family serialization
-def family_to_hole_options(family):
-    return [family.hole_options(hole) for hole in range(family.num_holes)]
+def pack_family(family):
+    return family.pack()
+
+def unpack_family(packed):
+    return quotient.family.assume_packed_options_copy(packed)
 
-def hole_options_to_family(hole_options):
-    family = quotient.family.copy()
-    for hole,options in enumerate(hole_options):
-        family.hole_set_options(hole,options)
-    return family
 
+def init_worker(optimum):
+    global shared_optimum
+    shared_optimum = optimum
 
-def solve_family(args):
+def raise_worker_error(pool, error):
     '''
-    Build the quotient, analyze it and, if necessary, split into subfamilies.
+    Terminate the pool after a worker sub-process failed and re-raise the exception of the worker.
+    @note the traceback of the worker is attached to the exception as its cause
     '''
-    try:
-
-        if args is None:
-            pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
-            return
-
-        hole_options, optimum = args
-        # re-construct the family
-        family = hole_options_to_family(hole_options)
-
-        # synchronize optimum
-        if optimum is not None:
-            quotient.specification.optimality.optimum = optimum
+    logger.error("Worker sub-process encountered an error.")
+    pool.terminate()
+    pool.join()
+    raise error
 
-        quotient.build(family)
-        quotient.check_specification_for_mdp(family)
-        res = family.analysis_result
-        improving_value = res.improving_value
-        improving_assignment = res.improving_assignment
-        if improving_assignment is not None:
-            improving_assignment = family_to_hole_options(improving_assignment)
-
-        subfamilies = []
-        if res.can_improve:
-            subfamilies = quotient.split(family)
-            subfamilies = [ family_to_hole_options(family) for family in subfamilies ]
-
-        return (family.mdp.states, improving_value, improving_assignment, subfamilies)
-
-    except:
-        logger.error("Worker sub-process encountered an error.")
-        return None
+def synchronize_optimum():
+    '''
+    Adopt the shared optimum if it improves the optimum known to this process.
+    :note the shared value must be locked by the caller
+    '''
+    value = shared_optimum.value
+    if math.isnan(value):
+        return
+    optimality = quotient.specification.optimality
+    if optimality.improves_optimum(value):
+        optimality.update_optimum(value)
+
+def publish_optimum(value):
+    ''' Broadcast the value to all processes if it improves the shared optimum. '''
+    with shared_optimum.get_lock():
+        current = shared_optimum.value
+        if math.isnan(current) or quotient.specification.optimality.op(value, current):
+            shared_optimum.value = value
+
+
+def solve_family(packed, bound):
+    '''
+    Build the quotient, analyze it and, if necessary, split into subfamilies.
+    :param bound optimality bound inherited from the parent family, or None
+    '''
+    # re-construct the family
+    family = unpack_family(packed)
+
+    # synchronize optimum
+    if quotient.specification.has_optimality:
+        with shared_optimum.get_lock():
+            synchronize_optimum()
+    if not synthesizer.bound_improves_optimum(bound):
+        # the optimum improved while the family was waiting
+        return (family.size, None, None, None, [])
+
+    quotient.build(family)
+    synthesizer.check_specification(family)
+    res = family.analysis_result
+    improving_value = res.improving_value
+    improving_assignment = res.improving_assignment
+    if improving_value is not None:
+        # let other workers prune wrt the new value before the coordinator processes this result
+        publish_optimum(improving_value)
+    if improving_assignment is not None:
+        improving_assignment = pack_family(improving_assignment)
+
+    subfamilies = []
+    if res.can_improve:
+        subfamilies = quotient.split(family)
+    explored = family.size - sum([subfamily.size for subfamily in subfamilies])
+    subfamilies = [ (pack_family(subfamily), subfamily.parent_info.optimality_bound) for subfamily in subfamilies ]
+
+    return (explored, family.mdp.states, improving_value, improving_assignment, subfamilies)
 
 
 
 class SynthesizerMultiCoreAR(SynthesizerAR):
 
+    # number of worker processes, os.cpu_count() if None
+    num_workers = None
+    # number of families dispatched per worker in advance to hide the IPC latency
+    families_per_worker = 2
+    # period (s) of checking the resource limits while waiting for the workers
+    poll_seconds = 1
+
     @property
     def method_name(self):
         return "AR (multicore)"
 
-    def synthesize_one(self, family):
-
-        satisfying_assignment = None
-        families = [family]
+    def update_optimum_multicore(self, improving_value, improving_assignment):
+        if improving_assignment is None:
+            return
+        if not self.quotient.specification.has_optimality:
+            self.best_assignment = unpack_family(improving_assignment)
+            return
+        if not self.quotient.specification.optimality.improves_optimum(improving_value):
+            return
+        self.quotient.specification.optimality.update_optimum(improving_value)
+        self.best_assignment = unpack_family(improving_assignment)
+        self.best_assignment_value = improving_value
+        publish_optimum(improving_value)
 
-        global quotient
+    def synthesize_one(self, family):
+        '''
+        Work-stealing AR: families are kept in a single shared stack and dispatched to the workers asynchronously, such
+        that each worker receives a new family as soon as it returns the previous one.
+        '''
+        global synthesizer, quotient
+        synthesizer = self
         quotient = self.quotient
-        profiling = False
-        if profiling:
-            global profiler
-            profiler = cProfile.Profile()
-            profiler.enable()
-
-        # create a pool of processes
-        # by default, os.cpu_count() processes will be spawned
-        with multiprocessing.Pool(
-            # processes=1
-        ) as pool:
-
-            while families:
-
-                # get current optimum
-                optimum = None
-                if self.quotient.specification.has_optimality:
-                    optimum = self.quotient.specification.optimality.optimum
-
-                # work with some number of families
-                # print("submitting ", len(families), " families")
-
-                split = os.cpu_count() * 1
-                input_families = families[-split:]
-                input_families_size = sum([family.size for family in input_families])
-                remaining_families = families[:-split]
-                input_families = [family_to_hole_options(family) for family in input_families]
-
-                inputs = zip(input_families, [optimum] * len(input_families))
-
-                results = pool.map(solve_family, inputs)
-                # results = pool.imap_unordered(solve_family, inputs, chunksize=10)
-                # results = pool.map(solve_batch, inputs)
-
-                # process the results
-                new_families = []
-                for r in results:
-                    if r is None:
-                        logger.error("Worker sub-process encountered an error.")
-                        exit()
-                    mdp_states, improving_value, improving_assignment, subfamilies_hole_options = r
-                    self.stat.iteration_mdp(mdp_states)
-
-                    if improving_value is not None:
-                        if self.quotient.specification.optimality.improves_optimum(improving_value):
-                            self.quotient.specification.optimality.update_optimum(improving_value)
-                            improving_assignment = hole_options_to_family(improving_assignment)
-                            satisfying_assignment = improving_assignment
 
-                    subfamilies = [hole_options_to_family(hole_options) for hole_options in subfamilies_hole_options]
-                    new_families += subfamilies
-
-                new_families_size = sum([family.size for family in new_families])
-                self.explored += input_families_size-new_families_size
-
-                families = remaining_families + new_families
+        optimum = multiprocessing.Value(ctypes.c_double, math.nan)
+        if self.quotient.specification.has_optimality and self.quotient.specification.optimality.optimum is not None:
+            optimum.value = self.quotient.specification.optimality.optimum
+        init_worker(optimum)
+
+        num_workers = SynthesizerMultiCoreAR.num_workers
+        if num_workers is None:
+            num_workers = os.cpu_count()
+        max_pending = num_workers * SynthesizerMultiCoreAR.families_per_worker
+
+        # DFS order: packed subfamilies and their bounds are pushed to and popped from the right end of the stack
+        families = collections.deque([(pack_family(family),None)])
+        results = queue.SimpleQueue()
+        pending = 0
+
+        with multiprocessing.Pool(processes=num_workers, initializer=init_worker, initargs=(optimum,)) as pool:
+            while families or pending > 0:
+                if self.resource_limit_reached():
+                    break
+
+                # keep every worker busy
+                while families and pending < max_pending:
+                    packed,bound = families.pop()
+                    if not self.bound_improves_optimum(bound):
+                        self.explored += unpack_family(packed).size
+                        continue
+                    pool.apply_async(solve_family, (packed,bound), callback=results.put, error_callback=results.put)
+                    pending += 1
+                if pending == 0:
+                    # all remaining families were pruned
+                    continue
+
+                # process the first available result
+                try:
+                    r = results.get(timeout=SynthesizerMultiCoreAR.poll_seconds)
+                except queue.Empty:
+                    continue
+                pending -= 1
+                if isinstance(r, BaseException):
+                    raise_worker_error(pool, r)
+                explored, mdp_states, improving_value, improving_assignment, subfamilies_packed = r
+                if mdp_states is not None:
+                    self.stat.iteration_mdp(mdp_states)
+                self.update_optimum_multicore(improving_value, improving_assignment)
+                if not self.quotient.specification.has_optimality and self.best_assignment is not None:
+                    break
 
-            if profiling:
-                pool.apply(solve_family, (None,))
+                self.explored += explored
+                families.extend(subfamilies_packed)
 
-        if profiling:
-            pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
-        return satisfying_assignment
+        return self.best_assignment
@@ -0,0 +1,174 @@
+from paynt.synthesizer.synthesizer import Synthesizer
+
+import ctypes
+import math
+import multiprocessing
+import multiprocessing.connection
+import traceback
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# global variables
+# when an engine process is forked, it will inherit these variables from the coordinator
+quotient = None
+# optimum shared by all engines, NaN if no optimum is known yet
+shared_optimum = None
+# connection of the engine process to the coordinator
+connection = None
+engine = None
+
+
+def report_assignment(assignment):
+    '''
+    Send the new best assignment of the engine to the coordinator and only then share the optimum, such that the
+    coordinator receives the assignment before any other engine can prune wrt its value.
+    '''
+    connection.send(("assignment", engine, assignment.pack()))
+    if quotient.specification.has_optimality:
+        quotient.specification.optimality.publish_optimum()
+
+
+def run_engine(method, family, engine_connection):
+    ''' Run the synthesis engine on the family and report the outcome to the coordinator. '''
+    global connection, engine
+    connection = engine_connection
+    engine = method
+    try:
+        if quotient.specification.has_optimality:
+            quotient.specification.optimality.share_optimum(shared_optimum)
+        synthesizer = Synthesizer.choose_synthesizer(quotient, method)
+        synthesizer.assignment_listener = report_assignment
+        synthesizer.synthesize(family, keep_optimum=True, print_stats=False)
+        # the search is complete only if it was not interrupted due to a resource limit
+        complete = not synthesizer.resource_limit_reached()
+        connection.send(("finished", engine, complete))
+    except Exception:
+        logger.exception(f"engine {method} encountered an error")
+        connection.send(("error", engine, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class SynthesizerPortfolio(Synthesizer):
+    '''
+    Races several synthesis engines, each in a separate process, on the same quotient. Engines share improvements of
+    the optimum and the synthesis stops as soon as one engine completes the search. If no engine completes the search
+    and some engine failed, the error of the engine is re-raised.
+    '''
+
+    # engines raced against each other
+    engines = ["ar", "cegis", "hybrid"]
+
+    def __init__(self, quotient):
+        super().__init__(quotient)
+        self.winner = None
+
+    @property
+    def method_name(self):
+        if self.winner is None:
+            return "portfolio"
+        return f"portfolio (won by {self.winner})"
+
+    def evaluate_assignment(self, assignment):
+        '''
+        :return whether the assignment satisfies the constraints and its optimality value (None if there is no
+            optimality objective)
+        '''
+        dtmc = self.quotient.build_assignment(assignment)
+        result = dtmc.check_specification(self.quotient.specification)
+        if not result.constraints_result.sat:
+            return False, None
+        if result.optimality_result is None:
+            return True, None
+        return True, result.optimality_result.value
+
+    def collect_best_assignment(self, candidates):
+        ''' Double-check the assignments reported by the engines and keep the best one. '''
+        optimality = self.quotient.specification.optimality
+        for packed in candidates:
+            assignment = self.quotient.family.assume_packed_options_copy(packed).pick_any()
+            accepting,value = self.evaluate_assignment(assignment)
+            if not accepting:
+                continue
+            if optimality is None:
+                self.best_assignment = assignment
+                return
+            if self.best_assignment_value is None or optimality.op(value, self.best_assignment_value):
+                self.best_assignment = assignment
+                self.best_assignment_value = value
+        if self.best_assignment_value is not None:
+            optimality.update_optimum(self.best_assignment_value)
+
+    def raise_engine_error(self, failures):
+        ''' Re-raise the errors of engines that failed. '''
+        logger.error("no engine completed the synthesis and some engines encountered an error")
+        errors = "\n".join([f"engine {method} failed:\n{engine_traceback}" for method,engine_traceback in failures.items()])
+        raise RuntimeError(errors)
+
+    def synthesize_one(self, family):
+        global quotient, shared_optimum
+        quotient = self.quotient
+        shared_optimum = multiprocessing.Value(ctypes.c_double, math.nan)
+        optimality = self.quotient.specification.optimality
+        if optimality is not None and optimality.optimum is not None:
+            shared_optimum.value = optimality.optimum
+
+        # engine processes inherit the quotient, hence forking
+        context = multiprocessing.get_context("fork")
+        readers = {}
+        processes = []
+        for method in SynthesizerPortfolio.engines:
+            reader,writer = context.Pipe(duplex=False)
+            process = context.Process(target=run_engine, args=(method,family,writer), daemon=True)
+            process.start()
+            writer.close()
+            readers[reader] = method
+            processes.append(process)
+        logger.info(f"portfolio started engines: {', '.join(SynthesizerPortfolio.engines)}")
+
+        candidates = []
+        # for each failed engine, the traceback of its error
+        failures = {}
+        while readers and self.winner is None:
+            if self.resource_limit_reached():
+                break
+            for reader in multiprocessing.connection.wait(list(readers.keys()), timeout=1):
+                try:
+                    message,method,payload = reader.recv()
+                except EOFError:
+                    del readers[reader]
+                    continue
+                if message == "assignment":
+                    candidates.append(payload)
+                    continue
+                del readers[reader]
+                if message == "error":
+                    logger.warning(f"engine {method} failed, continuing with the remaining engines")
+                    failures[method] = payload
+                if message == "finished" and payload and self.winner is None:
+                    self.winner = method
+                    logger.info(f"engine {method} completed the synthesis")
+
+        # assignments are reported before the optimum is shared, collect those still buffered in the pipes
+        for reader in readers.keys():
+            try:
+                while reader.poll():
+                    message,_,payload = reader.recv()
+                    if message == "assignment":
+                        candidates.append(payload)
+            except EOFError:
+                pass
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+        if self.winner is None and failures:
+            # the assignments found so far do not prove anything, report the error instead of a verdict
+            self.raise_engine_error(failures)
+        if self.winner is not None:
+            self.explored = family.size
+        self.collect_best_assignment(candidates)
+        return self.best_assignment
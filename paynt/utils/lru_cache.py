@@ -0,0 +1,59 @@
+import collections
+
+
+class LruCache:
+    '''
+    Least-recently-used cache bounded by the (estimated) memory occupied by its items and by their number.
+    '''
+
+    def __init__(self, memory_budget, max_items=None):
+        '''
+        :param memory_budget maximum total size of the cached items, in bytes
+        :param max_items maximum number of cached items, unbounded if None
+        '''
+        self.memory_budget = memory_budget
+        self.max_items = max_items
+        self.memory_used = 0
+        self.items = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        self.items.clear()
+        self.memory_used = 0
+
+    def get(self, key):
+        ''' :return the cached value or None if the key is not cached '''
+        item = self.items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(key)
+        return item[0]
+
+    def peek(self, key):
+        ''' :return the cached value or None if the key is not cached, without affecting the statistics or the order '''
+        item = self.items.get(key)
+        return None if item is None else item[0]
+
+    def put(self, key, value, size):
+        '''
+        Cache the value, evicting least recently used items to fit into the memory budget.
+        :param size estimated size of the value, in bytes; values larger than the budget are not cached
+        '''
+        if key in self.items:
+            self.memory_used -= self.items.pop(key)[1]
+        if size > self.memory_budget:
+            return
+        while self.memory_used + size > self.memory_budget or \
+                (self.max_items is not None and len(self.items) >= self.max_items):
+            _,(_,evicted_size) = self.items.popitem(last=False)
+            self.memory_used -= evicted_size
+            self.evictions += 1
+        self.items[key] = (value,size)
+        self.memory_used += size
@@ -1,6 +1,7 @@
 import time
 import psutil
 import os
+import contextlib
 
 class Timer:
 
@@ -39,6 +40,76 @@ class Timer:
     def time_limit_reached(self):
         return self.time_limit_seconds is not None and self.read() > self.time_limit_seconds
 
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class PhaseTimer:
+    '''
+    Named, nested timers with call counts measuring time spent in individual phases of the synthesis. A phase
+    started within another phase is identified by the path of names of the enclosing phases, e.g. "model check/mdp".
+    Timers are never reset: a synthesizer takes a snapshot when it starts and reports the phases measured since, such
+    that synthesizers running within other ones do not wipe out their timings.
+    '''
+
+    # if True, fine-grained phases will be measured as well
+    fine_grained = False
+
+    # for each phase path, its timer and the number of times the phase was entered
+    timers = {}
+    calls = {}
+    # paths of the phases being measured
+    active = []
+
+    @classmethod
+    def snapshot(cls):
+        ''' :return for each phase path, the time and the number of calls measured so far '''
+        return {path: (timer.read(), cls.calls[path]) for path,timer in cls.timers.items()}
+
+    @classmethod
+    def summary(cls, since=None):
+        '''
+        :param since if set, a snapshot of the timers; only phases measured after this snapshot are reported
+        :return for each phase path that was entered, a dictionary with its time and its number of calls
+        '''
+        summary = {}
+        for path,(time,calls) in cls.snapshot().items():
+            if since is not None and path in since:
+                time -= since[path][0]
+                calls -= since[path][1]
+            if calls > 0:
+                summary[path] = {"time": time, "calls": calls}
+        return summary
+
+    @classmethod
+    @contextlib.contextmanager
+    def phase(cls, name, fine_grained=False):
+        '''
+        Measure the phase, to be used as a context manager.
+        :param fine_grained if True, the phase is measured only if fine-grained phases are enabled
+        '''
+        if fine_grained and not cls.fine_grained:
+            yield
+            return
+        path = name if not cls.active else f"{cls.active[-1]}/{name}"
+        timer = cls.timers.get(path)
+        if timer is None:
+            timer = Timer()
+            cls.timers[path] = timer
+            cls.calls[path] = 0
+        cls.calls[path] += 1
+        cls.active.append(path)
+        timer.start()
+        try:
+            yield
+        finally:
+            timer.stop()
+            cls.active.pop()
+
 
 class GlobalTimer:
 
@@ -65,8 +136,11 @@ class GlobalMemoryLimit:
 
     memory_limit_mb = None
 
+    @staticmethod
+    def allocated_mb():
+        process = psutil.Process(os.getpid())
+        return process.memory_info().rss / (1024 * 1024)
+
     @classmethod
     def limit_reached(cls):
-        process = psutil.Process(os.getpid())
-        allocated_mb = process.memory_info().rss / (1024 * 1024)
-        return cls.memory_limit_mb is not None and allocated_mb > cls.memory_limit_mb
+        return cls.memory_limit_mb is not None and cls.allocated_mb() > cls.memory_limit_mb
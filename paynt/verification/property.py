@@ -3,6 +3,12 @@ import payntbind
 import math
 import operator
 
+# numpy is an optional dependency used to access model checking results without copying
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -83,14 +89,28 @@ class Property:
             se.minmax_solver_environment.method = stormpy.MinMaxMethod.optimistic_value_iteration
 
     @classmethod
-    def model_check(cls, model, formula):
-        return stormpy.model_checking(model, formula, extract_scheduler=True, environment=cls.environment)
+    def model_check(cls, model, formula, result_hint=None):
+        '''
+        :param result_hint if set, state values used to warm-start the solver; only MDPs over doubles are supported
+        '''
+        if result_hint is None or model.is_exact:
+            return stormpy.model_checking(model, formula, extract_scheduler=True, environment=cls.environment)
+        return payntbind.synthesis.verify_mdp(cls.environment, model, formula, True, result_hint)
 
     @classmethod
     def compute_expected_visits(cls, model):
         result = stormpy.compute_expected_number_of_visits(cls.environment, model)
-        values = list(result.get_values())
-        return values
+        return cls.result_values(result)
+
+    @staticmethod
+    def result_values(result):
+        '''
+        Get state values of a quantitative check result: a read-only NumPy view if numpy is available and the result
+        is not exact, otherwise a list.
+        '''
+        if numpy is not None and isinstance(result, stormpy.ExplicitQuantitativeCheckResult):
+            return payntbind.synthesis.quantitative_result_values(result)
+        return list(result.get_values())
 
     @staticmethod
     def above_model_checking_precision(a, b):
@@ -276,6 +296,8 @@ class OptimalityProperty(Property):
 
         # additional optimality stuff
         self.optimum = None
+        # optimum shared with other processes, see share_optimum()
+        self.shared_optimum = None
         if use_exact:
             self.epsilon = stormpy.Rational(epsilon)
         else:
@@ -309,11 +331,38 @@ class OptimalityProperty(Property):
         return b is None or (Property.above_model_checking_precision(a,b) and self.op(a,b))
 
     def satisfies_threshold(self, value):
+        if self.shared_optimum is not None:
+            self.synchronize_optimum()
         return self.result_valid(value) and self.meets_op(value, self.threshold)
 
     def improves_optimum(self, value):
+        if self.shared_optimum is not None:
+            self.synchronize_optimum()
         return self.result_valid(value) and self.meets_op(value, self.optimum)
 
+    def share_optimum(self, shared_optimum):
+        '''
+        Adopt improvements of the optimum found by other processes.
+        :param shared_optimum multiprocessing.Value holding the best known optimum, NaN if no optimum is known yet
+        @note the optimum of this property is published via publish_optimum()
+        '''
+        self.shared_optimum = shared_optimum
+
+    def synchronize_optimum(self):
+        ''' Adopt the shared optimum if it improves the optimum of this property. '''
+        value = self.shared_optimum.value
+        if not math.isnan(value) and (self.optimum is None or self.op(value, self.optimum)):
+            self.update_optimum(value)
+
+    def publish_optimum(self):
+        ''' Share the optimum of this property if it improves the shared optimum. '''
+        if self.optimum is None:
+            return
+        with self.shared_optimum.get_lock():
+            value = self.shared_optimum.value
+            if math.isnan(value) or self.op(self.optimum, value):
+                self.shared_optimum.value = self.optimum
+
     def update_optimum(self, optimum):
         self.optimum = optimum
         if self.minimizing:
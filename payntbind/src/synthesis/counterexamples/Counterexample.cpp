@@ -7,9 +7,9 @@
 #include <storm/storage/sparse/JaniChoiceOrigins.h>
 #include <storm/storage/sparse/StateValuations.h>
 
-#include <storm/utility/builder.h>
+#include <storm/utility/constants.h>
+#include <storm/utility/graph.h>
 #include <storm/storage/SparseMatrix.h>
-#include <storm/storage/sparse/ModelComponents.h>
 #include <storm/models/sparse/StateLabeling.h>
 
 #include <storm/solver/OptimizationDirection.h>
@@ -17,12 +17,17 @@
 #include <storm/api/verification.h>
 #include <storm/logic/Bound.h>
 #include <storm/modelchecker/CheckTask.h>
-#include <storm/modelchecker/hints/ExplicitModelCheckerHint.h>
 
 #include <storm/environment/Environment.h>
 #include <storm/environment/solver/SolverEnvironment.h>
 
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <exception>
+#include <queue>
 #include <stack>
+#include <thread>
 
 namespace synthesis {
 
@@ -124,6 +129,7 @@ namespace synthesis {
         // Get DTMC info
         this->dtmc = std::make_shared<storm::models::sparse::Dtmc<ValueType>>(dtmc);
         this->state_map = state_map;
+        this->backward_transitions = this->dtmc->getBackwardTransitions();
         uint64_t dtmc_states = this->dtmc->getNumberOfStates();
         StateType initial_state = *(this->dtmc->getInitialStates().begin());
         storm::storage::SparseMatrix<ValueType> const& transition_matrix = this->dtmc->getTransitionMatrix();
@@ -251,34 +257,12 @@ namespace synthesis {
         uint64_t formula_index,
         std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const> mdp_bounds,
         std::vector<StateType> const& mdp_quotient_state_map,
-        std::vector<std::vector<std::pair<StateType,ValueType>>> & matrix_subdtmc,
-        storm::models::sparse::StateLabeling & labeling_subdtmc,
-        std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<ValueType>> & reward_models_subdtmc
-        ) {
+        SubdtmcValues & subdtmc
+        ) const {
 
         // Get DTMC info
         StateType dtmc_states = dtmc->getNumberOfStates();
-        
-        // Introduce expanded state space
-        uint64_t sink_state_false = dtmc_states;
-        uint64_t sink_state_true = dtmc_states+1;
-
-        // Label target states of a DTMC
-        std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const> mdp_target = this->mdp_targets[formula_index];
-        std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const> mdp_until = this->mdp_untils[formula_index];
-        labeling_subdtmc.addLabel(this->target_label);
-        labeling_subdtmc.addLabel(this->until_label);
-        for(StateType state = 0; state < dtmc_states; state++) {
-            StateType mdp_state = this->state_map[state];
-            if((*mdp_target)[mdp_state]) {
-                labeling_subdtmc.addLabelToState(this->target_label, state);
-            }
-            if(mdp_until != NULL && (*mdp_until)[mdp_state]) {
-                labeling_subdtmc.addLabelToState(this->until_label, state);
-            }
-        }
-        // Associate true sink with the target label
-        labeling_subdtmc.addLabelToState(this->target_label, sink_state_true);
+        bool is_reward = this->formula_reward[formula_index];
 
         // Map MDP bounds onto the state space of a quotient MDP
         bool have_bounds = mdp_bounds != NULL;
@@ -292,44 +276,110 @@ namespace synthesis {
             }
         }
 
-        
+        // Unexpanded states are rerouted to the sink states: for probability formulae, the target is reached with the
+        // probability given by the MDP bound; for reward formulae, the reward given by the MDP bound is collected and
+        // the target is reached
+        std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const> mdp_target = this->mdp_targets[formula_index];
+        std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const> mdp_until = this->mdp_untils[formula_index];
+        ValueType default_bound = (!is_reward && !this->formula_safety[formula_index]) ? 1 : 0;
+        subdtmc.expanded = storm::storage::BitVector(dtmc_states, false);
+        subdtmc.fixed = storm::storage::BitVector(dtmc_states, false);
+        subdtmc.degenerate = storm::storage::BitVector(dtmc_states, false);
+        subdtmc.shortcut.resize(dtmc_states);
+        for(StateType state = 0; state < dtmc_states; state++) {
+            StateType mdp_state = this->state_map[state];
+            if((*mdp_target)[mdp_state]) {
+                subdtmc.fixed.set(state);
+                subdtmc.shortcut[state] = is_reward ? 0 : 1;
+            } else if(mdp_until != NULL && !(*mdp_until)[mdp_state]) {
+                subdtmc.fixed.set(state);
+                subdtmc.shortcut[state] = 0;
+            } else {
+                subdtmc.shortcut[state] = have_bounds ? quotient_mdp_bounds[mdp_state] : default_bound;
+            }
+        }
+        subdtmc.values = subdtmc.shortcut;
+        subdtmc.bounded = true;
 
-        // Construct transition matrix (as well as the reward model) for the subdtmc
-        if(!this->formula_reward[formula_index]) {
-            // Probability formula: no reward models
-            double default_bound = this->formula_safety[formula_index] ? 0 : 1;
+        if(is_reward) {
+            STORM_LOG_THROW(mdp_until == NULL, storm::exceptions::NotImplementedException, "Only reachability reward formulae supported.");
+            assert(dtmc->hasRewardModel(this->formula_reward_name[formula_index]));
+            storm::models::sparse::StandardRewardModel<ValueType> const& reward_model_dtmc = dtmc->getRewardModel(this->formula_reward_name[formula_index]);
+            assert(reward_model_dtmc.hasStateRewards() or reward_model_dtmc.hasStateActionRewards());
+            subdtmc.rewards.resize(dtmc_states);
             for(StateType state = 0; state < dtmc_states; state++) {
-                StateType mdp_state = this->state_map[state];
-                std::vector<std::pair<StateType,ValueType>> r;
-                double probability = have_bounds ? quotient_mdp_bounds[mdp_state] : default_bound;
-                r.emplace_back(sink_state_false, 1-probability);
-                r.emplace_back(sink_state_true, probability);
-                matrix_subdtmc.push_back(r);
+                if(reward_model_dtmc.hasStateRewards()) {
+                    subdtmc.rewards[state] = reward_model_dtmc.getStateReward(state);
+                } else {
+                    subdtmc.rewards[state] = reward_model_dtmc.getStateActionReward(state);
+                }
             }
-        } else {
-            // Reward formula: one reward model
-            assert(dtmc->hasRewardModel(this->formula_reward_name[formula_index]));
+        }
+    }
 
-            std::vector<ValueType> state_rewards_subdtmc(dtmc_states+2);
-            double default_reward = 0;
-            for(StateType state = 0; state < dtmc_states; state++) {
-                StateType mdp_state = this->state_map[state];
-                double reward = have_bounds ? quotient_mdp_bounds[mdp_state] : default_reward;
-                state_rewards_subdtmc[state] = reward;
+    template <typename ValueType, typename StateType>
+    storm::storage::BitVector CounterexampleGenerator<ValueType,StateType>::identifyDegenerateStates (
+        uint64_t index,
+        SubdtmcValues const& subdtmc
+    ) const {
+        storm::storage::SparseMatrix<ValueType> const& transition_matrix = this->dtmc->getTransitionMatrix();
+        storm::storage::BitVector variable = subdtmc.expanded & ~subdtmc.fixed;
 
-                std::vector<std::pair<StateType,ValueType>> r;
-                r.emplace_back(sink_state_true, 1);
-                matrix_subdtmc.push_back(r);
+        // Identify expanded states leaving the expanded states, for probability formulae to a state having a positive
+        // value
+        storm::storage::BitVector leaving(variable.size(), false);
+        for(StateType state: variable) {
+            for(auto entry: transition_matrix.getRow(state)) {
+                StateType successor = entry.getColumn();
+                if(!variable[successor] && (this->formula_reward[index] || subdtmc.shortcut[successor] > 0)) {
+                    leaving.set(state);
+                    break;
+                }
             }
-            storm::models::sparse::StandardRewardModel<ValueType> reward_model_subdtmc(state_rewards_subdtmc);
-            reward_models_subdtmc.emplace(this->formula_reward_name[formula_index], reward_model_subdtmc);
         }
+        storm::storage::BitVector reaching = storm::utility::graph::performProbGreater0(this->backward_transitions, variable, leaving);
+
+        if(!this->formula_reward[index]) {
+            // states that cannot reach a positive value reach the target with probability 0
+            return variable & ~reaching;
+        }
+        // states that can reach a bottom component of the expanded states reach the target with probability less than
+        // 1 and thus collect an infinite reward
+        return storm::utility::graph::performProbGreater0(this->backward_transitions, variable, variable & ~reaching);
+    }
 
-        // Add self-loops to sink states
-        for(StateType state = sink_state_false; state <= sink_state_true; state++) {
-            std::vector<std::pair<StateType,ValueType>> r;
-            r.emplace_back(state, 1);
-            matrix_subdtmc.push_back(r);
+    template <typename ValueType, typename StateType>
+    ValueType CounterexampleGenerator<ValueType,StateType>::stateValue (
+        uint64_t index,
+        SubdtmcValues const& subdtmc,
+        StateType state
+    ) const {
+        ValueType value = this->formula_reward[index] ? subdtmc.rewards[state] : storm::utility::zero<ValueType>();
+        for(auto entry: this->dtmc->getTransitionMatrix().getRow(state)) {
+            value += entry.getValue() * subdtmc.values[entry.getColumn()];
+        }
+        return value;
+    }
+
+    template <typename ValueType, typename StateType>
+    bool CounterexampleGenerator<ValueType,StateType>::satisfies (
+        uint64_t index,
+        ValueType formula_bound,
+        ValueType value
+    ) const {
+        auto comparisonType = this->formula_modified[index]->asOperatorFormula().getComparisonType();
+        if(this->formula_safety[index]) {
+            if (comparisonType == storm::logic::ComparisonType::Less) {
+                return value < formula_bound;
+            } else {
+                return value <= formula_bound;
+            }
+        } else {
+            if (comparisonType == storm::logic::ComparisonType::Greater) {
+                return value > formula_bound;
+            } else {
+                return value >= formula_bound;
+            }
         }
     }
 
@@ -337,105 +387,134 @@ namespace synthesis {
     bool CounterexampleGenerator<ValueType,StateType>::expandAndCheck (
         uint64_t index,
         ValueType formula_bound,
-        std::vector<std::vector<std::pair<StateType,ValueType>>> & matrix_subdtmc,
-        storm::models::sparse::StateLabeling const& labeling_subdtmc,
-        std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<ValueType>> & reward_models_subdtmc,
-        std::vector<StateType> const& to_expand
-    ) {
-        
+        std::vector<StateType> const& to_expand,
+        SubdtmcValues & subdtmc,
+        storm::utility::Stopwatch & timer_model_check
+    ) const {
+
         // Get DTMC info
         uint64_t dtmc_states = this->dtmc->getNumberOfStates();
-        storm::storage::SparseMatrix<ValueType> const& transition_matrix = this->dtmc->getTransitionMatrix();
         StateType initial_state = *(this->dtmc->getInitialStates().begin());
-        
-        // Expand states from the new wave: 
-        // - expand transition probabilities
-        // std::cout << "expanded " << to_expand.size() << " states in this wave " << std::endl;
+        timer_model_check.start();
+
+        // Expand states from the new wave, fixed states keep their values
+        std::vector<StateType> to_update;
         for(StateType state : to_expand) {
-            // std::cout << "holes in state " << state << " : ";
-            /*for(auto hole: this->mdp_holes[this->state_map[state]]) {
-                std::cout << hole << ",";
-            }*/
-            // std::cout << std::endl;
-            matrix_subdtmc[state].clear();
-            for(auto entry: transition_matrix.getRow(state)) {
-                matrix_subdtmc[state].emplace_back(entry.getColumn(), entry.getValue());
+            subdtmc.expanded.set(state);
+            if(!subdtmc.fixed[state]) {
+                to_update.push_back(state);
             }
         }
-        // std::cout << std::endl;
 
-        if(this->formula_reward[index]) {
-            // - expand state rewards
-            storm::models::sparse::StandardRewardModel<ValueType> const& reward_model_dtmc = dtmc->getRewardModel(this->formula_reward_name[index]);
-            assert(reward_model_dtmc.hasStateRewards() or reward_model_dtmc.hasStateActionRewards());
-            storm::models::sparse::StandardRewardModel<ValueType> & reward_model_subdtmc = (reward_models_subdtmc.find(this->formula_reward_name[index]))->second;
-            for(StateType state : to_expand) {
-                ValueType reward;
-                if(reward_model_dtmc.hasStateRewards()) {
-                    reward = reward_model_dtmc.getStateReward(state);
-                } else {
-                    reward = reward_model_dtmc.getStateActionReward(state);
-                }
-                reward_model_subdtmc.setStateReward(state, reward);
+        // Expansion may change the qualitative structure of the sub-DTMC: degenerate states get their final values,
+        // states that are no longer degenerate are updated
+        storm::storage::BitVector degenerate = this->identifyDegenerateStates(index, subdtmc);
+        ValueType degenerate_value = this->formula_reward[index] ? storm::utility::infinity<ValueType>() : storm::utility::zero<ValueType>();
+        std::vector<StateType> changed;
+        for(StateType state: subdtmc.expanded) {
+            if(degenerate[state] == subdtmc.degenerate[state]) {
+                continue;
+            }
+            if(!degenerate[state]) {
+                to_update.push_back(state);
+            } else if(subdtmc.values[state] != degenerate_value) {
+                subdtmc.values[state] = degenerate_value;
+                changed.push_back(state);
             }
         }
-
-        // Construct sub-DTMC
-        storm::storage::SparseMatrixBuilder<ValueType> transitionMatrixBuilder(0, 0, 0, false, false, 0);
-        for(StateType state = 0; state < dtmc_states+2; state++) {
-            for(auto row_entry: matrix_subdtmc[state]) {
-                transitionMatrixBuilder.addNextValue(state, row_entry.first, row_entry.second);
+        subdtmc.degenerate = degenerate;
+        for(StateType state: changed) {
+            for(auto entry: this->backward_transitions.getRow(state)) {
+                to_update.push_back(entry.getColumn());
             }
         }
-        storm::storage::SparseMatrix<ValueType> sub_matrix = transitionMatrixBuilder.build();
-        assert(sub_matrix.isProbabilistic(storm::utility::zero<ValueType>()));
-        storm::storage::sparse::ModelComponents<ValueType> components(sub_matrix, labeling_subdtmc, reward_models_subdtmc);
-        std::shared_ptr<storm::models::sparse::Model<ValueType>> subdtmc = storm::utility::builder::buildModelFromComponents(storm::models::ModelType::Dtmc, std::move(components));
-        // std::cout << "[storm] sub-dtmc has " << subdtmc->getNumberOfStates() << " states" << std::endl;
 
-        
-        // Construct MC task
-        bool onlyInitialStatesRelevant = false;
-        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> task(*(this->formula_modified[index]), onlyInitialStatesRelevant);
-        if(this->hint_result != NULL) {
-            // Add hints from previous wave
-            storm::modelchecker::ExplicitModelCheckerHint<ValueType> hint;
-            hint.setComputeOnlyMaybeStates(false);
-            hint.setResultHint(this->hint_result->template asExplicitQuantitativeCheckResult<ValueType>().getValueVector());
-            task.setHint(std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>(hint));
+        // Collect states to be updated. Values of the previous wave are lower (safety) or upper (liveness) bounds as
+        // long as they form a sub-solution (safety) or a super-solution (liveness) of the sub-DTMC equations, which
+        // needs to be checked only for the states whose equations changed; values iterated from such a solution
+        // remain bounds.
+        std::queue<StateType> worklist;
+        storm::storage::BitVector in_worklist(dtmc_states, false);
+        for(StateType state: to_update) {
+            if(in_worklist[state] || !subdtmc.expanded[state] || subdtmc.fixed[state] || degenerate[state]) {
+                continue;
+            }
+            in_worklist.set(state);
+            worklist.push(state);
+            if(subdtmc.bounded) {
+                ValueType value = this->stateValue(index, subdtmc, state);
+                if(this->formula_safety[index] ? subdtmc.values[state] > value : subdtmc.values[state] < value) {
+                    subdtmc.bounded = false;
+                }
+            }
         }
-        storm::Environment env;
-        // storm::SolverEnvironment & solver = env.solver();
-        // std::cout << solver.getLinearEquationSolverType() << std::endl;
-        // std::cout << solver.getPrecisionOfLinearEquationSolver() << std::endl;
-
-
-        // Model check
-        // std::unique_ptr<storm::modelchecker::CheckResult> result_ptr = storm::api::verifyWithSparseEngine<ValueType>(subdtmc, task);
-        // storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType>& result = result_ptr->asExplicitQuantitativeCheckResult<ValueType>();
-        this->timer_model_check.start();
-        this->hint_result = storm::api::verifyWithSparseEngine<ValueType>(env, subdtmc, task);
-        this->timer_model_check.stop();
-        storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType>& result = this->hint_result->template asExplicitQuantitativeCheckResult<ValueType>();
 
-        auto comparisonType = this->formula_modified[index]->asOperatorFormula().getComparisonType();
-
-        bool satisfied;
-        if(this->formula_safety[index]) {
-            if (comparisonType == storm::logic::ComparisonType::Less) {
-                satisfied = result[initial_state] < formula_bound;
-            } else {
-                satisfied = result[initial_state] <= formula_bound;
+        // Propagate the changes, stop as soon as the bounds prove that the formula is violated
+        bool decided = subdtmc.bounded && !this->satisfies(index, formula_bound, subdtmc.values[initial_state]);
+        bool skipped = false;
+        while(!decided && !worklist.empty()) {
+            StateType state = worklist.front();
+            worklist.pop();
+            in_worklist.set(state, false);
+            ValueType value = this->stateValue(index, subdtmc, state);
+            ValueType old_value = subdtmc.values[state];
+            subdtmc.values[state] = value;
+            if(state == initial_state) {
+                decided = subdtmc.bounded && !this->satisfies(index, formula_bound, value);
             }
-        } else {
-            if (comparisonType == storm::logic::ComparisonType::Greater) {
-                satisfied = result[initial_state] > formula_bound;
-            } else {
-                satisfied = result[initial_state] >= formula_bound;
+            if(value == old_value) {
+                continue;
+            }
+            if(this->converged(old_value, value)) {
+                // small changes are not propagated, but they may accumulate
+                skipped = true;
+                continue;
+            }
+            for(auto entry: this->backward_transitions.getRow(state)) {
+                StateType predecessor = entry.getColumn();
+                if(!in_worklist[predecessor] && subdtmc.expanded[predecessor] && !subdtmc.fixed[predecessor] && !degenerate[predecessor]) {
+                    in_worklist.set(predecessor);
+                    worklist.push(predecessor);
+                }
             }
         }
 
-        return satisfied;
+        // Local convergence does not imply global convergence: finish by Gauss-Seidel sweeps over all expanded states
+        // until no value changes by more than the precision
+        storm::storage::BitVector variable = subdtmc.expanded & ~subdtmc.fixed & ~degenerate;
+        while(!decided && skipped) {
+            skipped = false;
+            for(StateType state: variable) {
+                ValueType value = this->stateValue(index, subdtmc, state);
+                if(!this->converged(subdtmc.values[state], value)) {
+                    skipped = true;
+                }
+                subdtmc.values[state] = value;
+            }
+            decided = subdtmc.bounded && !this->satisfies(index, formula_bound, subdtmc.values[initial_state]);
+        }
+        timer_model_check.stop();
+
+        ValueType value = subdtmc.values[initial_state];
+        if(decided || !std::isfinite(value) || this->satisfies(index, formula_bound, value)) {
+            return !decided && this->satisfies(index, formula_bound, value);
+        }
+        // Values that are not bounds only approximate the solution: a violation within the precision of the threshold
+        // is not reported, the rerouting is expanded further instead, which may only enlarge the conflict
+        ValueType margin = this->precision * std::max(std::abs(value), std::abs(formula_bound));
+        ValueType shifted = this->formula_safety[index] ? value - margin : value + margin;
+        return this->satisfies(index, formula_bound, shifted);
+    }
+
+    template <typename ValueType, typename StateType>
+    bool CounterexampleGenerator<ValueType,StateType>::converged (
+        ValueType old_value,
+        ValueType value
+    ) const {
+        if(value == old_value) {
+            return true;
+        }
+        return std::isfinite(value) && std::abs(value - old_value) <= this->precision * std::abs(value);
     }
 
     template <typename ValueType, typename StateType>
@@ -446,20 +525,81 @@ namespace synthesis {
         std::vector<StateType> const& mdp_quotient_state_map
         ) {
         this->timer_conflict.start();
+        auto critical_holes = this->computeConflict(
+            formula_index, formula_bound, mdp_bounds, mdp_quotient_state_map, this->timer_model_check
+        );
+        this->timer_conflict.stop();
+        return critical_holes;
+    }
 
-        // Clear hint result
-        this->hint_result = NULL;
-        
-        // Get DTMC info
-        StateType dtmc_states = this->dtmc->getNumberOfStates();
-        
-        // Prepare to construct sub-DTMCs
-        std::vector<std::vector<std::pair<StateType,ValueType>>> matrix_subdtmc;
-        storm::models::sparse::StateLabeling labeling_subdtmc(dtmc_states+2);
-        std::unordered_map<std::string, storm::models::sparse::StandardRewardModel<ValueType>> reward_models_subdtmc;
-        this->prepareSubdtmc(
-            formula_index, mdp_bounds, mdp_quotient_state_map, matrix_subdtmc, labeling_subdtmc, reward_models_subdtmc
+    template <typename ValueType, typename StateType>
+    std::vector<std::vector<uint64_t>> CounterexampleGenerator<ValueType,StateType>::constructConflictsBatch (
+        std::vector<uint64_t> const& formula_indices,
+        std::vector<ValueType> const& formula_bounds,
+        std::vector<std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const>> const& mdp_bounds,
+        std::vector<StateType> const& mdp_quotient_state_map,
+        uint64_t num_threads
+        ) {
+        uint64_t num_conflicts = formula_indices.size();
+        STORM_LOG_THROW(
+            formula_bounds.size() == num_conflicts and mdp_bounds.size() == num_conflicts,
+            storm::exceptions::InvalidArgumentException, "expected a bound and MDP bounds for each formula"
         );
+        this->timer_conflict.start();
+
+        if(num_threads == 0) {
+            num_threads = std::max<uint64_t>(std::thread::hardware_concurrency(), 1);
+        }
+        num_threads = std::min(num_threads, num_conflicts);
+
+        // threads take formulae one by one, each conflict is constructed wrt its own sub-DTMC values and stopwatch
+        std::vector<std::vector<uint64_t>> conflicts(num_conflicts);
+        std::vector<storm::utility::Stopwatch> timers_model_check(num_conflicts);
+        std::vector<std::exception_ptr> errors(num_threads);
+        std::atomic<uint64_t> next_conflict(0);
+        auto construct = [&](uint64_t thread) {
+            try {
+                for(uint64_t conflict = next_conflict++; conflict < num_conflicts; conflict = next_conflict++) {
+                    conflicts[conflict] = this->computeConflict(
+                        formula_indices[conflict], formula_bounds[conflict], mdp_bounds[conflict],
+                        mdp_quotient_state_map, timers_model_check[conflict]
+                    );
+                }
+            } catch(...) {
+                errors[thread] = std::current_exception();
+            }
+        };
+        std::vector<std::thread> threads;
+        for(uint64_t thread = 0; thread < num_threads; thread++) {
+            threads.emplace_back(construct, thread);
+        }
+        for(auto & thread: threads) {
+            thread.join();
+        }
+        this->timer_conflict.stop();
+        for(auto const& error: errors) {
+            if(error) {
+                std::rethrow_exception(error);
+            }
+        }
+        for(auto const& timer: timers_model_check) {
+            this->timer_model_check.add(timer);
+        }
+        return conflicts;
+    }
+
+    template <typename ValueType, typename StateType>
+    std::vector<uint64_t> CounterexampleGenerator<ValueType,StateType>::computeConflict (
+        uint64_t formula_index,
+        ValueType formula_bound,
+        std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const> mdp_bounds,
+        std::vector<StateType> const& mdp_quotient_state_map,
+        storm::utility::Stopwatch & timer_model_check
+        ) const {
+
+        // Prepare values of sub-DTMCs
+        SubdtmcValues subdtmc;
+        this->prepareSubdtmc(formula_index, mdp_bounds, mdp_quotient_state_map, subdtmc);
 
         // Explore subDTMCs wave by wave
         uint64_t wave_last = this->wave_states.size()-1;
@@ -472,8 +612,7 @@ namespace synthesis {
         std::cout << std::endl;*/
         while(true) {
             bool satisfied = this->expandAndCheck(
-                formula_index, formula_bound, matrix_subdtmc, labeling_subdtmc,
-                reward_models_subdtmc, this->wave_states[wave]
+                formula_index, formula_bound, this->wave_states[wave], subdtmc, timer_model_check
             );
             // std::cout << "[storm] wave " << wave << "/" << wave_last << " : " << satisfied << std::endl;
             if(!satisfied) {
@@ -493,7 +632,6 @@ namespace synthesis {
                 critical_holes.push_back(hole);
             }
         }
-        this->timer_conflict.stop();
 
         return critical_holes;
     }
@@ -7,6 +7,8 @@
 #include "storm/modelchecker/results/ExplicitQualitativeCheckResult.h"
 
 #include "storm/models/sparse/Dtmc.h"
+#include "storm/storage/BitVector.h"
+#include "storm/storage/SparseMatrix.h"
 #include "storm/utility/Stopwatch.h"
 
 namespace synthesis {
@@ -65,6 +67,24 @@ namespace synthesis {
             std::vector<StateType> const& mdp_quotient_state_map
             );
 
+        /*!
+         * Construct counterexamples to a prepared DTMC for multiple formulae
+         * in parallel. Each formula is processed by a single thread.
+         * @param formula_indices Formula indices.
+         * @param formula_bounds For each formula, its threshold for CE construction.
+         * @param mdp_bounds For each formula, MDP model checking result in the primary direction (NULL if not used).
+         * @param mdp_quotient_state_mdp A mapping of MDP states to the states of a quotient MDP.
+         * @param num_threads Maximum number of threads, 0 to use the hardware concurrency.
+         * @return For each formula, a list of holes relevant in the CE.
+         */
+        std::vector<std::vector<uint64_t>> constructConflictsBatch(
+            std::vector<uint64_t> const& formula_indices,
+            std::vector<ValueType> const& formula_bounds,
+            std::vector<std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const>> const& mdp_bounds,
+            std::vector<StateType> const& mdp_quotient_state_map,
+            uint64_t num_threads
+            );
+
         /*!
          * TODO
          */
@@ -79,43 +99,94 @@ namespace synthesis {
             );
 
         /**
-         * Prepare data structures for sub-DTMC construction.
+         * Values of the states of a sub-DTMC refined wave by wave. Expanded states follow the transitions of the DTMC,
+         * the remaining states are rerouted to the sink states according to their shortcut values.
+         */
+        struct SubdtmcValues {
+            /** For each state of the DTMC, whether it was expanded. */
+            storm::storage::BitVector expanded;
+            /** For each state of the DTMC, whether its value is given by its labeling (target or violated until). */
+            storm::storage::BitVector fixed;
+            /**
+             * For each state of the DTMC, whether it was expanded and its value is 0 (probability formula) or infinite
+             * (reward formula) in the sub-DTMC regardless of the transition probabilities.
+             */
+            storm::storage::BitVector degenerate;
+            /** For each state of the DTMC, its value if it is not expanded or if it is fixed. */
+            std::vector<ValueType> shortcut;
+            /** For each state of the DTMC, its reward (reward formulae only). */
+            std::vector<ValueType> rewards;
+            /** For each state of the DTMC, its current value in the sub-DTMC. */
+            std::vector<ValueType> values;
+            /**
+             * Whether the current values are lower (safety formula) or upper (liveness formula) bounds on the values
+             * in the sub-DTMC.
+             */
+            bool bounded;
+        };
+
+        /**
+         * Prepare values of the initial sub-DTMC, where no state is expanded.
          * @param formula_index Formula index.
          * @param mdp_bounds MDP model checking result in the primary direction.
-         * @param matrix_dtmc (output) Copy of the transition matrix of the DTMC.
-         * @param matrix_subdtmc (output) Matrix of shortcuts.
-         * @param labeling_subdtdmc (output) Labeling marking target states.
-         * @param reward_model_subdtmc (output) If the reward property is
-         *   investigated, this map will contain exactly one reward model
-         *   for the initial sub-DTMC.
+         * @param mdp_quotient_state_mdp A mapping of MDP states to the states of a quotient MDP.
+         * @param subdtmc (output) Values of the sub-DTMC.
          */
         void prepareSubdtmc(
             uint64_t formula_index,
             std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const> mdp_bounds,
             std::vector<StateType> const& mdp_quotient_state_map,
-            std::vector<std::vector<std::pair<StateType,ValueType>>> & matrix_subdtmc,
-            storm::models::sparse::StateLabeling & labeling_subdtmc,
-            std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<ValueType>> & reward_models_subdtmc
-            );
+            SubdtmcValues & subdtmc
+            ) const;
 
         /**
-         * Expand new wave and model check resulting rerouting of a DTMC.
-         * @param dtmc A DTMC.
-         * @param labeling Prototype labeling.
-         * @param matrix_dtmc Original transition matrix.
-         * @param matrix_subdtmc Rerouting of the transition matrix wrt. unexpanded states.
-         * @param reward_models_subdtmc Reward models for the initial sub-DTMC.
+         * Expand new wave and model check resulting rerouting of a DTMC. The values of the previous wave are used as
+         * the starting point, only values of the newly expanded states and the states depending on them are updated.
+         * If the values are bounds on the values in the sub-DTMC, the check ends as soon as these bounds prove that the
+         * formula is violated. Otherwise, the values are iterated until a sweep over all expanded states changes no
+         * value by more than the relative precision, and a violation within the precision of the threshold is treated
+         * as satisfaction, i.e. the DTMC is expanded further.
+         * @param index Formula index.
+         * @param formula_bound Formula threshold.
          * @param to_expand States expanded during this wave.
+         * @param subdtmc Values of the sub-DTMC, will be updated to the values of the new rerouting.
+         * @param timer_model_check Stopwatch measuring model checking.
          * @return true if the rerouting still satisfies the formula
          */
         bool expandAndCheck(
             uint64_t index,
             ValueType formula_bound,
-            std::vector<std::vector<std::pair<StateType,ValueType>>> & matrix_subdtmc,
-            storm::models::sparse::StateLabeling const& labeling_subdtmc,
-            std::unordered_map<std::string,storm::models::sparse::StandardRewardModel<ValueType>> & reward_models_subdtmc,
-            std::vector<StateType> const& to_expand
-            );
+            std::vector<StateType> const& to_expand,
+            SubdtmcValues & subdtmc,
+            storm::utility::Stopwatch & timer_model_check
+            ) const;
+
+        /**
+         * Identify expanded states whose value is 0 (probability formula) or infinite (reward formula) in the sub-DTMC.
+         */
+        storm::storage::BitVector identifyDegenerateStates(uint64_t index, SubdtmcValues const& subdtmc) const;
+
+        /** Value of an expanded state wrt the current values of its successors. */
+        ValueType stateValue(uint64_t index, SubdtmcValues const& subdtmc, StateType state) const;
+
+        /** Whether a value of the initial state satisfies the formula. */
+        bool satisfies(uint64_t index, ValueType formula_bound, ValueType value) const;
+
+        /** Whether an updated value differs from the old one by at most the relative precision. */
+        bool converged(ValueType old_value, ValueType value) const;
+
+        /**
+         * Construct a counterexample to a prepared DTMC. Does not modify the generator, hence counterexamples for
+         * different formulae can be constructed concurrently.
+         * @param timer_model_check Stopwatch measuring model checking.
+         */
+        std::vector<uint64_t> computeConflict(
+            uint64_t formula_index,
+            ValueType formula_bound,
+            std::shared_ptr<storm::modelchecker::ExplicitQuantitativeCheckResult<ValueType> const> mdp_bounds,
+            std::vector<StateType> const& mdp_quotient_state_map,
+            storm::utility::Stopwatch & timer_model_check
+            ) const;
 
         // Quotient MDP
         storm::models::sparse::Mdp<ValueType> const& quotient_mdp;
@@ -141,19 +212,20 @@ namespace synthesis {
         std::vector<std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const>> mdp_untils;
         // Flags for target states
         std::vector<std::shared_ptr<storm::modelchecker::ExplicitQualitativeCheckResult const>> mdp_targets;
+        // Relative precision of the values of sub-dtmcs
+        const ValueType precision = 1e-6;
 
         // DTMC under investigation
         std::shared_ptr<storm::models::sparse::Dtmc<ValueType>> dtmc;
         // DTMC to MDP state mapping
         std::vector<uint64_t> state_map;
+        // Transposed transition matrix of the DTMC
+        storm::storage::SparseMatrix<ValueType> backward_transitions;
         // For each hole, a wave when it was registered (0 = unregistered).
         std::vector<uint64_t> hole_wave;
         // For each wave, a set of states that were expanded.
         std::vector<std::vector<StateType>> wave_states;
 
-        // Hint for future model checking.
-        std::unique_ptr<storm::modelchecker::CheckResult> hint_result;
-
         // Profiling
         storm::utility::Stopwatch timer_conflict;
         storm::utility::Stopwatch timer_model_check;
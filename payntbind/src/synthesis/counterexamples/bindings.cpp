@@ -19,6 +19,11 @@ void bindings_counterexamples(py::module& m) {
             "construct_conflict", &synthesis::CounterexampleGenerator<>::constructConflict,
             py::arg("formula_index"), py::arg("formula_bound"), py::arg("mdp_bounds"), py::arg("mdp_quotient_state_map")
         )
+        .def(
+            "construct_conflicts_batch", &synthesis::CounterexampleGenerator<>::constructConflictsBatch,
+            py::arg("formula_indices"), py::arg("formula_bounds"), py::arg("mdp_bounds"), py::arg("mdp_quotient_state_map"),
+            py::arg("num_threads") = 0, py::call_guard<py::gil_scoped_release>()
+        )
         .def("print_profiling", &synthesis::CounterexampleGenerator<>::printProfiling)
         ;
 
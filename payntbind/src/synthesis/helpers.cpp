@@ -1,5 +1,7 @@
 #include "synthesis.h"
 
+#include <pybind11/numpy.h>
+
 #include <storm/adapters/RationalNumberAdapter.h>
 #include <storm/logic/Formula.h>
 #include <storm/logic/UntilFormula.h>
@@ -14,6 +16,10 @@
 #include <storm/environment/solver/MinMaxSolverEnvironment.h>
 #include <storm/storage/SparseMatrix.h>
 #include <storm/models/sparse/Model.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/modelchecker/results/ExplicitQuantitativeCheckResult.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/macros.h>
 
 #include <storm/storage/jani/TemplateEdge.h>
 
@@ -55,6 +61,34 @@ void janiTemplateEdgeAddAssignments(storm::jani::TemplateEdge & template_edge, s
     }
 }
 
+/** Read-only NumPy view of a vector owned by the given Python object. */
+py::array_t<double> vectorView(std::vector<double> const& vector, py::handle owner) {
+    py::array_t<double> array(vector.size(), vector.data(), owner);
+    array.attr("flags").attr("writeable") = false;
+    return array;
+}
+
+/** Multiply the matrix with a vector of values, both given as NumPy arrays. */
+py::array_t<double> multiplyWithArray(
+    storm::storage::SparseMatrix<double> const& matrix,
+    py::array_t<double, py::array::c_style | py::array::forcecast> const& vector
+) {
+    STORM_LOG_THROW((uint64_t)vector.size() == matrix.getColumnCount(), storm::exceptions::InvalidArgumentException,
+        "vector does not match the columns of the matrix");
+    auto values = vector.unchecked<1>();
+    py::array_t<double> result(matrix.getRowCount());
+    auto result_values = result.mutable_unchecked<1>();
+    for(uint64_t row = 0; row < matrix.getRowCount(); ++row) {
+        double row_value = 0;
+        for(auto const& entry: matrix.getRow(row)) {
+            row_value += entry.getValue() * values(entry.getColumn());
+        }
+        result_values(row) = row_value;
+    }
+    return result;
+}
+
+
 }
 
 
@@ -85,6 +119,19 @@ void define_helpers(py::module& m) {
         return result;
     }, py::arg("matrix"), py::arg("vector"));
 
+    // NumPy views of model checking results and models, the viewed object is kept alive by the view
+    m.def("quantitative_result_values", [] (py::object result) {
+        auto const& values = result.cast<storm::modelchecker::ExplicitQuantitativeCheckResult<double> const&>().getValueVector();
+        return synthesis::vectorView(values, result);
+    }, py::arg("result"));
+    m.def("state_action_rewards_array", [] (py::object model, std::string const& reward_name) {
+        auto const& reward_model = model.cast<storm::models::sparse::Model<double> const&>().getRewardModel(reward_name);
+        STORM_LOG_THROW(reward_model.hasStateActionRewards(), storm::exceptions::InvalidArgumentException,
+            "reward model " << reward_name << " has no state-action rewards");
+        return synthesis::vectorView(reward_model.getStateActionRewardVector(), model);
+    }, py::arg("model"), py::arg("reward_name"));
+    m.def("multiply_with_array", &synthesis::multiplyWithArray, py::arg("matrix"), py::arg("vector"));
+
     m.def("janiTemplateEdgeAddAssignments", &synthesis::janiTemplateEdgeAddAssignments, py::arg("template_edge"), py::arg("assignments"));
 }
 
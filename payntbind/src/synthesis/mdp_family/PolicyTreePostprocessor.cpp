@@ -0,0 +1,229 @@
+#include "PolicyTreePostprocessor.h"
+
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/macros.h>
+
+#include <queue>
+
+namespace synthesis {
+
+    template<typename ValueType>
+    PolicyTreePostprocessor<ValueType>::PolicyTreePostprocessor(
+        storm::models::sparse::Mdp<ValueType> const& quotient,
+        uint64_t num_actions,
+        std::vector<uint64_t> const& choice_to_action
+    ) : num_actions(num_actions), choice_to_action(choice_to_action) {
+
+        auto const& matrix = quotient.getTransitionMatrix();
+        this->num_states = quotient.getNumberOfStates();
+        this->row_groups = matrix.getRowGroupIndices();
+        this->initial_states = quotient.getInitialStates();
+        STORM_LOG_THROW(
+            choice_to_action.size() == matrix.getRowCount(), storm::exceptions::InvalidArgumentException,
+            "expected an action for each choice of the quotient"
+        );
+
+        this->choice_destinations.resize(matrix.getRowCount());
+        for(uint64_t choice = 0; choice < matrix.getRowCount(); ++choice) {
+            for(auto const& entry: matrix.getRow(choice)) {
+                this->choice_destinations[choice].push_back(entry.getColumn());
+            }
+        }
+
+        this->state_first_action.resize(this->num_states, num_actions);
+        for(uint64_t state = 0; state < this->num_states; ++state) {
+            for(uint64_t choice = this->row_groups[state]; choice < this->row_groups[state+1]; ++choice) {
+                this->state_first_action[state] = std::min(this->state_first_action[state], choice_to_action[choice]);
+            }
+        }
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector PolicyTreePostprocessor<ValueType>::definedStates(std::vector<uint64_t> const& policy) const {
+        storm::storage::BitVector defined(this->num_states,false);
+        for(uint64_t state = 0; state < this->num_states; ++state) {
+            if(policy[state] != this->num_actions) {
+                defined.set(state,true);
+            }
+        }
+        return defined;
+    }
+
+    template<typename ValueType>
+    uint64_t PolicyTreePostprocessor<ValueType>::numActions() const {
+        return this->num_actions;
+    }
+
+    template<typename ValueType>
+    uint64_t PolicyTreePostprocessor<ValueType>::addPolicy(std::vector<uint64_t> const& policy) {
+        STORM_LOG_THROW(
+            policy.size() == this->num_states, storm::exceptions::InvalidArgumentException,
+            "expected a policy defined over the states of the quotient"
+        );
+        this->policies.push_back(policy);
+        this->policy_masks.push_back(this->definedStates(policy));
+        this->policy_removed.push_back(false);
+        this->policy_modified.push_back(false);
+        return this->policies.size()-1;
+    }
+
+    template<typename ValueType>
+    std::optional<std::vector<uint64_t>> PolicyTreePostprocessor<ValueType>::getPolicy(uint64_t index) const {
+        if(this->policy_removed[index]) {
+            return std::nullopt;
+        }
+        return this->policies[index];
+    }
+
+    template<typename ValueType>
+    std::vector<uint64_t> const& PolicyTreePostprocessor<ValueType>::policy(uint64_t index) const {
+        STORM_LOG_THROW(
+            not this->policy_removed[index], storm::exceptions::InvalidArgumentException,
+            "policy " << index << " was removed"
+        );
+        return this->policies[index];
+    }
+
+    template<typename ValueType>
+    bool PolicyTreePostprocessor<ValueType>::hasPolicy(uint64_t index) const {
+        return not this->policy_removed[index];
+    }
+
+    template<typename ValueType>
+    bool PolicyTreePostprocessor<ValueType>::policyModified(uint64_t index) const {
+        return this->policy_modified[index];
+    }
+
+    template<typename ValueType>
+    void PolicyTreePostprocessor<ValueType>::removePolicy(uint64_t index) {
+        this->policy_removed[index] = true;
+        this->policies[index].clear();
+        this->policy_masks[index] = storm::storage::BitVector();
+    }
+
+    template<typename ValueType>
+    bool PolicyTreePostprocessor<ValueType>::policiesAreCompatible(uint64_t index1, uint64_t index2) const {
+        // only states where both policies are defined need to be compared
+        auto const& policy1 = this->policies[index1];
+        auto const& policy2 = this->policies[index2];
+        for(auto state: this->policy_masks[index1] & this->policy_masks[index2]) {
+            if(policy1[state] != policy2[state]) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    template<typename ValueType>
+    bool PolicyTreePostprocessor<ValueType>::mergePolicies(uint64_t index1, uint64_t index2) {
+        if(not this->policiesAreCompatible(index1,index2)) {
+            return false;
+        }
+        auto & policy1 = this->policies[index1];
+        auto const& policy2 = this->policies[index2];
+        auto & mask1 = this->policy_masks[index1];
+        for(auto state: this->policy_masks[index2] & ~mask1) {
+            policy1[state] = policy2[state];
+            this->policy_modified[index1] = true;
+        }
+        mask1 |= this->policy_masks[index2];
+        return true;
+    }
+
+    template<typename ValueType>
+    std::vector<uint64_t> PolicyTreePostprocessor<ValueType>::mergeCompatiblePolicies(
+        std::vector<uint64_t> const& policy_indices
+    ) {
+        std::vector<uint64_t> policy_old_to_new(this->policies.size());
+        for(uint64_t index = 0; index < this->policies.size(); ++index) {
+            policy_old_to_new[index] = index;
+        }
+        for(uint64_t position1 = 0; position1 < policy_indices.size(); ++position1) {
+            uint64_t index1 = policy_indices[position1];
+            if(this->policy_removed[index1]) {
+                continue;
+            }
+            for(uint64_t position2 = position1+1; position2 < policy_indices.size(); ++position2) {
+                uint64_t index2 = policy_indices[position2];
+                if(this->policy_removed[index2] or not this->mergePolicies(index1,index2)) {
+                    continue;
+                }
+                policy_old_to_new[index2] = index1;
+                this->removePolicy(index2);
+            }
+        }
+        return policy_old_to_new;
+    }
+
+    template<typename ValueType>
+    std::vector<storm::storage::BitVector> PolicyTreePostprocessor<ValueType>::prepareCandidates(
+        std::vector<std::pair<uint64_t,uint64_t>> const& policy_pairs,
+        std::vector<storm::storage::BitVector> const& family_choices
+    ) {
+        STORM_LOG_THROW(
+            policy_pairs.size() == family_choices.size(), storm::exceptions::InvalidArgumentException,
+            "expected a family for each pair of policies"
+        );
+        uint64_t num_choices = this->choice_to_action.size();
+        this->candidates.clear();
+        std::vector<storm::storage::BitVector> choice_masks;
+        for(uint64_t candidate_index = 0; candidate_index < policy_pairs.size(); ++candidate_index) {
+            auto const& policy = this->policies[policy_pairs[candidate_index].first];
+            auto const& other = this->policies[policy_pairs[candidate_index].second];
+            auto const& family = family_choices[candidate_index];
+
+            // explore the MDP obtained by applying the completed policy to the family
+            std::vector<uint64_t> candidate(this->num_states, this->num_actions);
+            storm::storage::BitVector choice_mask(num_choices,false);
+            storm::storage::BitVector state_reached(this->num_states,false);
+            std::queue<uint64_t> state_queue;
+            for(auto state: this->initial_states) {
+                state_reached.set(state,true);
+                state_queue.push(state);
+            }
+            while(not state_queue.empty()) {
+                auto state = state_queue.front();
+                state_queue.pop();
+                auto action = policy[state];
+                if(action == this->num_actions) {
+                    action = other[state];
+                }
+                if(action == this->num_actions) {
+                    action = this->state_first_action[state];
+                }
+                candidate[state] = action;
+                for(uint64_t choice = this->row_groups[state]; choice < this->row_groups[state+1]; ++choice) {
+                    if(this->choice_to_action[choice] != action or not family[choice]) {
+                        continue;
+                    }
+                    choice_mask.set(choice,true);
+                    for(auto dst: this->choice_destinations[choice]) {
+                        if(not state_reached[dst]) {
+                            state_reached.set(dst,true);
+                            state_queue.push(dst);
+                        }
+                    }
+                }
+            }
+            this->candidates.push_back(std::move(candidate));
+            choice_masks.push_back(std::move(choice_mask));
+        }
+        return choice_masks;
+    }
+
+    template<typename ValueType>
+    void PolicyTreePostprocessor<ValueType>::adoptCandidate(uint64_t index, uint64_t candidate) {
+        STORM_LOG_THROW(
+            candidate < this->candidates.size(), storm::exceptions::InvalidArgumentException,
+            "candidate " << candidate << " was not prepared"
+        );
+        this->policies[index] = this->candidates[candidate];
+        this->policy_masks[index] = this->definedStates(this->policies[index]);
+        this->policy_removed[index] = false;
+        this->policy_modified[index] = true;
+    }
+
+
+    template class PolicyTreePostprocessor<double>;
+
+}
@@ -0,0 +1,103 @@
+#pragma once
+
+#include <storm/adapters/RationalNumberAdapter.h>
+#include <storm/models/sparse/Mdp.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <optional>
+#include <utility>
+#include <vector>
+
+namespace synthesis {
+
+    /**
+     * Policies of a policy tree used during its post-processing. A policy maps each state of the quotient to an action
+     * or to num_actions if the policy is undefined in the state. For each policy, states in which it is defined are
+     * indexed in a bit vector, such that policies defined in disjoint sets of states are recognized as compatible
+     * without comparing their actions.
+     */
+    template<typename ValueType>
+    class PolicyTreePostprocessor {
+    public:
+
+        /**
+         * @param quotient The quotient MDP.
+         * @param num_actions Number of actions of the quotient.
+         * @param choice_to_action For each choice of the quotient, its action.
+         */
+        PolicyTreePostprocessor(
+            storm::models::sparse::Mdp<ValueType> const& quotient,
+            uint64_t num_actions,
+            std::vector<uint64_t> const& choice_to_action
+        );
+
+        /** Number of actions of the quotient, marks states in which a policy is undefined. */
+        uint64_t numActions() const;
+
+        /** Add a policy. @return its index */
+        uint64_t addPolicy(std::vector<uint64_t> const& policy);
+        /** @return the policy with the given index, or nothing if the policy was removed */
+        std::optional<std::vector<uint64_t>> getPolicy(uint64_t index) const;
+        /** @return the policy with the given index; the policy must not be removed */
+        std::vector<uint64_t> const& policy(uint64_t index) const;
+        /** Whether the policy with the given index was not removed. */
+        bool hasPolicy(uint64_t index) const;
+        /** Whether the policy with the given index was changed since it was added. */
+        bool policyModified(uint64_t index) const;
+        /** Remove the policy with the given index. */
+        void removePolicy(uint64_t index);
+
+        /** Whether both policies select the same action in every state where both of them are defined. */
+        bool policiesAreCompatible(uint64_t index1, uint64_t index2) const;
+        /**
+         * If the policies are compatible, extend the first policy by the actions of the second one.
+         * @return whether the policies were merged
+         */
+        bool mergePolicies(uint64_t index1, uint64_t index2);
+        /**
+         * Merge each policy into the first preceding policy (in the given order) it is compatible with. Merged
+         * policies are removed.
+         * @return for each policy, the index of the policy it was merged into, or its own index
+         */
+        std::vector<uint64_t> mergeCompatiblePolicies(std::vector<uint64_t> const& policy_indices);
+
+        /**
+         * Prepare candidate policies for the given families. The candidate for a pair (policy,other) is the policy
+         * completed by the actions of the other policy and, in the states where both are undefined, by the first
+         * available action. The candidate is restricted to the states reachable in the MDP obtained by applying it
+         * to the family; the candidate can be adopted via adoptCandidate().
+         * @param policy_pairs Pairs (policy,other) of policy indices.
+         * @param family_choices For each pair, choices of the quotient compatible with the family.
+         * @return for each candidate, the choices of the quotient selected by applying it to the family
+         */
+        std::vector<storm::storage::BitVector> prepareCandidates(
+            std::vector<std::pair<uint64_t,uint64_t>> const& policy_pairs,
+            std::vector<storm::storage::BitVector> const& family_choices
+        );
+        /** Replace the policy with the given index by a candidate prepared by the last call to prepareCandidates(). */
+        void adoptCandidate(uint64_t index, uint64_t candidate);
+
+    private:
+
+        uint64_t num_states;
+        uint64_t num_actions;
+        std::vector<uint64_t> row_groups;
+        std::vector<uint64_t> choice_to_action;
+        storm::storage::BitVector initial_states;
+        /** For each choice of the quotient, its successor states. */
+        std::vector<std::vector<uint64_t>> choice_destinations;
+        /** For each state of the quotient, its available action with the lowest index. */
+        std::vector<uint64_t> state_first_action;
+
+        std::vector<std::vector<uint64_t>> policies;
+        /** For each policy, states in which it is defined. */
+        std::vector<storm::storage::BitVector> policy_masks;
+        std::vector<bool> policy_removed;
+        std::vector<bool> policy_modified;
+        std::vector<std::vector<uint64_t>> candidates;
+
+        storm::storage::BitVector definedStates(std::vector<uint64_t> const& policy) const;
+    };
+
+}
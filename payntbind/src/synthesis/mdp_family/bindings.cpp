@@ -1,8 +1,11 @@
 #include "../synthesis.h"
 
 #include "MemoryUnfolder.h"
+#include "PolicyTreePostprocessor.h"
 #include <storm/adapters/RationalNumberAdapter.h>
 
+#include <pybind11/numpy.h>
+
 template<typename ValueType>
 void bindings_mdp_family_vt(py::module& m, std::string const& vtSuffix) {
 
@@ -23,4 +26,52 @@ void bindings_mdp_family_vt(py::module& m, std::string const& vtSuffix) {
 void bindings_mdp_family(py::module& m) {
     bindings_mdp_family_vt<double>(m, "");
     bindings_mdp_family_vt<storm::RationalNumber>(m, "Exact");
+
+    py::class_<synthesis::PolicyTreePostprocessor<double>>(m, "PolicyTreePostprocessor", "Policies of a policy tree being post-processed")
+        .def(py::init<storm::models::sparse::Mdp<double> const&, uint64_t, std::vector<uint64_t> const&>(),
+            "Constructor.", py::arg("quotient"), py::arg("num_actions"), py::arg("choice_to_action")
+        )
+        .def_property_readonly("num_actions", &synthesis::PolicyTreePostprocessor<double>::numActions)
+        .def("add_policy", &synthesis::PolicyTreePostprocessor<double>::addPolicy, py::arg("policy"))
+        .def("get_policy", &synthesis::PolicyTreePostprocessor<double>::getPolicy, py::arg("index"))
+        // policies given as NumPy int32 arrays in which -1 marks undefined states, see policy_tree.py
+        .def("add_policy_array", [](
+                synthesis::PolicyTreePostprocessor<double>& postprocessor,
+                py::array_t<int32_t, py::array::c_style | py::array::forcecast> const& policy
+            ) {
+                auto actions = policy.unchecked<1>();
+                std::vector<uint64_t> native(actions.shape(0));
+                for(uint64_t state = 0; state < native.size(); ++state) {
+                    native[state] = actions(state) < 0 ? postprocessor.numActions() : actions(state);
+                }
+                return postprocessor.addPolicy(native);
+            }, py::arg("policy"))
+        .def("get_policy_array", [](
+                synthesis::PolicyTreePostprocessor<double> const& postprocessor, uint64_t index
+            ) -> std::optional<py::array_t<int32_t>> {
+                if(not postprocessor.hasPolicy(index)) {
+                    return std::nullopt;
+                }
+                auto const& native = postprocessor.policy(index);
+                py::array_t<int32_t> policy(native.size());
+                auto actions = policy.mutable_unchecked<1>();
+                for(uint64_t state = 0; state < native.size(); ++state) {
+                    actions(state) = native[state] == postprocessor.numActions() ? -1 : native[state];
+                }
+                return policy;
+            }, py::arg("index"))
+        .def("has_policy", &synthesis::PolicyTreePostprocessor<double>::hasPolicy, py::arg("index"))
+        .def("policy_modified", &synthesis::PolicyTreePostprocessor<double>::policyModified, py::arg("index"))
+        .def("remove_policy", &synthesis::PolicyTreePostprocessor<double>::removePolicy, py::arg("index"))
+        .def("policies_are_compatible", &synthesis::PolicyTreePostprocessor<double>::policiesAreCompatible,
+            py::arg("index1"), py::arg("index2"))
+        .def("merge_policies", &synthesis::PolicyTreePostprocessor<double>::mergePolicies,
+            py::arg("index1"), py::arg("index2"))
+        .def("merge_compatible_policies", &synthesis::PolicyTreePostprocessor<double>::mergeCompatiblePolicies,
+            py::arg("policy_indices"))
+        .def("prepare_candidates", &synthesis::PolicyTreePostprocessor<double>::prepareCandidates,
+            py::arg("policy_pairs"), py::arg("family_choices"))
+        .def("adopt_candidate", &synthesis::PolicyTreePostprocessor<double>::adoptCandidate,
+            py::arg("index"), py::arg("candidate"))
+        ;
 }
@@ -21,10 +21,15 @@ Coloring::Coloring(
 
     auto num_holes = family.numHoles();
     choice_to_holes.resize(num_choices);
+    hole_option_to_choices.resize(num_holes);
+    for(uint64_t hole = 0; hole<num_holes; ++hole) {
+        hole_option_to_choices[hole].resize(family.holeNumOptionsTotal(hole));
+    }
     for(uint64_t choice = 0; choice<num_choices; ++choice) {
         choice_to_holes[choice] = BitVector(num_holes,false);
         for(auto const& [hole,option]: choice_to_assignment[choice]) {
             choice_to_holes[choice].set(hole,true);
+            hole_option_to_choices[hole][option].push_back(choice);
         }
     }
 
@@ -51,6 +56,10 @@ std::vector<BitVector> const& Coloring::getStateToHoles() const {
     return state_to_holes;
 }
 
+std::vector<std::vector<std::vector<uint64_t>>> const& Coloring::getHoleOptionToChoices() const {
+    return hole_option_to_choices;
+}
+
 BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
     auto selection = BitVector(uncolored_choices);
     for(auto choice: colored_choices) {
@@ -61,6 +70,21 @@ BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
     return selection;
 }
 
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t splitter) const {
+    auto selection = BitVector(base_choices);
+    // only choices colored by the removed options of the splitter have become incompatible
+    auto const& option_to_choices = hole_option_to_choices[splitter];
+    for(uint64_t option = 0; option < option_to_choices.size(); ++option) {
+        if(subfamily.holeContains(splitter,option)) {
+            continue;
+        }
+        for(auto choice: option_to_choices[option]) {
+            selection.set(choice,false);
+        }
+    }
+    return selection;
+}
+
 
 
 std::vector<BitVector> Coloring::collectHoleOptionsMask(BitVector const& choices) const {
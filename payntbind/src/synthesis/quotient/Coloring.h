@@ -25,9 +25,16 @@ public:
     std::vector<std::vector<std::pair<uint64_t,uint64_t>>> const& getChoiceToAssignment() const;
     /** Get a mapping from states to holes involved in its choices. */
     std::vector<BitVector> const& getStateToHoles() const;
+    /** For each hole and each of its options, get the (sorted) list of choices colored by this hole-option pair. */
+    std::vector<std::vector<std::vector<uint64_t>>> const& getHoleOptionToChoices() const;
     
     /** Get a mask of choices compatible with the family. */
     BitVector selectCompatibleChoices(Family const& subfamily) const;
+    /**
+     * Get a mask of choices compatible with the family, assuming that the family was obtained from the family of the
+     * base choices by restricting the options of the splitter.
+     */
+    BitVector selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t splitter) const;
     /** For each hole, collect options (colors) involved in any of the given choices. */
     std::vector<std::vector<uint64_t>> collectHoleOptions(BitVector const& choices) const;
     
@@ -41,8 +48,10 @@ protected:
     /** Number of choices in the quotient. */
     const uint64_t numChoices() const;
     
-    /** For each state, identification of holes associated with its choices. */
+    /** For each choice, identification of holes associated with it. */
     std::vector<BitVector> choice_to_holes;
+    /** For each hole and each of its options, a list of choices colored by this hole-option pair. */
+    std::vector<std::vector<std::vector<uint64_t>>> hole_option_to_choices;
     /** For each state, identification of holes associated with its choices. */
     std::vector<BitVector> state_to_holes;
 
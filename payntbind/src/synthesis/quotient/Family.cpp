@@ -1,5 +1,9 @@
 #include "Coloring.h"
 
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/macros.h>
+
+#include <algorithm>
 #include <iostream>
 
 
@@ -148,4 +152,38 @@ BitVector const& Family::getChoices() const {
     return choices;
 }
 
-}
\ No newline at end of file
+
+std::vector<uint64_t> Family::pack() const {
+    std::vector<uint64_t> words;
+    words.push_back(numHoles());
+    for(auto const& mask: hole_options_mask) {
+        uint64_t num_options = mask.size();
+        words.push_back(num_options);
+        for(uint64_t bit = 0; bit < num_options; bit += 64) {
+            words.push_back(mask.getAsInt(bit, std::min<uint64_t>(64, num_options-bit)));
+        }
+    }
+    return words;
+}
+
+Family Family::unpack(uint64_t const* words, uint64_t num_words) {
+    STORM_LOG_THROW(num_words > 0, storm::exceptions::InvalidArgumentException, "Packed family is empty.");
+    Family family;
+    uint64_t index = 0;
+    uint64_t num_holes = words[index++];
+    family.hole_options.resize(num_holes);
+    family.hole_options_mask.resize(num_holes);
+    for(uint64_t hole = 0; hole < num_holes; ++hole) {
+        STORM_LOG_THROW(index < num_words, storm::exceptions::InvalidArgumentException, "Packed family is truncated.");
+        uint64_t num_options = words[index++];
+        BitVector mask(num_options,false);
+        for(uint64_t bit = 0; bit < num_options; bit += 64) {
+            STORM_LOG_THROW(index < num_words, storm::exceptions::InvalidArgumentException, "Packed family is truncated.");
+            mask.setFromInt(bit, std::min<uint64_t>(64, num_options-bit), words[index++]);
+        }
+        family.holeSetOptions(hole,mask);
+    }
+    return family;
+}
+
+}
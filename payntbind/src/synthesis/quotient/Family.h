@@ -48,6 +48,14 @@ public:
     void setChoices(BitVector&& choices);
     BitVector const& getChoices() const;
 
+    /**
+     * Pack hole options into a flat word buffer: the number of holes followed, for each hole, by the total number of
+     * its options and by the bits of its option mask (64 options per word).
+     */
+    std::vector<uint64_t> pack() const;
+    /** Reconstruct the family from the buffer produced by pack(). */
+    static Family unpack(uint64_t const* words, uint64_t num_words);
+
 protected:
 
     /** For each hole, a list of available options. */
@@ -0,0 +1,103 @@
+#include "FamilySmtSolver.h"
+
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/macros.h>
+
+#include <string>
+
+namespace synthesis {
+
+FamilySmtSolver::FamilySmtSolver(Family const& design_space) : design_space(design_space), solver(ctx) {
+    for(uint64_t hole = 0; hole < design_space.numHoles(); ++hole) {
+        this->hole_variables.push_back(ctx.int_const(std::to_string(hole).c_str()));
+    }
+}
+
+z3::expr FamilySmtSolver::holeRestriction(Family const& family, uint64_t hole) {
+    z3::expr_vector options(ctx);
+    for(auto option: family.holeOptions(hole)) {
+        options.push_back(this->hole_variables[hole] == (int)option);
+    }
+    return z3::mk_or(options);
+}
+
+uint64_t FamilySmtSolver::addFamily(Family const& family) {
+    STORM_LOG_THROW(
+        family.numHoles() == this->design_space.numHoles(), storm::exceptions::InvalidArgumentException,
+        "the family does not belong to the design space"
+    );
+    uint64_t family_index = this->family_literals.size();
+    z3::expr literal = ctx.bool_const(("family_" + std::to_string(family_index)).c_str());
+    z3::expr_vector restrictions(ctx);
+    for(uint64_t hole = 0; hole < family.numHoles(); ++hole) {
+        restrictions.push_back(this->holeRestriction(family,hole));
+    }
+    this->solver.add(z3::implies(literal, z3::mk_and(restrictions)));
+    this->family_literals.push_back(literal);
+    return family_index;
+}
+
+void FamilySmtSolver::releaseFamily(uint64_t family_index) {
+    this->solver.add(not this->family_literals[family_index]);
+}
+
+std::vector<uint64_t> FamilySmtSolver::readAssignment() {
+    z3::model model = this->solver.get_model();
+    std::vector<uint64_t> assignment;
+    for(auto const& variable: this->hole_variables) {
+        assignment.push_back(model.eval(variable, true).get_numeral_uint64());
+    }
+    return assignment;
+}
+
+std::optional<std::vector<uint64_t>> FamilySmtSolver::pickAssignment(uint64_t family_index) {
+    z3::expr_vector assumptions(ctx);
+    assumptions.push_back(this->family_literals[family_index]);
+    if(this->solver.check(assumptions) != z3::sat) {
+        return std::nullopt;
+    }
+    return this->readAssignment();
+}
+
+std::vector<std::vector<uint64_t>> FamilySmtSolver::pickAssignments(uint64_t family_index, uint64_t num_assignments) {
+    z3::expr blocking_literal = ctx.bool_const(("batch_" + std::to_string(this->num_batches++)).c_str());
+    z3::expr_vector assumptions(ctx);
+    assumptions.push_back(this->family_literals[family_index]);
+    assumptions.push_back(blocking_literal);
+    std::vector<std::vector<uint64_t>> assignments;
+    while(assignments.size() < num_assignments and this->solver.check(assumptions) == z3::sat) {
+        auto assignment = this->readAssignment();
+        z3::expr_vector hole_options(ctx);
+        for(uint64_t hole = 0; hole < assignment.size(); ++hole) {
+            hole_options.push_back(this->hole_variables[hole] == (int)assignment[hole]);
+        }
+        this->solver.add(z3::implies(blocking_literal, not z3::mk_and(hole_options)));
+        assignments.push_back(std::move(assignment));
+    }
+    this->solver.add(not blocking_literal);
+    return assignments;
+}
+
+void FamilySmtSolver::excludeConflict(
+    Family const& family, std::vector<uint64_t> const& assignment, std::vector<uint64_t> const& conflict
+) {
+    BitVector hole_in_conflict(family.numHoles(), false);
+    for(auto hole: conflict) {
+        hole_in_conflict.set(hole,true);
+    }
+    z3::expr_vector clauses(ctx);
+    for(uint64_t hole = 0; hole < family.numHoles(); ++hole) {
+        if(hole_in_conflict[hole]) {
+            clauses.push_back(this->hole_variables[hole] == (int)assignment[hole]);
+        } else if(family.holeNumOptions(hole) < family.holeNumOptionsTotal(hole)) {
+            clauses.push_back(this->holeRestriction(family,hole));
+        }
+    }
+    if(clauses.empty()) {
+        this->solver.add(ctx.bool_val(false));
+        return;
+    }
+    this->solver.add(not z3::mk_and(clauses));
+}
+
+}
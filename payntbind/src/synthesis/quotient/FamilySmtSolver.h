@@ -0,0 +1,72 @@
+#pragma once
+
+#include "src/synthesis/quotient/Family.h"
+
+#include <cstdint>
+#include <optional>
+#include <vector>
+
+#include <z3++.h>
+
+namespace synthesis {
+
+/**
+ * SMT encoding of the unexplored part of a design space used by CEGIS. Each hole is represented by an integer
+ * variable. A family is encoded via an activation literal implying that each hole takes one of the options of the
+ * family, such that the family is considered by adding its literal to the assumptions of the solver. Conflicts are
+ * asserted globally, hence the solver is never reset and keeps all learned clauses.
+ */
+class FamilySmtSolver {
+public:
+
+    /**
+     * @param design_space Family over which the assignments are picked.
+     */
+    FamilySmtSolver(Family const& design_space);
+
+    /** Encode a family of the design space. @return index of the family encoding */
+    uint64_t addFamily(Family const& family);
+    /** Disable the family encoding, its activation literal will not be assumed anymore. */
+    void releaseFamily(uint64_t family_index);
+
+    /**
+     * Pick an unexplored assignment from the family.
+     * @return for each hole, its option, or nothing if the family has no unexplored assignments
+     */
+    std::optional<std::vector<uint64_t>> pickAssignment(uint64_t family_index);
+    /**
+     * Pick distinct unexplored assignments from the family. Assignments picked so far are blocked by clauses guarded
+     * by a fresh literal that is disabled afterwards, such that the assignments are excluded only by the conflicts
+     * constructed for them.
+     * @return at most num_assignments assignments, empty if the family has no unexplored assignments
+     */
+    std::vector<std::vector<uint64_t>> pickAssignments(uint64_t family_index, uint64_t num_assignments);
+
+    /**
+     * Exclude assignments of the family that agree with the given assignment on the holes of the conflict.
+     * @param family Family in which the conflict was constructed.
+     * @param assignment For each hole, its option.
+     * @param conflict Holes relevant for the conflict.
+     */
+    void excludeConflict(Family const& family, std::vector<uint64_t> const& assignment, std::vector<uint64_t> const& conflict);
+
+protected:
+
+    Family design_space;
+    z3::context ctx;
+    z3::solver solver;
+    /** For each hole, its variable. */
+    std::vector<z3::expr> hole_variables;
+    /** For each family encoding, its activation literal. */
+    std::vector<z3::expr> family_literals;
+    /** Number of batches of picked assignments, used to name their blocking literals. */
+    uint64_t num_batches = 0;
+
+    /** @return assignment from the model of the last satisfiable check */
+    std::vector<uint64_t> readAssignment();
+
+    /** @return formula restricting the hole to the options of the family */
+    z3::expr holeRestriction(Family const& family, uint64_t hole);
+};
+
+}
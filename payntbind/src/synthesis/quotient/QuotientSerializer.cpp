@@ -0,0 +1,368 @@
+#include "QuotientSerializer.h"
+
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/models/sparse/StateLabeling.h>
+#include <storm/models/sparse/ChoiceLabeling.h>
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/storage/sparse/StateValuations.h>
+#include <storm/storage/expressions/ExpressionManager.h>
+#include <storm/utility/builder.h>
+#include <storm/utility/macros.h>
+#include <storm/exceptions/FileIoException.h>
+#include <storm/exceptions/NotSupportedException.h>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <cstring>
+#include <fstream>
+
+namespace synthesis {
+
+namespace {
+
+    /** "PAYNTQ01" */
+    const uint64_t QUOTIENT_FILE_MAGIC = 0x313051544e594150;
+
+    const uint64_t VARIABLE_BOOLEAN = 0;
+    const uint64_t VARIABLE_INTEGER = 1;
+
+    class WordWriter {
+    public:
+        WordWriter(std::string const& path) : file(path, std::ios::binary | std::ios::trunc) {
+            STORM_LOG_THROW(file.good(), storm::exceptions::FileIoException, "cannot open " << path << " for writing");
+        }
+
+        void write(uint64_t word) {
+            file.write(reinterpret_cast<char const*>(&word), sizeof(uint64_t));
+        }
+
+        void writeDouble(double value) {
+            uint64_t word;
+            std::memcpy(&word, &value, sizeof(uint64_t));
+            write(word);
+        }
+
+        void writeString(std::string const& string) {
+            write(string.size());
+            std::vector<uint64_t> words((string.size()+7)/8, 0);
+            std::memcpy(words.data(), string.data(), string.size());
+            for(uint64_t word: words) {
+                write(word);
+            }
+        }
+
+        void writeBitVector(storm::storage::BitVector const& bits) {
+            write(bits.getNumberOfSetBits());
+            for(uint64_t index: bits) {
+                write(index);
+            }
+        }
+
+        void writeVector(std::vector<double> const& values) {
+            for(double value: values) {
+                writeDouble(value);
+            }
+        }
+
+        void close() {
+            file.close();
+            STORM_LOG_THROW(not file.fail(), storm::exceptions::FileIoException, "failed to write the quotient");
+        }
+
+    private:
+        std::ofstream file;
+    };
+
+    class WordReader {
+    public:
+        WordReader(std::string const& path) {
+            int fd = open(path.c_str(), O_RDONLY);
+            STORM_LOG_THROW(fd >= 0, storm::exceptions::FileIoException, "cannot open " << path);
+            struct stat file_stat;
+            fstat(fd, &file_stat);
+            size = file_stat.st_size;
+            STORM_LOG_THROW(size > 0 and size % sizeof(uint64_t) == 0, storm::exceptions::FileIoException,
+                path << " is not a valid quotient file");
+            data = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+            ::close(fd);
+            STORM_LOG_THROW(data != MAP_FAILED, storm::exceptions::FileIoException, "cannot map " << path);
+            words = static_cast<uint64_t const*>(data);
+            num_words = size / sizeof(uint64_t);
+        }
+
+        ~WordReader() {
+            munmap(data, size);
+        }
+
+        uint64_t read() {
+            STORM_LOG_THROW(position < num_words, storm::exceptions::FileIoException, "unexpected end of the quotient file");
+            return words[position++];
+        }
+
+        double readDouble() {
+            uint64_t word = read();
+            double value;
+            std::memcpy(&value, &word, sizeof(uint64_t));
+            return value;
+        }
+
+        std::string readString() {
+            uint64_t length = read();
+            uint64_t string_words = (length+7)/8;
+            STORM_LOG_THROW(position + string_words <= num_words, storm::exceptions::FileIoException,
+                "unexpected end of the quotient file");
+            std::string string(reinterpret_cast<char const*>(words + position), length);
+            position += string_words;
+            return string;
+        }
+
+        storm::storage::BitVector readBitVector(uint64_t size) {
+            storm::storage::BitVector bits(size,false);
+            uint64_t num_set_bits = read();
+            for(uint64_t index = 0; index < num_set_bits; ++index) {
+                bits.set(read(),true);
+            }
+            return bits;
+        }
+
+        std::vector<double> readVector(uint64_t size) {
+            std::vector<double> values(size);
+            for(uint64_t index = 0; index < size; ++index) {
+                values[index] = readDouble();
+            }
+            return values;
+        }
+
+    private:
+        void *data;
+        size_t size;
+        uint64_t const* words;
+        uint64_t num_words;
+        uint64_t position = 0;
+    };
+
+}
+
+
+void writeQuotient(
+    std::string const& path,
+    storm::models::sparse::Model<double> const& model,
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> const& choice_to_hole_options
+) {
+    auto model_type = model.getType();
+    STORM_LOG_THROW(
+        model_type == storm::models::ModelType::Dtmc or model_type == storm::models::ModelType::Mdp,
+        storm::exceptions::NotSupportedException, "only DTMC and MDP quotients can be stored"
+    );
+    uint64_t num_states = model.getNumberOfStates();
+    uint64_t num_choices = model.getNumberOfChoices();
+    STORM_LOG_THROW(choice_to_hole_options.size() == num_choices, storm::exceptions::NotSupportedException,
+        "expected hole options for each choice of the quotient");
+    auto const& matrix = model.getTransitionMatrix();
+
+    WordWriter writer(path);
+    writer.write(QUOTIENT_FILE_MAGIC);
+    writer.write(model_type == storm::models::ModelType::Mdp);
+    writer.write(num_states);
+    writer.write(num_choices);
+    writer.write(matrix.getEntryCount());
+
+    // transition matrix
+    for(uint64_t state = 0; state < num_states; ++state) {
+        writer.write(model.isNondeterministicModel() ? matrix.getRowGroupIndices()[state] : state);
+    }
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        writer.write(matrix.getRow(choice).getNumberOfEntries());
+        for(auto const& entry: matrix.getRow(choice)) {
+            writer.write(entry.getColumn());
+            writer.writeDouble(entry.getValue());
+        }
+    }
+
+    // labelings
+    auto const& state_labeling = model.getStateLabeling();
+    writer.write(state_labeling.getNumberOfLabels());
+    for(auto const& label: state_labeling.getLabels()) {
+        writer.writeString(label);
+        writer.writeBitVector(state_labeling.getStates(label));
+    }
+    writer.write(model.hasChoiceLabeling());
+    if(model.hasChoiceLabeling()) {
+        auto const& choice_labeling = model.getChoiceLabeling();
+        writer.write(choice_labeling.getNumberOfLabels());
+        for(auto const& label: choice_labeling.getLabels()) {
+            writer.writeString(label);
+            writer.writeBitVector(choice_labeling.getChoices(label));
+        }
+    }
+
+    // reward models
+    writer.write(model.getRewardModels().size());
+    for(auto const& [name,reward_model]: model.getRewardModels()) {
+        STORM_LOG_THROW(not reward_model.hasTransitionRewards(), storm::exceptions::NotSupportedException,
+            "transition rewards cannot be stored");
+        writer.writeString(name);
+        writer.write(reward_model.hasStateRewards());
+        if(reward_model.hasStateRewards()) {
+            writer.writeVector(reward_model.getStateRewardVector());
+        }
+        writer.write(reward_model.hasStateActionRewards());
+        if(reward_model.hasStateActionRewards()) {
+            writer.writeVector(reward_model.getStateActionRewardVector());
+        }
+    }
+
+    // state valuations
+    writer.write(model.hasStateValuations());
+    if(model.hasStateValuations()) {
+        auto const& state_valuations = model.getStateValuations();
+        std::vector<std::pair<std::string,uint64_t>> variables;
+        for(auto it = state_valuations.at(0).begin(); it != state_valuations.at(0).end(); ++it) {
+            STORM_LOG_THROW(it.isVariableAssignment() and (it.isBoolean() or it.isInteger()),
+                storm::exceptions::NotSupportedException, "only Boolean and integer state valuations can be stored");
+            variables.emplace_back(it.getName(), it.isBoolean() ? VARIABLE_BOOLEAN : VARIABLE_INTEGER);
+        }
+        writer.write(variables.size());
+        for(auto const& [name,type]: variables) {
+            writer.writeString(name);
+            writer.write(type);
+        }
+        for(uint64_t state = 0; state < num_states; ++state) {
+            for(auto it = state_valuations.at(state).begin(); it != state_valuations.at(state).end(); ++it) {
+                writer.write(it.isBoolean() ? (uint64_t)it.getBooleanValue() : (uint64_t)it.getIntegerValue());
+            }
+        }
+    }
+
+    // hole options
+    for(auto const& hole_options: choice_to_hole_options) {
+        writer.write(hole_options.size());
+        for(auto const& [hole,option]: hole_options) {
+            writer.write(hole);
+            writer.write(option);
+        }
+    }
+    writer.close();
+}
+
+
+std::pair<std::shared_ptr<storm::models::sparse::Model<double>>,std::vector<std::vector<std::pair<uint64_t,uint64_t>>>> readQuotient(
+    std::string const& path
+) {
+    WordReader reader(path);
+    STORM_LOG_THROW(reader.read() == QUOTIENT_FILE_MAGIC, storm::exceptions::FileIoException,
+        path << " is not a valid quotient file");
+    bool is_mdp = reader.read();
+    uint64_t num_states = reader.read();
+    uint64_t num_choices = reader.read();
+    uint64_t num_entries = reader.read();
+
+    // transition matrix
+    std::vector<uint64_t> row_groups(num_states);
+    for(uint64_t state = 0; state < num_states; ++state) {
+        row_groups[state] = reader.read();
+    }
+    storm::storage::SparseMatrixBuilder<double> builder(
+        num_choices, num_states, num_entries, true, is_mdp, is_mdp ? num_states : 0
+    );
+    uint64_t state = 0;
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        if(is_mdp) {
+            while(state < num_states and row_groups[state] == choice) {
+                builder.newRowGroup(choice);
+                ++state;
+            }
+        }
+        uint64_t row_entries = reader.read();
+        for(uint64_t entry = 0; entry < row_entries; ++entry) {
+            uint64_t column = reader.read();
+            builder.addNextValue(choice, column, reader.readDouble());
+        }
+    }
+    storm::storage::sparse::ModelComponents<double> components(builder.build());
+
+    // labelings
+    components.stateLabeling = storm::models::sparse::StateLabeling(num_states);
+    uint64_t num_state_labels = reader.read();
+    for(uint64_t label = 0; label < num_state_labels; ++label) {
+        std::string name = reader.readString();
+        components.stateLabeling.addLabel(name, reader.readBitVector(num_states));
+    }
+    if(reader.read()) {
+        storm::models::sparse::ChoiceLabeling choice_labeling(num_choices);
+        uint64_t num_choice_labels = reader.read();
+        for(uint64_t label = 0; label < num_choice_labels; ++label) {
+            std::string name = reader.readString();
+            choice_labeling.addLabel(name, reader.readBitVector(num_choices));
+        }
+        components.choiceLabeling = std::move(choice_labeling);
+    }
+
+    // reward models
+    uint64_t num_reward_models = reader.read();
+    for(uint64_t index = 0; index < num_reward_models; ++index) {
+        std::string name = reader.readString();
+        std::optional<std::vector<double>> state_rewards;
+        if(reader.read()) {
+            state_rewards = reader.readVector(num_states);
+        }
+        std::optional<std::vector<double>> state_action_rewards;
+        if(reader.read()) {
+            state_action_rewards = reader.readVector(num_choices);
+        }
+        components.rewardModels.emplace(
+            name, storm::models::sparse::StandardRewardModel<double>(std::move(state_rewards), std::move(state_action_rewards))
+        );
+    }
+
+    // state valuations
+    if(reader.read()) {
+        auto manager = std::make_shared<storm::expressions::ExpressionManager>();
+        storm::storage::sparse::StateValuationsBuilder valuations_builder;
+        uint64_t num_variables = reader.read();
+        std::vector<bool> variable_is_boolean(num_variables);
+        for(uint64_t variable = 0; variable < num_variables; ++variable) {
+            std::string name = reader.readString();
+            variable_is_boolean[variable] = reader.read() == VARIABLE_BOOLEAN;
+            if(variable_is_boolean[variable]) {
+                valuations_builder.addVariable(manager->declareBooleanVariable(name));
+            } else {
+                valuations_builder.addVariable(manager->declareIntegerVariable(name));
+            }
+        }
+        for(uint64_t state = 0; state < num_states; ++state) {
+            std::vector<bool> boolean_values;
+            std::vector<int64_t> integer_values;
+            for(uint64_t variable = 0; variable < num_variables; ++variable) {
+                uint64_t value = reader.read();
+                if(variable_is_boolean[variable]) {
+                    boolean_values.push_back(value != 0);
+                } else {
+                    integer_values.push_back((int64_t)value);
+                }
+            }
+            valuations_builder.addState(state, std::move(boolean_values), std::move(integer_values));
+        }
+        components.stateValuations = valuations_builder.build();
+    }
+
+    // hole options
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> choice_to_hole_options(num_choices);
+    for(uint64_t choice = 0; choice < num_choices; ++choice) {
+        uint64_t num_hole_options = reader.read();
+        for(uint64_t index = 0; index < num_hole_options; ++index) {
+            uint64_t hole = reader.read();
+            choice_to_hole_options[choice].emplace_back(hole, reader.read());
+        }
+    }
+
+    auto model_type = is_mdp ? storm::models::ModelType::Mdp : storm::models::ModelType::Dtmc;
+    auto model = storm::utility::builder::buildModelFromComponents<double>(model_type, std::move(components));
+    return std::make_pair(model, choice_to_hole_options);
+}
+
+}
@@ -0,0 +1,36 @@
+#pragma once
+
+#include <storm/models/sparse/Model.h>
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Store the quotient (DTMC or MDP) together with the hole assignments of its choices into a binary file. The file
+ * consists of flat arrays of 64-bit words, such that it can be memory-mapped when loaded. State labels, choice
+ * labels, state-based and state-action-based rewards and state valuations over Boolean and integer variables are
+ * preserved; choice origins are dropped.
+ * @param path output file
+ * @param model the quotient
+ * @param choice_to_hole_options for each choice of the quotient, hole options associated with this choice
+ */
+void writeQuotient(
+    std::string const& path,
+    storm::models::sparse::Model<double> const& model,
+    std::vector<std::vector<std::pair<uint64_t,uint64_t>>> const& choice_to_hole_options
+);
+
+/**
+ * Load the quotient stored via writeQuotient.
+ * @return the quotient and hole options associated with its choices
+ */
+std::pair<std::shared_ptr<storm::models::sparse::Model<double>>,std::vector<std::vector<std::pair<uint64_t,uint64_t>>>> readQuotient(
+    std::string const& path
+);
+
+}
@@ -0,0 +1,141 @@
+#include "SubMdpRestriction.h"
+
+#include <storm/adapters/RationalNumberAdapter.h>
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/utility/vector.h>
+#include <storm/exceptions/InvalidModelException.h>
+#include <storm/exceptions/NotSupportedException.h>
+
+#include <queue>
+
+namespace synthesis {
+
+template<typename ValueType>
+std::tuple<std::shared_ptr<storm::models::sparse::Mdp<ValueType>>,std::vector<uint64_t>,std::vector<uint64_t>> restrictSubMdp(
+    storm::models::sparse::Mdp<ValueType> const& mdp,
+    std::vector<uint64_t> const& state_map,
+    std::vector<uint64_t> const& choice_map,
+    storm::storage::BitVector const& choices
+) {
+    auto const& matrix = mdp.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = mdp.getNumberOfStates();
+    uint64_t num_rows = mdp.getNumberOfChoices();
+
+    storm::storage::BitVector row_enabled(num_rows,false);
+    for(uint64_t row = 0; row < num_rows; ++row) {
+        if(choices[choice_map[row]]) {
+            row_enabled.set(row,true);
+        }
+    }
+
+    // keep only states reachable via enabled rows
+    storm::storage::BitVector state_reachable(num_states,false);
+    std::queue<uint64_t> state_queue;
+    for(auto state: mdp.getInitialStates()) {
+        state_reachable.set(state,true);
+        state_queue.push(state);
+    }
+    while(not state_queue.empty()) {
+        auto state = state_queue.front();
+        state_queue.pop();
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+            if(not row_enabled[row]) {
+                continue;
+            }
+            for(auto const& entry: matrix.getRow(row)) {
+                auto dst = entry.getColumn();
+                if(not state_reachable[dst]) {
+                    state_reachable.set(dst,true);
+                    state_queue.push(dst);
+                }
+            }
+        }
+    }
+
+    uint64_t num_states_restricted = state_reachable.getNumberOfSetBits();
+    std::vector<uint64_t> state_to_restricted_state(num_states,num_states_restricted);
+    std::vector<uint64_t> restricted_state_map;
+    restricted_state_map.reserve(num_states_restricted);
+    storm::storage::BitVector row_kept(num_rows,false);
+    uint64_t num_entries = 0;
+    for(auto state: state_reachable) {
+        state_to_restricted_state[state] = restricted_state_map.size();
+        restricted_state_map.push_back(state_map[state]);
+        bool state_has_row = false;
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+            if(not row_enabled[row]) {
+                continue;
+            }
+            row_kept.set(row,true);
+            num_entries += matrix.getRow(row).getNumberOfEntries();
+            state_has_row = true;
+        }
+        STORM_LOG_THROW(state_has_row, storm::exceptions::InvalidModelException,
+            "reachable state " << state << " has no enabled choices");
+    }
+
+    uint64_t num_rows_restricted = row_kept.getNumberOfSetBits();
+    std::vector<uint64_t> restricted_choice_map;
+    restricted_choice_map.reserve(num_rows_restricted);
+    storm::storage::SparseMatrixBuilder<ValueType> builder(
+        num_rows_restricted, num_states_restricted, num_entries, true, true, num_states_restricted
+    );
+    for(auto state: state_reachable) {
+        builder.newRowGroup(restricted_choice_map.size());
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+            if(not row_kept[row]) {
+                continue;
+            }
+            uint64_t restricted_row = restricted_choice_map.size();
+            for(auto const& entry: matrix.getRow(row)) {
+                builder.addNextValue(restricted_row, state_to_restricted_state[entry.getColumn()], entry.getValue());
+            }
+            restricted_choice_map.push_back(choice_map[row]);
+        }
+    }
+
+    storm::storage::sparse::ModelComponents<ValueType> components(builder.build(), mdp.getStateLabeling().getSubLabeling(state_reachable));
+    for(auto const& [reward_name,reward_model]: mdp.getRewardModels()) {
+        STORM_LOG_THROW(not reward_model.hasTransitionRewards(), storm::exceptions::NotSupportedException,
+            "transition rewards are not supported");
+        std::optional<std::vector<ValueType>> state_rewards;
+        std::optional<std::vector<ValueType>> action_rewards;
+        if(reward_model.hasStateRewards()) {
+            state_rewards = storm::utility::vector::filterVector(reward_model.getStateRewardVector(), state_reachable);
+        }
+        if(reward_model.hasStateActionRewards()) {
+            action_rewards = storm::utility::vector::filterVector(reward_model.getStateActionRewardVector(), row_kept);
+        }
+        components.rewardModels.emplace(
+            reward_name, storm::models::sparse::StandardRewardModel<ValueType>(std::move(state_rewards), std::move(action_rewards))
+        );
+    }
+    if(mdp.hasChoiceLabeling()) {
+        components.choiceLabeling = mdp.getChoiceLabeling().getSubLabeling(row_kept);
+    }
+    if(mdp.hasStateValuations()) {
+        components.stateValuations = mdp.getStateValuations().selectStates(state_reachable);
+    }
+    if(mdp.hasChoiceOrigins()) {
+        components.choiceOrigins = mdp.getChoiceOrigins()->selectChoices(row_kept);
+    }
+    auto restricted_mdp = std::make_shared<storm::models::sparse::Mdp<ValueType>>(std::move(components));
+    return std::make_tuple(restricted_mdp, restricted_state_map, restricted_choice_map);
+}
+
+
+template std::tuple<std::shared_ptr<storm::models::sparse::Mdp<double>>,std::vector<uint64_t>,std::vector<uint64_t>> restrictSubMdp<double>(
+    storm::models::sparse::Mdp<double> const& mdp,
+    std::vector<uint64_t> const& state_map,
+    std::vector<uint64_t> const& choice_map,
+    storm::storage::BitVector const& choices);
+template std::tuple<std::shared_ptr<storm::models::sparse::Mdp<storm::RationalNumber>>,std::vector<uint64_t>,std::vector<uint64_t>> restrictSubMdp<storm::RationalNumber>(
+    storm::models::sparse::Mdp<storm::RationalNumber> const& mdp,
+    std::vector<uint64_t> const& state_map,
+    std::vector<uint64_t> const& choice_map,
+    storm::storage::BitVector const& choices);
+
+}
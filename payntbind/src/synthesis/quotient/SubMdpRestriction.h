@@ -0,0 +1,31 @@
+#pragma once
+
+#include <storm/models/sparse/Mdp.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <memory>
+#include <tuple>
+#include <vector>
+
+namespace synthesis {
+
+/**
+ * Restrict a sub-MDP of the quotient (e.g. the MDP of a parent family) to the given quotient choices, keeping only
+ * the states reachable via the remaining choices. Since the sub-MDP is typically much smaller than the quotient, this
+ * is much cheaper than restricting the quotient itself.
+ * @param mdp sub-MDP of the quotient
+ * @param state_map sub-MDP to quotient state mapping
+ * @param choice_map sub-MDP to quotient choice mapping
+ * @param choices mask of quotient choices to keep
+ * @return the restricted MDP, its quotient state mapping and its quotient choice mapping
+ */
+template<typename ValueType>
+std::tuple<std::shared_ptr<storm::models::sparse::Mdp<ValueType>>,std::vector<uint64_t>,std::vector<uint64_t>> restrictSubMdp(
+    storm::models::sparse::Mdp<ValueType> const& mdp,
+    std::vector<uint64_t> const& state_map,
+    std::vector<uint64_t> const& choice_map,
+    storm::storage::BitVector const& choices
+);
+
+}
@@ -4,6 +4,9 @@
 #include "Family.h"
 #include "Coloring.h"
 #include "ColoringSmt.h"
+#include "FamilySmtSolver.h"
+#include "SubMdpRestriction.h"
+#include "QuotientSerializer.h"
 #include "src/synthesis/translation/componentTranslations.h"
 
 #include <storm/storage/expressions/ExpressionManager.h>
@@ -12,6 +15,8 @@
 #include <storm/utility/builder.h>
 
 #include <storm/exceptions/InvalidModelException.h>
+#include <storm/exceptions/UnexpectedException.h>
+#include <storm/utility/macros.h>
 #include <storm/models/sparse/Mdp.h>
 #include <storm/models/sparse/NondeterministicModel.h>
 #include <storm/storage/BitVector.h>
@@ -23,6 +28,10 @@
 
 #include <z3++.h>
 
+#include <cmath>
+#include <cstring>
+#include <string_view>
+
 namespace synthesis {
 
 template<typename ValueType>
@@ -190,6 +199,78 @@ std::map<uint64_t,double> computeInconsistentHoleVariance(
     return inconsistent_hole_variance;
 }
 
+/**
+ * Score inconsistent holes of a quotient where choices colored by different options of the same hole are aligned,
+ * i.e. the i-th choice associated with each option of a hole originates in the same state. This holds e.g. for
+ * (posterior-unaware) unfoldings of POMDPs, where the i-th choice of an option corresponds to the i-th state of the
+ * observation. For each hole, the score is the average difference between the best and the worst option across the
+ * affected states, weighted by the expected number of visits of the state.
+ */
+std::map<uint64_t,double> computeInconsistentHoleDifference(
+    Coloring const& coloring,
+    std::vector<uint64_t> const& row_groups, std::vector<uint64_t> const& choice_to_global_choice,
+    std::vector<double> const& choice_to_value,
+    std::map<uint64_t,std::vector<uint64_t>> const& hole_to_inconsistent_options,
+    std::vector<double> const& state_to_expected_visits
+) {
+    uint64_t num_global_choices = coloring.getChoiceToAssignment().size();
+    uint64_t num_states = row_groups.size()-1;
+    uint64_t num_choices = row_groups.back();
+
+    // create inverse quotient-choice-to-choice map and map choices to their origin states
+    std::vector<uint64_t> global_choice_to_choice(num_global_choices, num_choices);
+    std::vector<uint64_t> choice_to_state(num_choices);
+    for(uint64_t state=0; state<num_states; ++state) {
+        for(uint64_t choice=row_groups[state]; choice<row_groups[state+1]; ++choice) {
+            global_choice_to_choice[choice_to_global_choice[choice]] = choice;
+            choice_to_state[choice] = state;
+        }
+    }
+
+    auto const& hole_option_to_choices = coloring.getHoleOptionToChoices();
+    std::map<uint64_t,double> inconsistent_hole_difference;
+    for(auto const& [hole,options]: hole_to_inconsistent_options) {
+        auto const& option_to_choices = hole_option_to_choices[hole];
+        double difference_sum = 0;
+        uint64_t states_affected = 0;
+        auto const& choices_0 = option_to_choices[options[0]];
+        for(uint64_t index=0; index<choices_0.size(); ++index) {
+            uint64_t choice_0 = global_choice_to_choice[choices_0[index]];
+            if(choice_0 == num_choices) {
+                continue;
+            }
+            double visits = state_to_expected_visits[choice_to_state[choice_0]];
+            if(visits == 0) {
+                continue;
+            }
+            double min_value = choice_to_value[choice_0];
+            double max_value = min_value;
+            for(auto option: options) {
+                STORM_LOG_THROW(index < option_to_choices[option].size(), storm::exceptions::UnexpectedException,
+                    "options of hole " << hole << " are not associated with aligned choices");
+                uint64_t choice = global_choice_to_choice[option_to_choices[option][index]];
+                if(choice == num_choices) {
+                    continue;
+                }
+                double value = choice_to_value[choice];
+                if(value < min_value) {
+                    min_value = value;
+                }
+                if(value > max_value) {
+                    max_value = value;
+                }
+            }
+            double difference = (max_value-min_value)*visits;
+            STORM_LOG_ASSERT(not std::isnan(difference), "difference is NaN");
+            difference_sum += difference;
+            states_affected += 1;
+        }
+        inconsistent_hole_difference[hole] = states_affected == 0 ? 0 : difference_sum / states_affected;
+    }
+
+    return inconsistent_hole_difference;
+}
+
 
 /*storm::storage::BitVector keepReachableChoices(
     storm::storage::BitVector enabled_choices, uint64_t initial_state,
@@ -224,6 +305,18 @@ std::map<uint64_t,double> computeInconsistentHoleVariance(
     return reachable_choices;
 }*/
 
+py::bytes familyToBytes(Family const& family) {
+    auto words = family.pack();
+    return py::bytes(reinterpret_cast<char const*>(words.data()), words.size()*sizeof(uint64_t));
+}
+
+Family familyFromBytes(py::bytes const& data) {
+    std::string_view buffer = data;
+    std::vector<uint64_t> words(buffer.size() / sizeof(uint64_t));
+    std::memcpy(words.data(), buffer.data(), words.size()*sizeof(uint64_t));
+    return Family::unpack(words.data(), words.size());
+}
+
 // RA: I don't even understand why this needs to be optimized, but it does
 storm::storage::BitVector policyToChoicesForFamily(
     std::vector<uint64_t> const& policy_choices,
@@ -293,6 +386,8 @@ void bindings_coloring_vt(py::module& m, std::string const& vtSuffix) {
     m.def(("addChoiceLabelsFromJani" + vtSuffix).c_str(), &synthesis::addChoiceLabelsFromJani<ValueType>);
 
     m.def(("schedulerToStateToGlobalChoice" + vtSuffix).c_str(), &synthesis::schedulerToStateToGlobalChoice<ValueType>);
+    m.def(("restrictSubMdp" + vtSuffix).c_str(), &synthesis::restrictSubMdp<ValueType>,
+        py::arg("mdp"), py::arg("state_map"), py::arg("choice_map"), py::arg("choices"));
 }
 
 void bindings_coloring(py::module& m) {
@@ -300,12 +395,19 @@ void bindings_coloring(py::module& m) {
     bindings_coloring_vt<storm::RationalNumber>(m, "Exact");
 
     m.def("computeInconsistentHoleVariance", &synthesis::computeInconsistentHoleVariance);
+    m.def("computeInconsistentHoleDifference", &synthesis::computeInconsistentHoleDifference);
 
     m.def("policyToChoicesForFamily", &synthesis::policyToChoicesForFamily);
 
+    m.def("writeQuotient", &synthesis::writeQuotient, py::arg("path"), py::arg("model"), py::arg("choice_to_hole_options"));
+    m.def("readQuotient", &synthesis::readQuotient, py::arg("path"));
+
     py::class_<synthesis::Family>(m, "Family")
         .def(py::init<>())
         .def(py::init<synthesis::Family const&>())
+        .def("pack", &synthesis::familyToBytes)
+        .def_static("unpack", &synthesis::familyFromBytes)
+        .def(py::pickle(&synthesis::familyToBytes, &synthesis::familyFromBytes))
         .def("numHoles", &synthesis::Family::numHoles)
         .def("addHole", &synthesis::Family::addHole)
         
@@ -326,7 +428,9 @@ void bindings_coloring(py::module& m) {
         >())
         .def("getChoiceToAssignment", &synthesis::Coloring::getChoiceToAssignment)
         .def("getStateToHoles", &synthesis::Coloring::getStateToHoles)
-        .def("selectCompatibleChoices", &synthesis::Coloring::selectCompatibleChoices)
+        .def("getHoleOptionToChoices", &synthesis::Coloring::getHoleOptionToChoices)
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&, storm::storage::BitVector const&, uint64_t>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
         .def("collectHoleOptions", &synthesis::Coloring::collectHoleOptions)
         ;
 
@@ -350,4 +454,15 @@ void bindings_coloring(py::module& m) {
         // .def_property_readonly("unsat_core", [](synthesis::ColoringSmt<>& coloring) {return coloring.unsat_core;})
         // .def("getProfilingInfo", &synthesis::ColoringSmt<>::getProfilingInfo)
         ;
+
+    py::class_<synthesis::FamilySmtSolver>(m, "FamilySmtSolver")
+        .def(py::init<synthesis::Family const&>(), py::arg("design_space"))
+        .def("addFamily", &synthesis::FamilySmtSolver::addFamily, py::arg("family"))
+        .def("releaseFamily", &synthesis::FamilySmtSolver::releaseFamily, py::arg("family_index"))
+        .def("pickAssignment", &synthesis::FamilySmtSolver::pickAssignment, py::arg("family_index"))
+        .def("pickAssignments", &synthesis::FamilySmtSolver::pickAssignments,
+            py::arg("family_index"), py::arg("num_assignments"))
+        .def("excludeConflict", &synthesis::FamilySmtSolver::excludeConflict,
+            py::arg("family"), py::arg("assignment"), py::arg("conflict"))
+        ;
 }
@@ -13,6 +13,7 @@ void bindings_pomdp_family(py::module &m);
 void bindings_mdp_family(py::module &m);
 
 void bindings_coloring(py::module &m);
+void bindings_verification(py::module &m);
 
 void bindings_smg(py::module &m);
 void bindings_posmg(py::module &m);
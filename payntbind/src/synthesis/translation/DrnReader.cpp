@@ -0,0 +1,365 @@
+#include "DrnReader.h"
+
+#include "src/synthesis/posmg/Posmg.h"
+
+#include <storm/models/sparse/StandardRewardModel.h>
+#include <storm/models/sparse/StateLabeling.h>
+#include <storm/models/sparse/ChoiceLabeling.h>
+#include <storm/storage/SparseMatrix.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/utility/builder.h>
+#include <storm/utility/macros.h>
+#include <storm/exceptions/FileIoException.h>
+#include <storm/exceptions/NotSupportedException.h>
+#include <storm/exceptions/WrongFormatException.h>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <charconv>
+#include <cstdlib>
+#include <cstring>
+#include <map>
+#include <string_view>
+#include <vector>
+
+namespace synthesis {
+
+namespace {
+
+    const std::string_view WHITESPACES = " \t\n\v\f\r";
+
+    /** Read-only memory mapping of a file, read line by line. */
+    class MappedLines {
+    public:
+        MappedLines(std::string const& path) {
+            int fd = open(path.c_str(), O_RDONLY);
+            STORM_LOG_THROW(fd >= 0, storm::exceptions::FileIoException, "cannot open " << path);
+            struct stat file_stat;
+            fstat(fd, &file_stat);
+            size = file_stat.st_size;
+            if(size > 0) {
+                data = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+                ::close(fd);
+                STORM_LOG_THROW(data != MAP_FAILED, storm::exceptions::FileIoException, "cannot map " << path);
+                madvise(data, size, MADV_SEQUENTIAL);
+            } else {
+                ::close(fd);
+            }
+            position = static_cast<char const*>(data);
+            end = position + size;
+        }
+
+        ~MappedLines() {
+            if(data != nullptr) {
+                munmap(data, size);
+            }
+        }
+
+        /** Read the next line, @return false if the end of the file was reached. */
+        bool next(std::string_view & line) {
+            if(position >= end) {
+                return false;
+            }
+            char const* line_end = static_cast<char const*>(std::memchr(position, '\n', end-position));
+            if(line_end == nullptr) {
+                line_end = end;
+            }
+            line = std::string_view(position, line_end-position);
+            position = line_end+1;
+            return true;
+        }
+
+    private:
+        void *data = nullptr;
+        size_t size;
+        char const* position;
+        char const* end;
+    };
+
+    std::string_view trim(std::string_view string) {
+        auto first = string.find_first_not_of(WHITESPACES);
+        if(first == std::string_view::npos) {
+            return std::string_view();
+        }
+        auto last = string.find_last_not_of(WHITESPACES);
+        return string.substr(first, last-first+1);
+    }
+
+    uint64_t parseIndex(std::string_view token) {
+        uint64_t index;
+        auto [ptr,error] = std::from_chars(token.data(), token.data()+token.size(), index);
+        STORM_LOG_THROW(error == std::errc() and ptr == token.data()+token.size(), storm::exceptions::WrongFormatException,
+            "expected a non-negative integer, got '" << token << "'");
+        return index;
+    }
+
+    double parseNumber(std::string_view token) {
+        char buffer[64];
+        STORM_LOG_THROW(not token.empty() and token.size() < sizeof(buffer), storm::exceptions::WrongFormatException,
+            "expected a number, got '" << token << "'");
+        std::memcpy(buffer, token.data(), token.size());
+        buffer[token.size()] = '\0';
+        char *number_end;
+        double value = std::strtod(buffer, &number_end);
+        STORM_LOG_THROW(number_end == buffer+token.size(), storm::exceptions::WrongFormatException,
+            "expected a number, got '" << token << "'");
+        return value;
+    }
+
+    /** Parse a probability or a reward, possibly given as a fraction. */
+    double parseValue(std::string_view token) {
+        STORM_LOG_THROW(token.empty() or token.front() != '[', storm::exceptions::NotSupportedException,
+            "interval values are not supported");
+        auto slash = token.find('/');
+        if(slash != std::string_view::npos) {
+            return parseNumber(trim(token.substr(0,slash))) / parseNumber(trim(token.substr(slash+1)));
+        }
+        return parseNumber(token);
+    }
+
+    /** Parse comma-separated values. */
+    std::vector<double> parseValues(std::string_view values) {
+        std::vector<double> parsed;
+        values = trim(values);
+        while(not values.empty()) {
+            auto comma = values.find(',');
+            parsed.push_back(parseValue(trim(values.substr(0,comma))));
+            if(comma == std::string_view::npos) {
+                break;
+            }
+            values = trim(values.substr(comma+1));
+        }
+        return parsed;
+    }
+
+    /** Extract the content enclosed by the given delimiters at the beginning of the string and drop it. */
+    std::string_view popEnclosed(std::string_view & string, char closing) {
+        auto close = string.find(closing, 1);
+        STORM_LOG_THROW(close != std::string_view::npos, storm::exceptions::WrongFormatException,
+            "missing '" << closing << "' in '" << string << "'");
+        std::string_view content = string.substr(1, close-1);
+        string = trim(string.substr(close+1));
+        return content;
+    }
+
+    /** Store rewards of the given item (state or choice), vectors of rewards are allocated upon a non-zero reward. */
+    void storeRewards(
+        std::vector<double> const& rewards, uint64_t item,
+        std::vector<std::vector<double>> & reward_vectors
+    ) {
+        if(rewards.empty()) {
+            return;
+        }
+        STORM_LOG_THROW(rewards.size() == reward_vectors.size(), storm::exceptions::WrongFormatException,
+            "expected " << reward_vectors.size() << " rewards, got " << rewards.size());
+        for(uint64_t reward_model = 0; reward_model < rewards.size(); ++reward_model) {
+            if(rewards[reward_model] == 0) {
+                continue;
+            }
+            auto & reward_vector = reward_vectors[reward_model];
+            if(reward_vector.size() <= item) {
+                reward_vector.resize(item+1, 0);
+            }
+            reward_vector[item] = rewards[reward_model];
+        }
+    }
+
+}
+
+
+std::shared_ptr<storm::models::sparse::Model<double>> readDrn(std::string const& path) {
+    MappedLines lines(path);
+    std::string_view line;
+
+    // parse the header
+    std::string type;
+    std::vector<std::string> reward_model_names;
+    uint64_t num_states = 0;
+    uint64_t num_choices = 0;
+    bool num_choices_known = false;
+    bool model_found = false;
+    while(lines.next(line)) {
+        line = trim(line);
+        if(line.empty() or line.starts_with("//")) {
+            continue;
+        }
+        if(line.starts_with("@type:")) {
+            type = trim(line.substr(6));
+        } else if(line.starts_with("@value_type:")) {
+            STORM_LOG_THROW(trim(line.substr(12)) == "double", storm::exceptions::NotSupportedException,
+                "only models over doubles are supported");
+        } else if(line == "@parameters") {
+            STORM_LOG_THROW(lines.next(line) and trim(line).empty(), storm::exceptions::NotSupportedException,
+                "parametric models are not supported");
+        } else if(line == "@placeholders") {
+            STORM_LOG_THROW(false, storm::exceptions::NotSupportedException, "placeholders are not supported");
+        } else if(line == "@reward_models") {
+            STORM_LOG_THROW(lines.next(line), storm::exceptions::WrongFormatException, "missing reward model names");
+            std::string_view names = trim(line);
+            while(not names.empty()) {
+                auto name_end = names.find_first_of(WHITESPACES);
+                reward_model_names.emplace_back(names.substr(0,name_end));
+                names = name_end == std::string_view::npos ? std::string_view() : trim(names.substr(name_end));
+            }
+        } else if(line == "@nr_states") {
+            STORM_LOG_THROW(lines.next(line), storm::exceptions::WrongFormatException, "missing number of states");
+            num_states = parseIndex(trim(line));
+        } else if(line == "@nr_choices") {
+            STORM_LOG_THROW(lines.next(line), storm::exceptions::WrongFormatException, "missing number of choices");
+            num_choices = parseIndex(trim(line));
+            num_choices_known = true;
+        } else if(line == "@model") {
+            model_found = true;
+            break;
+        } else {
+            STORM_LOG_THROW(false, storm::exceptions::WrongFormatException, "unexpected line '" << line << "'");
+        }
+    }
+    STORM_LOG_THROW(model_found, storm::exceptions::WrongFormatException, "missing @model section");
+    STORM_LOG_THROW(
+        type == "DTMC" or type == "MDP" or type == "POMDP" or type == "POSMG",
+        storm::exceptions::NotSupportedException, "models of type " << type << " are not supported"
+    );
+    bool nondeterministic = type != "DTMC";
+    bool partially_observable = type == "POMDP" or type == "POSMG";
+    bool is_game = type == "POSMG";
+
+    // parse the model
+    storm::storage::SparseMatrixBuilder<double> builder(
+        num_choices, num_states, 0, num_choices_known, nondeterministic, nondeterministic ? num_states : 0
+    );
+    storm::models::sparse::StateLabeling state_labeling(num_states);
+    std::map<std::string,std::vector<uint64_t>> choice_label_to_choices;
+    std::vector<uint32_t> observations(partially_observable ? num_states : 0);
+    std::vector<storm::storage::PlayerIndex> state_player_indications;
+    std::vector<std::vector<double>> state_rewards(reward_model_names.size());
+    std::vector<std::vector<double>> state_action_rewards(reward_model_names.size());
+
+    uint64_t num_states_parsed = 0;
+    uint64_t num_choices_parsed = 0;
+    while(lines.next(line)) {
+        line = trim(line);
+        if(line.empty() or line.starts_with("//")) {
+            continue;
+        }
+
+        if(line.starts_with("state ")) {
+            std::string_view rest = trim(line.substr(6));
+            auto id_end = rest.find_first_of(WHITESPACES);
+            uint64_t state = parseIndex(rest.substr(0,id_end));
+            STORM_LOG_THROW(state == num_states_parsed and state < num_states, storm::exceptions::WrongFormatException,
+                "expected state " << num_states_parsed << ", got state " << state);
+            num_states_parsed++;
+            if(nondeterministic) {
+                builder.newRowGroup(num_choices_parsed);
+            }
+            rest = id_end == std::string_view::npos ? std::string_view() : trim(rest.substr(id_end));
+            while(not rest.empty()) {
+                if(rest.front() == '{') {
+                    STORM_LOG_THROW(partially_observable, storm::exceptions::WrongFormatException,
+                        "observations are only allowed in partially observable models");
+                    observations[state] = parseIndex(trim(popEnclosed(rest,'}')));
+                } else if(rest.front() == '<') {
+                    STORM_LOG_THROW(is_game, storm::exceptions::WrongFormatException,
+                        "player indications are only allowed in games");
+                    state_player_indications.push_back(parseIndex(trim(popEnclosed(rest,'>'))));
+                } else if(rest.front() == '[') {
+                    std::string_view content = popEnclosed(rest,']');
+                    STORM_LOG_THROW(content.find('=') == std::string_view::npos, storm::exceptions::NotSupportedException,
+                        "state valuations are not supported");
+                    storeRewards(parseValues(content), state, state_rewards);
+                } else {
+                    std::string label;
+                    if(rest.front() == '"') {
+                        label = popEnclosed(rest,'"');
+                    } else {
+                        auto label_end = rest.find_first_of(WHITESPACES);
+                        label = rest.substr(0,label_end);
+                        rest = label_end == std::string_view::npos ? std::string_view() : trim(rest.substr(label_end));
+                    }
+                    if(not state_labeling.containsLabel(label)) {
+                        state_labeling.addLabel(label);
+                    }
+                    state_labeling.addLabelToState(label, state);
+                }
+            }
+            STORM_LOG_THROW(not is_game or state_player_indications.size() == num_states_parsed,
+                storm::exceptions::WrongFormatException, "missing player indication of state " << state);
+            continue;
+        }
+
+        STORM_LOG_THROW(num_states_parsed > 0, storm::exceptions::WrongFormatException,
+            "unexpected line '" << line << "' before the first state");
+        if(line.starts_with("action")) {
+            std::string_view action = trim(line.substr(6));
+            auto rewards_begin = action.find('[');
+            if(rewards_begin != std::string_view::npos) {
+                std::string_view rewards = action.substr(rewards_begin);
+                storeRewards(parseValues(popEnclosed(rewards,']')), num_choices_parsed, state_action_rewards);
+                action = trim(action.substr(0,rewards_begin));
+            }
+            if(not action.empty() and action != "__NOLABEL__") {
+                choice_label_to_choices[std::string(action)].push_back(num_choices_parsed);
+            }
+            num_choices_parsed++;
+            continue;
+        }
+
+        // transition of the last choice
+        STORM_LOG_THROW(num_choices_parsed > 0, storm::exceptions::WrongFormatException,
+            "unexpected line '" << line << "' before the first action");
+        auto colon = line.find(':');
+        STORM_LOG_THROW(colon != std::string_view::npos, storm::exceptions::WrongFormatException,
+            "unexpected line '" << line << "'");
+        uint64_t destination = parseIndex(trim(line.substr(0,colon)));
+        builder.addNextValue(num_choices_parsed-1, destination, parseValue(trim(line.substr(colon+1))));
+    }
+    STORM_LOG_THROW(num_states_parsed == num_states, storm::exceptions::WrongFormatException,
+        "expected " << num_states << " states, got " << num_states_parsed);
+    STORM_LOG_THROW(not num_choices_known or num_choices_parsed == num_choices, storm::exceptions::WrongFormatException,
+        "expected " << num_choices << " choices, got " << num_choices_parsed);
+
+    // assemble the model
+    storm::storage::sparse::ModelComponents<double> components(builder.build(), std::move(state_labeling));
+    storm::models::sparse::ChoiceLabeling choice_labeling(num_choices_parsed);
+    for(auto const& [label,choices]: choice_label_to_choices) {
+        choice_labeling.addLabel(label, storm::storage::BitVector(num_choices_parsed, choices.begin(), choices.end()));
+    }
+    components.choiceLabeling = std::move(choice_labeling);
+    for(uint64_t reward_model = 0; reward_model < reward_model_names.size(); ++reward_model) {
+        std::optional<std::vector<double>> state_reward_vector;
+        std::optional<std::vector<double>> state_action_reward_vector;
+        if(not state_rewards[reward_model].empty()) {
+            state_rewards[reward_model].resize(num_states, 0);
+            state_reward_vector = std::move(state_rewards[reward_model]);
+        }
+        if(not state_action_rewards[reward_model].empty() or not state_reward_vector) {
+            state_action_rewards[reward_model].resize(num_choices_parsed, 0);
+            state_action_reward_vector = std::move(state_action_rewards[reward_model]);
+        }
+        components.rewardModels.emplace(
+            reward_model_names[reward_model],
+            storm::models::sparse::StandardRewardModel<double>(std::move(state_reward_vector), std::move(state_action_reward_vector))
+        );
+    }
+    if(partially_observable) {
+        components.observabilityClasses = std::move(observations);
+    }
+
+    if(is_game) {
+        components.statePlayerIndications = std::move(state_player_indications);
+        return std::make_shared<Posmg<double>>(std::move(components));
+    }
+    auto model_type = storm::models::ModelType::Dtmc;
+    if(type == "MDP") {
+        model_type = storm::models::ModelType::Mdp;
+    } else if(type == "POMDP") {
+        model_type = storm::models::ModelType::Pomdp;
+    }
+    return storm::utility::builder::buildModelFromComponents<double>(model_type, std::move(components));
+}
+
+}
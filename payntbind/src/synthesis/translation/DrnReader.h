@@ -0,0 +1,19 @@
+#pragma once
+
+#include <storm/models/sparse/Model.h>
+
+#include <memory>
+#include <string>
+
+namespace synthesis {
+
+/**
+ * Read a DTMC, an MDP, a POMDP or a POSMG from a file in the explicit DRN format. The file is memory-mapped and
+ * parsed in a single pass that builds the transition matrix directly; player indications of POSMG states are
+ * collected in the same pass. Choice labels are always built.
+ * @note Parametric models, placeholders, interval values and state valuations are not supported and result in
+ *  NotSupportedException, in which case the generic Storm parser can be used instead.
+ */
+std::shared_ptr<storm::models::sparse::Model<double>> readDrn(std::string const& path);
+
+}
@@ -1,5 +1,6 @@
 #include "../synthesis.h"
 #include "SubPomdpBuilder.h"
+#include "DrnReader.h"
 
 #include <queue>
 
@@ -537,4 +538,6 @@ void bindings_translation_vt(py::module& m, std::string const& vtSuffix) {
 void bindings_translation(py::module& m) {
     bindings_translation_vt<double>(m, "");
     bindings_translation_vt<storm::RationalNumber>(m, "Exact");
+
+    m.def("readDrn", &synthesis::readDrn, py::arg("path"));
 }
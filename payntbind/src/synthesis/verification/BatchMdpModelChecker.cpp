@@ -0,0 +1,617 @@
+#include "BatchMdpModelChecker.h"
+
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/exceptions/NotSupportedException.h>
+#include <storm/utility/constants.h>
+#include <storm/utility/macros.h>
+
+#include <algorithm>
+#include <cmath>
+#include <queue>
+
+namespace synthesis {
+
+    template<typename ValueType>
+    BatchMdpModelChecker<ValueType>::BatchMdpModelChecker(
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& quotient,
+        storm::storage::BitVector const& target_states,
+        std::optional<std::string> const& reward_model_name,
+        bool minimizing,
+        double precision,
+        uint64_t max_iterations
+    ) : quotient(quotient), target_states(target_states), computing_rewards(reward_model_name.has_value()),
+        minimizing(minimizing), precision(precision), max_iterations(max_iterations) {
+
+        auto const& matrix = quotient->getTransitionMatrix();
+        uint64_t num_states = quotient->getNumberOfStates();
+        STORM_LOG_THROW(target_states.size() == num_states, storm::exceptions::InvalidArgumentException,
+            "target states do not match the states of the quotient");
+
+        if(computing_rewards) {
+            auto const& reward_model = quotient->getRewardModel(reward_model_name.value());
+            STORM_LOG_THROW(!reward_model.hasTransitionRewards(), storm::exceptions::NotSupportedException,
+                "transition rewards are not supported");
+            this->choice_rewards = reward_model.getTotalRewardVector(matrix);
+        }
+
+        this->state_to_local.assign(num_states, BatchMdpModelChecker<ValueType>::unnumbered);
+        this->state_visited.assign(num_states, 0);
+    }
+
+    template<typename ValueType>
+    bool BatchMdpModelChecker<ValueType>::converged(ValueType old_value, ValueType new_value, double precision) const {
+        if(old_value == new_value) {
+            return true;
+        }
+        ValueType difference = std::abs(new_value - old_value);
+        if(new_value == storm::utility::zero<ValueType>()) {
+            return difference <= precision;
+        }
+        return difference <= precision * std::abs(new_value);
+    }
+
+    template<typename ValueType>
+    ValueType BatchMdpModelChecker<ValueType>::raise(ValueType value, double precision) const {
+        ValueType raised = value == storm::utility::zero<ValueType>() ? precision : value + precision * std::abs(value);
+        if(not this->computing_rewards and raised > storm::utility::one<ValueType>()) {
+            raised = storm::utility::one<ValueType>();
+        }
+        return raised;
+    }
+
+    template<typename ValueType>
+    bool BatchMdpModelChecker<ValueType>::improves(ValueType value, ValueType other) const {
+        return this->minimizing ? value < other : value > other;
+    }
+
+    template<typename ValueType>
+    typename BatchMdpModelChecker<ValueType>::Fragment BatchMdpModelChecker<ValueType>::buildFragment(
+        std::vector<storm::storage::BitVector> const& choice_masks
+    ) {
+        auto const& matrix = this->quotient->getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        uint64_t num_families = choice_masks.size();
+        Fragment fragment;
+
+        // explore each sub-MDP from the initial state, the fragment is the union of the reachable states
+        std::vector<std::vector<uint64_t>> family_states(num_families);
+        for(uint64_t family = 0; family < num_families; ++family) {
+            auto const& choice_mask = choice_masks[family];
+            uint64_t exploration = ++this->num_explorations;
+            std::queue<uint64_t> unexplored;
+            for(auto state: this->quotient->getInitialStates()) {
+                this->state_visited[state] = exploration;
+                unexplored.push(state);
+            }
+            while(not unexplored.empty()) {
+                uint64_t state = unexplored.front();
+                unexplored.pop();
+                family_states[family].push_back(state);
+                if(this->state_to_local[state] == BatchMdpModelChecker<ValueType>::unnumbered) {
+                    this->state_to_local[state] = fragment.states.size();
+                    fragment.states.push_back(state);
+                }
+                for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+                    if(not choice_mask[choice]) {
+                        continue;
+                    }
+                    for(auto const& entry: matrix.getRow(choice)) {
+                        if(this->state_visited[entry.getColumn()] != exploration) {
+                            this->state_visited[entry.getColumn()] = exploration;
+                            unexplored.push(entry.getColumn());
+                        }
+                    }
+                }
+            }
+        }
+
+        // number the states in the order of the quotient, which is the order of the Gauss-Seidel sweeps
+        std::sort(fragment.states.begin(), fragment.states.end());
+        uint64_t num_states = fragment.states.size();
+        for(uint64_t state = 0; state < num_states; ++state) {
+            this->state_to_local[fragment.states[state]] = state;
+        }
+        fragment.reachable_states.assign(num_families, storm::storage::BitVector(num_states,false));
+        for(uint64_t family = 0; family < num_families; ++family) {
+            for(auto state: family_states[family]) {
+                fragment.reachable_states[family].set(this->state_to_local[state],true);
+            }
+        }
+        fragment.target_states = storm::storage::BitVector(num_states,false);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            fragment.target_states.set(state, this->target_states[fragment.states[state]]);
+        }
+        fragment.initial_state = this->state_to_local[*(this->quotient->getInitialStates().begin())];
+
+        // collect the choices enabled in some sub-MDP
+        fragment.row_groups.reserve(num_states+1);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            fragment.row_groups.push_back(fragment.choices.size());
+            uint64_t quotient_state = fragment.states[state];
+            for(uint64_t choice = row_groups[quotient_state]; choice < row_groups[quotient_state+1]; ++choice) {
+                for(uint64_t family = 0; family < num_families; ++family) {
+                    if(fragment.reachable_states[family][state] and choice_masks[family][choice]) {
+                        fragment.choices.push_back(choice);
+                        break;
+                    }
+                }
+            }
+        }
+        fragment.row_groups.push_back(fragment.choices.size());
+
+        // enabled choices of the sub-MDPs and the transitions of the fragment; all successors of an enabled choice
+        // are reachable, hence numbered
+        uint64_t num_choices = fragment.choices.size();
+        fragment.enabled_choices.assign(num_families, storm::storage::BitVector(num_choices,false));
+        fragment.choice_to_state.resize(num_choices);
+        fragment.rows.reserve(num_choices+1);
+        std::vector<uint64_t> num_predecessors(num_states,0);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            for(uint64_t choice = fragment.row_groups[state]; choice < fragment.row_groups[state+1]; ++choice) {
+                uint64_t quotient_choice = fragment.choices[choice];
+                fragment.choice_to_state[choice] = state;
+                for(uint64_t family = 0; family < num_families; ++family) {
+                    if(fragment.reachable_states[family][state] and choice_masks[family][quotient_choice]) {
+                        fragment.enabled_choices[family].set(choice,true);
+                    }
+                }
+                if(this->computing_rewards) {
+                    fragment.rewards.push_back(this->choice_rewards[quotient_choice]);
+                }
+                fragment.rows.push_back(fragment.successors.size());
+                for(auto const& entry: matrix.getRow(quotient_choice)) {
+                    uint64_t successor = this->state_to_local[entry.getColumn()];
+                    fragment.successors.push_back(successor);
+                    fragment.probabilities.push_back(entry.getValue());
+                    ++num_predecessors[successor];
+                }
+            }
+        }
+        fragment.rows.push_back(fragment.successors.size());
+
+        fragment.predecessor_rows.assign(num_states+1,0);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            fragment.predecessor_rows[state+1] = fragment.predecessor_rows[state] + num_predecessors[state];
+        }
+        fragment.predecessor_choices.resize(fragment.successors.size());
+        std::vector<uint64_t> next_predecessor(fragment.predecessor_rows.begin(), fragment.predecessor_rows.end()-1);
+        for(uint64_t choice = 0; choice < num_choices; ++choice) {
+            for(uint64_t transition = fragment.rows[choice]; transition < fragment.rows[choice+1]; ++transition) {
+                fragment.predecessor_choices[next_predecessor[fragment.successors[transition]]++] = choice;
+            }
+        }
+
+        // reset the numbering for the next check
+        for(auto state: fragment.states) {
+            this->state_to_local[state] = BatchMdpModelChecker<ValueType>::unnumbered;
+        }
+        return fragment;
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::predecessorsE(
+        Fragment const& fragment, storm::storage::BitVector const& states,
+        storm::storage::BitVector const& allowed_choices
+    ) const {
+        storm::storage::BitVector result(states);
+        std::queue<uint64_t> unexplored;
+        for(auto state: states) {
+            unexplored.push(state);
+        }
+        while(not unexplored.empty()) {
+            uint64_t state = unexplored.front();
+            unexplored.pop();
+            for(uint64_t index = fragment.predecessor_rows[state]; index < fragment.predecessor_rows[state+1]; ++index) {
+                uint64_t choice = fragment.predecessor_choices[index];
+                if(not allowed_choices[choice]) {
+                    continue;
+                }
+                uint64_t predecessor = fragment.choice_to_state[choice];
+                if(result[predecessor] or fragment.target_states[predecessor]) {
+                    continue;
+                }
+                result.set(predecessor,true);
+                unexplored.push(predecessor);
+            }
+        }
+        return result;
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::probGreater0E(
+        Fragment const& fragment, uint64_t family
+    ) const {
+        return this->predecessorsE(fragment,fragment.target_states,fragment.enabled_choices[family]);
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::probGreater0A(
+        Fragment const& fragment, uint64_t family
+    ) const {
+        // a state is added once each of its enabled choices leads to an already added state
+        auto const& enabled_choices = fragment.enabled_choices[family];
+        std::vector<uint64_t> state_num_unresolved_choices(fragment.states.size(),0);
+        for(auto choice: enabled_choices) {
+            state_num_unresolved_choices[fragment.choice_to_state[choice]]++;
+        }
+        storm::storage::BitVector choice_resolved(fragment.choices.size(),false);
+        storm::storage::BitVector result(fragment.target_states);
+        std::queue<uint64_t> unexplored;
+        for(auto state: fragment.target_states) {
+            unexplored.push(state);
+        }
+        while(not unexplored.empty()) {
+            uint64_t state = unexplored.front();
+            unexplored.pop();
+            for(uint64_t index = fragment.predecessor_rows[state]; index < fragment.predecessor_rows[state+1]; ++index) {
+                uint64_t choice = fragment.predecessor_choices[index];
+                if(not enabled_choices[choice] or choice_resolved[choice]) {
+                    continue;
+                }
+                choice_resolved.set(choice,true);
+                uint64_t predecessor = fragment.choice_to_state[choice];
+                if(result[predecessor]) {
+                    continue;
+                }
+                if(--state_num_unresolved_choices[predecessor] == 0) {
+                    result.set(predecessor,true);
+                    unexplored.push(predecessor);
+                }
+            }
+        }
+        return result;
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::prob1E(
+        Fragment const& fragment, uint64_t family
+    ) const {
+        auto const& enabled_choices = fragment.enabled_choices[family];
+        storm::storage::BitVector states(fragment.states.size(),true);
+        storm::storage::BitVector allowed_choices(fragment.choices.size(),false);
+        while(true) {
+            // only consider choices that cannot leave the current candidate set
+            allowed_choices.clear();
+            for(auto choice: enabled_choices) {
+                if(not states[fragment.choice_to_state[choice]]) {
+                    continue;
+                }
+                bool stays = true;
+                for(uint64_t transition = fragment.rows[choice]; transition < fragment.rows[choice+1]; ++transition) {
+                    if(not states[fragment.successors[transition]]) {
+                        stays = false;
+                        break;
+                    }
+                }
+                allowed_choices.set(choice,stays);
+            }
+            storm::storage::BitVector reaching = this->predecessorsE(fragment,fragment.target_states,allowed_choices);
+            if(reaching == states) {
+                return states;
+            }
+            states = reaching;
+        }
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::prob1A(
+        Fragment const& fragment, uint64_t family
+    ) const {
+        // the target can be missed iff a state where the target is avoided by some scheduler can be reached
+        storm::storage::BitVector prob0E = ~this->probGreater0A(fragment,family);
+        return ~this->predecessorsE(fragment,prob0E,fragment.enabled_choices[family]);
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector BatchMdpModelChecker<ValueType>::zeroRewardTrap(
+        Fragment const& fragment, uint64_t family, storm::storage::BitVector const& states
+    ) const {
+        storm::storage::BitVector trap(states);
+        storm::storage::BitVector can_stay(trap.size(),false);
+        bool changed = true;
+        while(changed) {
+            changed = false;
+            can_stay.clear();
+            for(auto choice: fragment.enabled_choices[family]) {
+                uint64_t state = fragment.choice_to_state[choice];
+                if(not trap[state] or can_stay[state] or not storm::utility::isZero(fragment.rewards[choice])) {
+                    continue;
+                }
+                bool stays = true;
+                for(uint64_t transition = fragment.rows[choice]; transition < fragment.rows[choice+1]; ++transition) {
+                    if(not trap[fragment.successors[transition]]) {
+                        stays = false;
+                        break;
+                    }
+                }
+                can_stay.set(state,stays);
+            }
+            if(can_stay != trap) {
+                trap = can_stay;
+                changed = true;
+            }
+        }
+        return trap;
+    }
+
+    template<typename ValueType>
+    ValueType BatchMdpModelChecker<ValueType>::choiceValue(
+        Fragment const& fragment, uint64_t family, uint64_t choice, std::vector<ValueType> const& state_values
+    ) const {
+        uint64_t num_families = fragment.enabled_choices.size();
+        ValueType value = this->computing_rewards ? fragment.rewards[choice] : storm::utility::zero<ValueType>();
+        for(uint64_t transition = fragment.rows[choice]; transition < fragment.rows[choice+1]; ++transition) {
+            value += fragment.probabilities[transition] * state_values[fragment.successors[transition]*num_families+family];
+        }
+        return value;
+    }
+
+    template<typename ValueType>
+    template<typename UpdateFunction>
+    void BatchMdpModelChecker<ValueType>::sweep(
+        Fragment const& fragment, std::vector<storm::storage::BitVector> const& state_is_fixed,
+        storm::storage::BitVector const& active_states, std::vector<ValueType>& state_values,
+        UpdateFunction const& update
+    ) const {
+        uint64_t num_families = fragment.enabled_choices.size();
+        std::vector<ValueType> choice_values(num_families);
+        std::vector<ValueType> best_values(num_families);
+        std::vector<bool> best_value_set(num_families);
+        for(auto state: active_states) {
+            std::fill(best_value_set.begin(), best_value_set.end(), false);
+            for(uint64_t choice = fragment.row_groups[state]; choice < fragment.row_groups[state+1]; ++choice) {
+                std::fill(choice_values.begin(), choice_values.end(), storm::utility::zero<ValueType>());
+                for(uint64_t transition = fragment.rows[choice]; transition < fragment.rows[choice+1]; ++transition) {
+                    ValueType probability = fragment.probabilities[transition];
+                    ValueType const* successor_values = &state_values[fragment.successors[transition]*num_families];
+                    for(uint64_t family = 0; family < num_families; ++family) {
+                        choice_values[family] += probability * successor_values[family];
+                    }
+                }
+                for(uint64_t family = 0; family < num_families; ++family) {
+                    if(not fragment.enabled_choices[family][choice] or state_is_fixed[family][state]) {
+                        continue;
+                    }
+                    ValueType value = choice_values[family];
+                    if(this->computing_rewards) {
+                        value += fragment.rewards[choice];
+                    }
+                    if(not best_value_set[family] or this->improves(value,best_values[family])) {
+                        best_values[family] = value;
+                        best_value_set[family] = true;
+                    }
+                }
+            }
+            ValueType* values = &state_values[state*num_families];
+            for(uint64_t family = 0; family < num_families; ++family) {
+                if(best_value_set[family]) {
+                    values[family] = update(family,state,values[family],best_values[family]);
+                }
+            }
+        }
+    }
+
+    template<typename ValueType>
+    void BatchMdpModelChecker<ValueType>::check(
+        std::vector<storm::storage::BitVector> const& choice_masks, bool extract_schedulers
+    ) {
+        uint64_t quotient_num_states = this->quotient->getNumberOfStates();
+        uint64_t quotient_num_choices = this->quotient->getNumberOfChoices();
+        uint64_t num_families = choice_masks.size();
+        for(auto const& choice_mask: choice_masks) {
+            STORM_LOG_THROW(choice_mask.size() == quotient_num_choices, storm::exceptions::InvalidArgumentException,
+                "choice mask does not match the choices of the quotient");
+        }
+        // all further work is restricted to the reachable fragment, states and choices below are local
+        Fragment fragment = this->buildFragment(choice_masks);
+        uint64_t num_states = fragment.states.size();
+        uint64_t num_choices = fragment.choices.size();
+
+        // qualitative analysis: identify states having a fixed value in each sub-MDP
+        // values are stored state-major such that the values of one state in all sub-MDPs are adjacent
+        ValueType fixed_target_value = this->computing_rewards ? storm::utility::zero<ValueType>() : storm::utility::one<ValueType>();
+        ValueType fixed_other_value = this->computing_rewards ? storm::utility::infinity<ValueType>() : storm::utility::zero<ValueType>();
+        std::vector<storm::storage::BitVector> state_is_fixed(num_families);
+        std::vector<ValueType> state_values(num_states*num_families, storm::utility::zero<ValueType>());
+        storm::storage::BitVector active_states(num_states,false);
+        // sub-MDPs for which value iteration from below converges to a value lower than the actual one
+        std::vector<bool> has_zero_reward_trap(num_families,false);
+        for(uint64_t family = 0; family < num_families; ++family) {
+            storm::storage::BitVector solvable;
+            // for probabilities, states reaching the target almost surely are fixed as well, otherwise their upper
+            // bounds can hardly be verified due to round-off errors
+            storm::storage::BitVector reaching_target(fragment.target_states);
+            if(not this->computing_rewards) {
+                solvable = this->minimizing ? this->probGreater0A(fragment,family) : this->probGreater0E(fragment,family);
+                reaching_target = this->minimizing ? this->prob1A(fragment,family) : this->prob1E(fragment,family);
+                solvable &= ~reaching_target;
+            } else {
+                solvable = this->minimizing ? this->prob1E(fragment,family) : this->prob1A(fragment,family);
+            }
+            solvable &= ~fragment.target_states;
+            if(this->computing_rewards and this->minimizing) {
+                has_zero_reward_trap[family] = not this->zeroRewardTrap(fragment,family,solvable).empty();
+            }
+            state_is_fixed[family] = ~solvable;
+            for(auto state: state_is_fixed[family]) {
+                state_values[state*num_families+family] = reaching_target[state] ? fixed_target_value : fixed_other_value;
+            }
+            active_states |= solvable;
+        }
+
+        // Gauss-Seidel value iteration on all sub-MDPs at once, followed by the verification of an upper bound;
+        // sub-MDPs whose upper bound was verified keep their upper values, which are no longer updated
+        std::vector<ValueType> upper_values(state_values);
+        std::vector<bool> upper_bound_verified(num_families,false);
+        double precision = this->precision;
+        bool lower_converged = false;
+        this->num_iterations = 0;
+        for(uint64_t round = 0; round < BatchMdpModelChecker<ValueType>::verification_rounds; ++round) {
+            uint64_t round_iterations = 0;
+            lower_converged = false;
+            while(not lower_converged and this->num_iterations < this->max_iterations) {
+                lower_converged = true;
+                this->sweep(fragment, state_is_fixed, active_states, state_values,
+                    [&](uint64_t, uint64_t, ValueType old_value, ValueType new_value) {
+                        if(lower_converged and not this->converged(old_value,new_value,precision)) {
+                            lower_converged = false;
+                        }
+                        return new_value;
+                    }
+                );
+                ++this->num_iterations;
+                ++round_iterations;
+            }
+
+            // raise the lower bounds to candidate upper bounds and iterate them until the Bellman operator does not
+            // increase any of them (the candidate is inductive) or some of them drops below the lower bound
+            std::vector<bool> skipped(num_families);
+            for(uint64_t family = 0; family < num_families; ++family) {
+                skipped[family] = upper_bound_verified[family] or has_zero_reward_trap[family];
+                if(skipped[family]) {
+                    continue;
+                }
+                for(auto state: active_states) {
+                    if(not state_is_fixed[family][state]) {
+                        upper_values[state*num_families+family] = this->raise(state_values[state*num_families+family],precision);
+                    }
+                }
+            }
+            for(uint64_t verification = 0; verification < std::max<uint64_t>(round_iterations,1); ++verification) {
+                std::vector<bool> increased(num_families,false);
+                std::vector<bool> crossed(num_families,false);
+                this->sweep(fragment, state_is_fixed, active_states, upper_values,
+                    [&](uint64_t family, uint64_t state, ValueType old_value, ValueType new_value) {
+                        if(skipped[family]) {
+                            return old_value;
+                        }
+                        if(new_value > old_value) {
+                            increased[family] = true;
+                        }
+                        if(new_value < state_values[state*num_families+family]) {
+                            crossed[family] = true;
+                        }
+                        return new_value;
+                    }
+                );
+                bool all_skipped = true;
+                for(uint64_t family = 0; family < num_families; ++family) {
+                    if(skipped[family]) {
+                        continue;
+                    }
+                    if(crossed[family]) {
+                        skipped[family] = true;
+                    } else if(not increased[family]) {
+                        upper_bound_verified[family] = true;
+                        skipped[family] = true;
+                    }
+                    all_skipped &= skipped[family];
+                }
+                if(all_skipped) {
+                    break;
+                }
+            }
+
+            bool all_verified = true;
+            for(uint64_t family = 0; family < num_families; ++family) {
+                all_verified &= upper_bound_verified[family] or has_zero_reward_trap[family];
+            }
+            if(all_verified or this->num_iterations == this->max_iterations) {
+                break;
+            }
+            precision /= 10;
+        }
+        STORM_LOG_WARN_COND(lower_converged,
+            "batched value iteration did not converge within " << this->max_iterations << " iterations");
+
+        // collect values of the initial state
+        ValueType trivial_upper_value = this->computing_rewards ? storm::utility::infinity<ValueType>() : storm::utility::one<ValueType>();
+        this->solution_value.assign(num_families, storm::utility::zero<ValueType>());
+        this->solution_upper_value.assign(num_families, trivial_upper_value);
+        for(uint64_t family = 0; family < num_families; ++family) {
+            this->solution_value[family] = state_values[fragment.initial_state*num_families+family];
+            if(upper_bound_verified[family]) {
+                this->solution_upper_value[family] = upper_values[fragment.initial_state*num_families+family];
+            }
+        }
+        if(not extract_schedulers) {
+            this->solution_state_values.clear();
+            this->solution_state_to_quotient_choice.clear();
+            return;
+        }
+
+        // extract schedulers and map the values and the schedulers to the quotient
+        this->solution_state_values.assign(num_families, std::vector<ValueType>(quotient_num_states, storm::utility::zero<ValueType>()));
+        this->solution_state_to_quotient_choice.assign(num_families, std::vector<uint64_t>(quotient_num_states,quotient_num_choices));
+        std::vector<ValueType> choice_values(num_choices);
+        std::vector<uint64_t> scheduler(num_states);
+        storm::storage::BitVector choice_is_optimal(num_choices,false);
+        for(uint64_t family = 0; family < num_families; ++family) {
+            auto const& enabled_choices = fragment.enabled_choices[family];
+            std::fill(scheduler.begin(), scheduler.end(), num_choices);
+            choice_is_optimal.clear();
+            for(auto state: fragment.reachable_states[family]) {
+                if(fragment.target_states[state]) {
+                    // any enabled choice
+                    for(uint64_t choice = fragment.row_groups[state]; choice < fragment.row_groups[state+1]; ++choice) {
+                        if(enabled_choices[choice]) {
+                            scheduler[state] = choice;
+                            break;
+                        }
+                    }
+                    continue;
+                }
+                for(uint64_t choice = fragment.row_groups[state]; choice < fragment.row_groups[state+1]; ++choice) {
+                    if(not enabled_choices[choice]) {
+                        continue;
+                    }
+                    choice_values[choice] = this->choiceValue(fragment,family,choice,state_values);
+                    if(scheduler[state] == num_choices or this->improves(choice_values[choice],choice_values[scheduler[state]])) {
+                        scheduler[state] = choice;
+                    }
+                }
+                for(uint64_t choice = fragment.row_groups[state]; choice < fragment.row_groups[state+1]; ++choice) {
+                    if(enabled_choices[choice] and this->converged(choice_values[scheduler[state]],choice_values[choice],this->precision)) {
+                        choice_is_optimal.set(choice,true);
+                    }
+                }
+            }
+
+            if(not this->computing_rewards and not this->minimizing) {
+                // an optimal choice might not make any progress towards the target, e.g. when staying in an end
+                // component: select optimal choices backwards from the target to make sure the target is reached
+                storm::storage::BitVector reaching = this->predecessorsE(fragment,fragment.target_states,choice_is_optimal);
+                storm::storage::BitVector assigned(fragment.target_states);
+                std::queue<uint64_t> unexplored;
+                for(auto state: fragment.target_states) {
+                    unexplored.push(state);
+                }
+                while(not unexplored.empty()) {
+                    uint64_t state = unexplored.front();
+                    unexplored.pop();
+                    for(uint64_t index = fragment.predecessor_rows[state]; index < fragment.predecessor_rows[state+1]; ++index) {
+                        uint64_t choice = fragment.predecessor_choices[index];
+                        uint64_t predecessor = fragment.choice_to_state[choice];
+                        if(not choice_is_optimal[choice] or assigned[predecessor] or not reaching[predecessor]) {
+                            continue;
+                        }
+                        scheduler[predecessor] = choice;
+                        assigned.set(predecessor,true);
+                        unexplored.push(predecessor);
+                    }
+                }
+            }
+
+            auto& values = this->solution_state_values[family];
+            auto& quotient_scheduler = this->solution_state_to_quotient_choice[family];
+            for(uint64_t state = 0; state < num_states; ++state) {
+                values[fragment.states[state]] = state_values[state*num_families+family];
+                if(scheduler[state] != num_choices) {
+                    quotient_scheduler[fragment.states[state]] = fragment.choices[scheduler[state]];
+                }
+            }
+        }
+    }
+
+    template class BatchMdpModelChecker<double>;
+}
@@ -0,0 +1,196 @@
+#pragma once
+
+#include <storm/models/sparse/Mdp.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <limits>
+#include <memory>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace synthesis {
+
+    /**
+     * Model checker that analyzes many sub-MDPs of the quotient, each given by a mask of quotient choices, at once.
+     * Value iteration is performed on all sub-MDPs simultaneously in a single pass over the transition matrix of the
+     * quotient, such that matrix traversal and the solver setup are shared by all sub-MDPs. Supports unbounded
+     * reachability probabilities and expected rewards accumulated until reaching the target.
+     *
+     * Precision semantics: Gauss-Seidel value iteration starting from zero approaches the value of each sub-MDP from
+     * below, hence the computed values are sound lower bounds. Since a relative-difference stopping criterion does not
+     * guarantee that the value is within precision, a sound upper bound is established as well via optimistic value
+     * iteration: the converged lower bound is raised by the (relative) precision and the Bellman operator is applied
+     * to this candidate until it no longer increases it, i.e. the candidate is an inductive upper bound. If the
+     * candidate drops below the lower bound instead, value iteration continues with a tightened precision. Results
+     * that decide pruning or optimum updates must be based on both bounds.
+     *
+     * Each check first extracts the fragment of the quotient reachable from the initial state via the choices of the
+     * sub-MDPs and renumbers its states and choices. The qualitative analysis and the iterations work on this local
+     * copy only, such that checking e.g. a single DTMC induced by a hole assignment costs time proportional to the
+     * reachable states and their choices rather than to the size of the quotient.
+     */
+    template<typename ValueType>
+    class BatchMdpModelChecker {
+    public:
+
+        /**
+         * @param quotient The quotient MDP.
+         * @param target_states Target states of the quotient.
+         * @param reward_model_name If set, expected rewards of this reward model will be computed, otherwise,
+         *  reachability probabilities are computed.
+         * @param minimizing Whether the objective is minimized.
+         * @param precision Relative precision of the value iteration, also used to raise the lower bound to a
+         *  candidate upper bound.
+         * @param max_iterations Maximum number of iterations of the value iteration.
+         */
+        BatchMdpModelChecker(
+            std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& quotient,
+            storm::storage::BitVector const& target_states,
+            std::optional<std::string> const& reward_model_name,
+            bool minimizing,
+            double precision,
+            uint64_t max_iterations
+        );
+
+        /**
+         * Model check sub-MDPs of the quotient.
+         * @param choice_masks For each sub-MDP, quotient choices that remained in it.
+         * @param extract_schedulers If false, only the bounds on the values of the initial state are computed and
+         *  solution_state_values and solution_state_to_quotient_choice are left empty.
+         * @note For sub-MDPs where the target can be avoided forever with zero reward, minimizing rewards yields only
+         *  a lower bound and the upper bound is left trivial (infinite), such that callers fall back to an exact
+         *  model checker.
+         */
+        void check(std::vector<storm::storage::BitVector> const& choice_masks, bool extract_schedulers = true);
+
+        /**
+         * For each sub-MDP, the value of each state of the quotient; values of states unreachable in the sub-MDP are
+         * not computed.
+         */
+        std::vector<std::vector<ValueType>> solution_state_values;
+        /** For each sub-MDP, the value of the initial state; this value is a sound lower bound. */
+        std::vector<ValueType> solution_value;
+        /**
+         * For each sub-MDP, a sound upper bound on the value of the initial state. The bound is trivial (1 or
+         * infinity) if no inductive upper bound was found.
+         */
+        std::vector<ValueType> solution_upper_value;
+        /**
+         * For each sub-MDP, a choice selected in each state. State s contains quotient_num_choices if it has no
+         * choice in the sub-MDP or if it is unreachable in the sub-MDP.
+         */
+        std::vector<std::vector<uint64_t>> solution_state_to_quotient_choice;
+
+        /** Number of iterations of the last value iteration. */
+        uint64_t num_iterations;
+
+    private:
+
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> quotient;
+        storm::storage::BitVector target_states;
+        bool computing_rewards;
+        bool minimizing;
+        double precision;
+        uint64_t max_iterations;
+
+        /** Number of attempts to verify a candidate upper bound, each with a tenfold precision. */
+        static const uint64_t verification_rounds = 10;
+
+        /** For each choice of the quotient, its (state-action) reward. */
+        std::vector<ValueType> choice_rewards;
+
+        /** Marker of unnumbered states in state_to_local. */
+        static constexpr uint64_t unnumbered = std::numeric_limits<uint64_t>::max();
+        /**
+         * For each state of the quotient, its index in the fragment being built. Reused across checks: only the
+         * entries of the fragment are set and they are reset once the fragment is built.
+         */
+        std::vector<uint64_t> state_to_local;
+        /** For each state of the quotient, the last exploration that visited it. Reused across checks. */
+        std::vector<uint64_t> state_visited;
+        /** Number of explorations performed so far. */
+        uint64_t num_explorations = 0;
+
+        /**
+         * Fragment of the quotient reachable in the checked sub-MDPs. States and choices are numbered locally,
+         * transitions and predecessors are stored in compressed rows.
+         */
+        struct Fragment {
+            /** Quotient states of the fragment, in increasing order. */
+            std::vector<uint64_t> states;
+            /** For each local state, the range of its local choices. */
+            std::vector<uint64_t> row_groups;
+            /** Quotient choices of the fragment, i.e. choices enabled in some sub-MDP. */
+            std::vector<uint64_t> choices;
+            /** For each local choice, its local state. */
+            std::vector<uint64_t> choice_to_state;
+            /** For each local choice, the range of its transitions. */
+            std::vector<uint64_t> rows;
+            /** Local successor and probability of each transition. */
+            std::vector<uint64_t> successors;
+            std::vector<ValueType> probabilities;
+            /** For each local choice, its reward. */
+            std::vector<ValueType> rewards;
+            /** For each local state, the range of the local choices leading to it. */
+            std::vector<uint64_t> predecessor_rows;
+            std::vector<uint64_t> predecessor_choices;
+            /** Local target states. */
+            storm::storage::BitVector target_states;
+            /** Local initial state. */
+            uint64_t initial_state;
+            /** For each sub-MDP, local states reachable from the initial state. */
+            std::vector<storm::storage::BitVector> reachable_states;
+            /** For each sub-MDP, local choices of its reachable states. */
+            std::vector<storm::storage::BitVector> enabled_choices;
+        };
+
+        /** Extract and renumber the fragment of the quotient reachable in the sub-MDPs. */
+        Fragment buildFragment(std::vector<storm::storage::BitVector> const& choice_masks);
+
+        /** States from which the target can be reached using the enabled choices. */
+        storm::storage::BitVector probGreater0E(Fragment const& fragment, uint64_t family) const;
+        /** States from which the target is reached with positive probability by all schedulers. */
+        storm::storage::BitVector probGreater0A(Fragment const& fragment, uint64_t family) const;
+        /** States from which the target is reached almost surely by some scheduler. */
+        storm::storage::BitVector prob1E(Fragment const& fragment, uint64_t family) const;
+        /** States from which the target is reached almost surely by all schedulers. */
+        storm::storage::BitVector prob1A(Fragment const& fragment, uint64_t family) const;
+        /** States from which the target can be avoided forever using choices with zero reward. */
+        storm::storage::BitVector zeroRewardTrap(
+            Fragment const& fragment, uint64_t family, storm::storage::BitVector const& states
+        ) const;
+        /** Backward closure of the given states via the allowed choices, never passing through target states. */
+        storm::storage::BitVector predecessorsE(
+            Fragment const& fragment, storm::storage::BitVector const& states,
+            storm::storage::BitVector const& allowed_choices
+        ) const;
+
+        /**
+         * Perform one Gauss-Seidel sweep of the Bellman operator over the active states of all sub-MDPs.
+         * @param state_values Values of the local states in all sub-MDPs (state-major), updated in place.
+         * @param update Given a sub-MDP, a state, its current value and the result of the Bellman operator, returns
+         *  the value to be stored.
+         */
+        template<typename UpdateFunction>
+        void sweep(
+            Fragment const& fragment, std::vector<storm::storage::BitVector> const& state_is_fixed,
+            storm::storage::BitVector const& active_states, std::vector<ValueType>& state_values,
+            UpdateFunction const& update
+        ) const;
+
+        /** Value of a local choice in a sub-MDP wrt. the given values of the local states. */
+        ValueType choiceValue(
+            Fragment const& fragment, uint64_t family, uint64_t choice, std::vector<ValueType> const& state_values
+        ) const;
+
+        /** Whether the new value is within the given relative precision of the old one. */
+        bool converged(ValueType old_value, ValueType new_value, double precision) const;
+        /** Raise a lower bound by the given relative precision to obtain a candidate upper bound. */
+        ValueType raise(ValueType value, double precision) const;
+        /** Whether the first value is better than the second one wrt. the direction of the objective. */
+        bool improves(ValueType value, ValueType other) const;
+    };
+
+}
@@ -1,7 +1,11 @@
 #include "MdpModelChecker.h"
 
 #include "storm/modelchecker/prctl/SparseMdpPrctlModelChecker.h"
+#include "storm/modelchecker/hints/ExplicitModelCheckerHint.h"
+#include "storm/exceptions/InvalidArgumentException.h"
 #include "storm/exceptions/NotSupportedException.h"
+#include "storm/utility/constants.h"
+#include "storm/utility/macros.h"
 
 namespace synthesis {
 
@@ -10,10 +14,26 @@ namespace synthesis {
         storm::Environment const& env,
         std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
         storm::logic::Formula const& formula,
-        bool produce_schedulers
+        bool produce_schedulers,
+        std::optional<std::vector<ValueType>> const& result_hint
     ) {
         storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> task(formula);
         task.setProduceSchedulers(produce_schedulers);
+        if(result_hint) {
+            STORM_LOG_THROW(result_hint->size() == mdp->getNumberOfStates(), storm::exceptions::InvalidArgumentException,
+                "result hint does not match the states of the MDP");
+            // the solver may start from any finite values, infinite values (e.g. expected rewards of states that
+            // do not reach the target) are replaced by zero
+            std::vector<ValueType> values(*result_hint);
+            for(auto& value: values) {
+                if(storm::utility::isInfinity(value)) {
+                    value = storm::utility::zero<ValueType>();
+                }
+            }
+            auto hint = std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>();
+            hint->setResultHint(std::move(values));
+            task.setHint(hint);
+        }
         storm::modelchecker::SparseMdpPrctlModelChecker<storm::models::sparse::Mdp<ValueType>> modelchecker(*mdp);
         return modelchecker.check(env, task);
     }
@@ -22,6 +42,7 @@ namespace synthesis {
         storm::Environment const& env,
         std::shared_ptr<storm::models::sparse::Mdp<double>> const& mdp,
         storm::logic::Formula const& formula,
-        bool produce_schedulers
+        bool produce_schedulers,
+        std::optional<std::vector<double>> const& result_hint
     );
 }
@@ -5,14 +5,24 @@
 #include "storm/modelchecker/CheckTask.h"
 #include "storm/modelchecker/results/CheckResult.h"
 
+#include <optional>
+#include <vector>
+
 namespace synthesis {
 
+    /**
+     * Model check an MDP.
+     * @param result_hint If set, the solver will be warm-started with these state values, e.g. values of a related
+     *  model (a super-MDP) from which the sought values are expected to differ only slightly. The values must be lower
+     *  bounds of the sought values: sound solvers such as optimistic value iteration approach the solution from below.
+     */
     template<typename ValueType>
     std::shared_ptr<storm::modelchecker::CheckResult> verifyMdp(
         storm::Environment const& env,
         std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
         storm::logic::Formula const& formula,
-        bool produce_schedulers
+        bool produce_schedulers,
+        std::optional<std::vector<ValueType>> const& result_hint = std::nullopt
     );
 
 }
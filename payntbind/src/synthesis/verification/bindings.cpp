@@ -0,0 +1,29 @@
+#include "../synthesis.h"
+
+#include "BatchMdpModelChecker.h"
+#include "MdpModelChecker.h"
+
+void bindings_verification(py::module& m) {
+
+    m.def("verify_mdp", &synthesis::verifyMdp<double>, py::arg("env"), py::arg("mdp"), py::arg("formula"), py::arg("produce_schedulers"), py::arg("result_hint") = std::nullopt);
+
+    py::class_<synthesis::BatchMdpModelChecker<double>>(m, "BatchMdpModelChecker")
+        .def(
+            py::init<
+                std::shared_ptr<storm::models::sparse::Mdp<double>> const&,
+                storm::storage::BitVector const&,
+                std::optional<std::string> const&,
+                bool,
+                double,
+                uint64_t
+            >(),
+            py::arg("quotient"), py::arg("target_states"), py::arg("reward_model_name"), py::arg("minimizing"), py::arg("precision"), py::arg("max_iterations")
+        )
+        .def("check", &synthesis::BatchMdpModelChecker<double>::check, py::arg("choice_masks"), py::arg("extract_schedulers") = true)
+        .def_property_readonly("solution_state_values", [](synthesis::BatchMdpModelChecker<double>& checker) {return checker.solution_state_values;})
+        .def_property_readonly("solution_value", [](synthesis::BatchMdpModelChecker<double>& checker) {return checker.solution_value;})
+        .def_property_readonly("solution_upper_value", [](synthesis::BatchMdpModelChecker<double>& checker) {return checker.solution_upper_value;})
+        .def_property_readonly("solution_state_to_quotient_choice", [](synthesis::BatchMdpModelChecker<double>& checker) {return checker.solution_state_to_quotient_choice;})
+        .def_readonly("num_iterations", &synthesis::BatchMdpModelChecker<double>::num_iterations)
+        ;
+}
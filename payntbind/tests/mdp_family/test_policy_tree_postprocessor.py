@@ -0,0 +1,104 @@
+import payntbind
+import stormpy
+
+import pytest
+
+
+PRISM_MDP = '''
+mdp
+
+module m
+    s : [0..4] init 0;
+    [a] s=0 -> 0.5:(s'=1) + 0.5:(s'=2);
+    [b] s=0 -> 1:(s'=2);
+    [c] s=0 -> 1:(s'=0);
+    [] s=1 -> 0.3:(s'=3) + 0.7:(s'=0);
+    [] s=2 -> 0.5:(s'=3) + 0.5:(s'=4);
+    [] s>=3 -> true;
+endmodule
+'''
+
+# actions a,b,c of the initial state and the action of the remaining states
+NUM_ACTIONS = 4
+
+def build_postprocessor(tmp_path):
+    prism_file = tmp_path / "model.prism"
+    prism_file.write_text(PRISM_MDP)
+    program = stormpy.parse_prism_program(str(prism_file))
+    mdp = stormpy.build_model(program)
+    initial_state = mdp.initial_states[0]
+    choice_to_action = [NUM_ACTIONS-1] * mdp.nr_choices
+    for action,choice in enumerate(mdp.transition_matrix.get_rows_for_group(initial_state)):
+        choice_to_action[choice] = action
+    postprocessor = payntbind.synthesis.PolicyTreePostprocessor(mdp, NUM_ACTIONS, choice_to_action)
+    return mdp, postprocessor
+
+def make_policy(mdp, state_to_action):
+    ''' Policy over the states of the MDP that is undefined in states missing in state_to_action. '''
+    policy = [NUM_ACTIONS] * mdp.nr_states
+    for state,action in state_to_action.items():
+        policy[state] = action
+    return policy
+
+
+class TestPolicyTreePostprocessor:
+
+    def test_compatible_policies_are_merged(self, tmp_path):
+        mdp, postprocessor = build_postprocessor(tmp_path)
+        index1 = postprocessor.add_policy(make_policy(mdp, {0: 0, 2: 3}))
+        index2 = postprocessor.add_policy(make_policy(mdp, {1: 3, 2: 3}))
+        assert postprocessor.policies_are_compatible(index1, index2)
+        assert postprocessor.merge_policies(index1, index2)
+        assert postprocessor.get_policy(index1) == make_policy(mdp, {0: 0, 1: 3, 2: 3})
+
+    def test_incompatible_policies(self, tmp_path):
+        mdp, postprocessor = build_postprocessor(tmp_path)
+        index1 = postprocessor.add_policy(make_policy(mdp, {0: 0}))
+        index2 = postprocessor.add_policy(make_policy(mdp, {0: 1, 2: 3}))
+        assert not postprocessor.policies_are_compatible(index1, index2)
+        assert not postprocessor.merge_policies(index1, index2)
+        assert postprocessor.get_policy(index1) == make_policy(mdp, {0: 0})
+
+    def test_merge_compatible_policies(self, tmp_path):
+        mdp, postprocessor = build_postprocessor(tmp_path)
+        postprocessor.add_policy(make_policy(mdp, {0: 0}))
+        postprocessor.add_policy(make_policy(mdp, {0: 1}))
+        postprocessor.add_policy(make_policy(mdp, {0: 0, 1: 3}))
+        postprocessor.add_policy(make_policy(mdp, {0: 1, 2: 3}))
+        assert postprocessor.merge_compatible_policies([0, 1, 2, 3]) == [0, 1, 0, 1]
+        assert postprocessor.get_policy(2) is None
+        assert postprocessor.get_policy(3) is None
+        assert postprocessor.get_policy(0) == make_policy(mdp, {0: 0, 1: 3})
+
+    def test_candidate_is_restricted_to_reachable_states(self, tmp_path):
+        mdp, postprocessor = build_postprocessor(tmp_path)
+        initial_state = mdp.initial_states[0]
+        index1 = postprocessor.add_policy(make_policy(mdp, {initial_state: 1}))
+        index2 = postprocessor.add_policy(make_policy(mdp, {initial_state: 0}))
+        family_choices = stormpy.BitVector(mdp.nr_choices, True)
+        choice_masks = postprocessor.prepare_candidates([(index1, index2)], [family_choices])
+        # action b leads to s=2 and then to s=3,s=4, s=1 is not reachable
+        assert choice_masks[0].number_of_set_bits() == 4
+        postprocessor.adopt_candidate(index1, 0)
+        policy = postprocessor.get_policy(index1)
+        assert policy[initial_state] == 1
+        assert policy.count(NUM_ACTIONS) == 1
+
+    def test_policy_arrays(self, tmp_path):
+        numpy = pytest.importorskip("numpy")
+        mdp, postprocessor = build_postprocessor(tmp_path)
+        policy = numpy.full(mdp.nr_states, -1, dtype=numpy.int32)
+        policy[0] = 0
+        index1 = postprocessor.add_policy_array(policy)
+        index2 = postprocessor.add_policy(make_policy(mdp, {1: 3}))
+        assert postprocessor.get_policy(index1) == make_policy(mdp, {0: 0})
+        assert not postprocessor.policy_modified(index1)
+        assert postprocessor.merge_policies(index1, index2)
+        assert postprocessor.policy_modified(index1)
+        expected = numpy.full(mdp.nr_states, -1, dtype=numpy.int32)
+        expected[0] = 0
+        expected[1] = 3
+        assert numpy.array_equal(postprocessor.get_policy_array(index1), expected)
+        postprocessor.remove_policy(index2)
+        assert not postprocessor.has_policy(index2)
+        assert postprocessor.get_policy_array(index2) is None
@@ -0,0 +1,55 @@
+import pickle
+
+import payntbind
+
+
+def make_family():
+    family = payntbind.synthesis.Family()
+    family.addHole(3)
+    family.addHole(130)
+    family.holeSetOptions(0, [2])
+    family.holeSetOptions(1, [0, 63, 64, 65, 129])
+    return family
+
+
+class TestFamily:
+
+    def test_pack_unpack(self):
+        family = make_family()
+        unpacked = payntbind.synthesis.Family.unpack(family.pack())
+
+        assert unpacked.numHoles() == 2
+        assert unpacked.holeOptions(0) == [2]
+        assert unpacked.holeOptions(1) == [0, 63, 64, 65, 129]
+        assert unpacked.holeNumOptionsTotal(1) == 130
+
+    def test_pickle(self):
+        family = make_family()
+        unpickled = pickle.loads(pickle.dumps(family))
+        assert unpickled.holeOptions(1) == family.holeOptions(1)
+
+    def test_packed_words(self):
+        family = make_family()
+        words = memoryview(family.pack()).cast("Q")
+        # number of holes, then (number of options, mask words) for each hole
+        assert len(words) == 1 + (1+1) + (1+3)
+        assert words[0] == 2
+        assert words[1] == 3
+        assert words[3] == 130
+
+    def test_packed_copy_is_owned(self):
+        family = make_family()
+        words = memoryview(family.pack()).cast("Q")
+        expected = words.tolist()
+
+        # mutating and repacking the family must not affect previously packed words
+        family.holeSetOptions(0, [0, 1])
+        family.holeSetOptions(1, [64])
+        repacked = family.pack()
+
+        assert words.tolist() == expected
+        assert memoryview(repacked).cast("Q").tolist() != expected
+        unpacked = payntbind.synthesis.Family.unpack(words.tobytes())
+        assert unpacked.holeOptions(0) == [2]
+        assert unpacked.holeOptions(1) == [0, 63, 64, 65, 129]
+        assert payntbind.synthesis.Family.unpack(repacked).holeOptions(1) == [64]
@@ -0,0 +1,46 @@
+import payntbind
+
+
+def make_design_space():
+    family = payntbind.synthesis.Family()
+    family.addHole(2)
+    family.addHole(3)
+    return family
+
+def enumerate_assignments(solver, family_index):
+    assignments = []
+    while True:
+        assignment = solver.pickAssignment(family_index)
+        if assignment is None:
+            return assignments
+        assignments.append(tuple(assignment))
+        # exclude the assignment itself
+        solver.excludeConflict(make_design_space(), assignment, [0, 1])
+
+
+class TestFamilySmtSolver:
+
+    def test_assignments_are_picked_from_the_family(self):
+        design_space = make_design_space()
+        solver = payntbind.synthesis.FamilySmtSolver(design_space)
+        family = payntbind.synthesis.Family(design_space)
+        family.holeSetOptions(1, [0, 2])
+        family_index = solver.addFamily(family)
+        assert sorted(enumerate_assignments(solver, family_index)) == [(0,0), (0,2), (1,0), (1,2)]
+
+    def test_conflicts_are_kept_across_families(self):
+        design_space = make_design_space()
+        solver = payntbind.synthesis.FamilySmtSolver(design_space)
+        family1 = payntbind.synthesis.Family(design_space)
+        family1.holeSetOptions(0, [0])
+        family1_index = solver.addFamily(family1)
+        family2 = payntbind.synthesis.Family(design_space)
+        family2.holeSetOptions(1, [1])
+        family2_index = solver.addFamily(family2)
+
+        # within family1, hole 1 set to 1 is a conflict regardless of hole 0
+        solver.excludeConflict(family1, [0, 1], [1])
+        assert (0,1) not in enumerate_assignments(solver, family1_index)
+        solver.releaseFamily(family1_index)
+        # the conflict only applies to members of family1
+        assert enumerate_assignments(solver, family2_index) == [(1,1)]
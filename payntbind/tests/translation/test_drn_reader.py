@@ -0,0 +1,50 @@
+import stormpy
+import payntbind
+
+from helpers.helper import get_stormpy_example_path
+
+from paynt.examples import paynt_models_dir
+
+import os
+
+
+class TestDrnReader:
+
+    def test_read_mdp(self, tmp_path):
+        # setup
+        program = stormpy.parse_prism_program(get_stormpy_example_path("mdp", "tiny_rewards.nm"), prism_compat=True)
+        program = program.label_unlabelled_commands({})
+        # state valuations are not supported by the reader
+        builder_options = stormpy.BuilderOptions()
+        builder_options.set_build_all_labels(True)
+        builder_options.set_build_choice_labels(True)
+        builder_options.set_build_all_reward_models(True)
+        mdp = stormpy.build_sparse_model_with_options(program, builder_options)
+        drn_path = os.path.join(tmp_path, "model.drn")
+        stormpy.export_to_drn(mdp, drn_path)
+
+        # test
+        model = payntbind.synthesis.readDrn(drn_path)
+
+        # assert
+        assert model.nr_states == mdp.nr_states
+        assert model.nr_choices == mdp.nr_choices
+        assert model.nr_transitions == mdp.nr_transitions
+        assert list(model.initial_states) == list(mdp.initial_states)
+        assert set(model.reward_models.keys()) == set(mdp.reward_models.keys())
+        for state in range(mdp.nr_states):
+            assert model.labeling.get_labels_of_state(state) == mdp.labeling.get_labels_of_state(state)
+
+    def test_read_posmg(self):
+        # setup
+        drn_path = os.path.join(paynt_models_dir, "posmg", "pursuit-evasion", "pursuit-evasion.drn")
+
+        # test
+        posmg = payntbind.synthesis.readDrn(drn_path)
+
+        # assert
+        assert isinstance(posmg, payntbind.synthesis.Posmg)
+        assert posmg.nr_states == 2106
+        assert posmg.nr_choices == 7452
+        assert posmg.get_observations()[577] == 0
+        assert list(posmg.initial_states) == [577]
@@ -0,0 +1,130 @@
+import payntbind
+import stormpy
+
+import pytest
+
+
+PRISM_MDP = '''
+mdp
+
+module m
+    s : [0..4] init 0;
+    [a] s=0 -> 0.5:(s'=1) + 0.5:(s'=2);
+    [b] s=0 -> 1:(s'=2);
+    [c] s=0 -> 1:(s'=0);
+    [] s=1 -> 0.3:(s'=3) + 0.7:(s'=0);
+    [] s=2 -> 0.5:(s'=3) + 0.5:(s'=4);
+    [] s>=3 -> true;
+endmodule
+
+rewards "steps"
+    true : 1;
+endrewards
+
+rewards "cost"
+    [a] true : 1;
+    [b] true : 1;
+endrewards
+
+label "goal" = s=3;
+label "done" = s>=3;
+'''
+
+def build_mdp(tmp_path):
+    prism_file = tmp_path / "model.prism"
+    prism_file.write_text(PRISM_MDP)
+    program = stormpy.parse_prism_program(str(prism_file))
+    return stormpy.build_model(program)
+
+def choice_masks(mdp, initial_actions_list):
+    ''' For each subset of actions (a,b,c) of the initial state, a mask of choices of the MDP. '''
+    initial_state = mdp.initial_states[0]
+    action_to_choice = dict(zip("abc", mdp.transition_matrix.get_rows_for_group(initial_state)))
+    masks = []
+    for initial_actions in initial_actions_list:
+        mask = stormpy.BitVector(mdp.nr_choices, True)
+        for action,choice in action_to_choice.items():
+            mask.set(choice, action in initial_actions)
+        masks.append(mask)
+    return masks, action_to_choice
+
+
+class TestBatchMdpModelChecker:
+
+    def test_reachability_max(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("goal"), None, False, 1e-8, 100000)
+        masks, action_to_choice = choice_masks(mdp, ["abc", "bc", "c"])
+        checker.check(masks)
+        assert checker.solution_value == pytest.approx([0.4/0.65, 0.5, 0], abs=1e-6)
+        assert checker.solution_upper_value == pytest.approx([0.4/0.65, 0.5, 0], abs=1e-6)
+        for lower,upper,exact in zip(checker.solution_value, checker.solution_upper_value, [0.4/0.65, 0.5, 0]):
+            assert lower <= exact + 1e-12 and exact - 1e-12 <= upper
+        # the self-loop is optimal in the second sub-MDP as well, but it never reaches the target
+        initial_state = mdp.initial_states[0]
+        assert checker.solution_state_to_quotient_choice[0][initial_state] == action_to_choice["a"]
+        assert checker.solution_state_to_quotient_choice[1][initial_state] == action_to_choice["b"]
+
+    def test_reachability_min(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("goal"), None, True, 1e-8, 100000)
+        masks,_ = choice_masks(mdp, ["abc", "a"])
+        checker.check(masks)
+        assert checker.solution_value == pytest.approx([0, 0.4/0.65], abs=1e-6)
+        assert checker.solution_upper_value == pytest.approx([0, 0.4/0.65], abs=1e-6)
+
+    def test_reward_min(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("done"), "steps", True, 1e-8, 100000)
+        masks,_ = choice_masks(mdp, ["abc", "a", "c"])
+        checker.check(masks)
+        assert checker.solution_value == pytest.approx([2, 2/0.65, float("inf")], abs=1e-6)
+        assert checker.solution_upper_value == pytest.approx([2, 2/0.65, float("inf")], abs=1e-6)
+        assert checker.solution_value[1] <= 2/0.65 <= checker.solution_upper_value[1]
+
+    def test_reward_min_zero_reward_trap(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("done"), "cost", True, 1e-8, 100000)
+        masks,_ = choice_masks(mdp, ["abc", "ab"])
+        checker.check(masks)
+        # the zero-reward self-loop only yields a lower bound, the upper bound remains trivial
+        assert checker.solution_value[0] <= 1
+        assert checker.solution_upper_value[0] == float("inf")
+        assert checker.solution_value[1] == pytest.approx(1, abs=1e-6)
+        assert checker.solution_upper_value[1] == pytest.approx(1, abs=1e-6)
+
+    def test_reward_max(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("done"), "steps", False, 1e-8, 100000)
+        masks,_ = choice_masks(mdp, ["abc", "ab"])
+        checker.check(masks)
+        assert checker.solution_value == pytest.approx([float("inf"), 2/0.65], abs=1e-6)
+
+    def test_values_without_schedulers(self, tmp_path):
+        mdp = build_mdp(tmp_path)
+        checker = payntbind.synthesis.BatchMdpModelChecker(mdp, mdp.labeling.get_states("goal"), None, False, 1e-8, 100000)
+        masks,_ = choice_masks(mdp, ["abc", "b", "c"])
+        checker.check(masks)
+        expected = (checker.solution_value, checker.solution_upper_value, checker.solution_state_to_quotient_choice)
+        checker.check(masks, extract_schedulers=False)
+        assert checker.solution_value == pytest.approx(expected[0], abs=1e-12)
+        assert checker.solution_upper_value == pytest.approx(expected[1], abs=1e-12)
+        assert checker.solution_state_values == [] and checker.solution_state_to_quotient_choice == []
+        # states unreachable in a sub-MDP have no choice selected
+        unreachable = [state for state in range(mdp.nr_states) if state not in (mdp.initial_states[0], 2, 3, 4)]
+        assert all(expected[2][1][state] == mdp.nr_choices for state in unreachable)
+
+
+class TestVerifyMdp:
+
+    def test_result_hint(self, tmp_path):
+        env = stormpy.Environment()
+        env.solver_environment.minmax_solver_environment.method = stormpy.MinMaxMethod.optimistic_value_iteration
+        mdp = build_mdp(tmp_path)
+        formula = stormpy.parse_properties('Rmin=? [F "done"]')[0].raw_formula
+        cold = payntbind.synthesis.verify_mdp(env, mdp, formula, True)
+        # a lower bound of the sought values, e.g. values of a super-MDP when minimizing
+        hint = [value / 2 for value in cold.get_values()]
+        warm = payntbind.synthesis.verify_mdp(env, mdp, formula, True, hint)
+        assert warm.get_values() == pytest.approx(cold.get_values(), rel=1e-3)
+        assert warm.at(mdp.initial_states[0]) == pytest.approx(2, rel=1e-3)
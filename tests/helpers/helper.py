@@ -3,6 +3,8 @@ import stormpy
 import stormpy.examples
 import stormpy.examples.files
 
+import paynt.parser.sketch
+import paynt.synthesizer.synthesizer_ar
 from paynt.examples import paynt_models_dir
 
 stormpy_example_dir = stormpy.examples.files.testfile_dir
@@ -13,3 +15,12 @@ def get_stormpy_example_path(*paths):
 
 def get_sketch_paths(project_path, sketch_name="sketch.templ", props_name="sketch.props"):
     return os.path.join(paynt_models_dir, project_path, sketch_name), os.path.join(paynt_models_dir, project_path, props_name)
+
+def assignment_value(quotient, assignment):
+    return quotient.build_assignment(assignment).check_specification(quotient.specification).optimality_result.value
+
+def get_ar_optimum(sketch_path, props_path):
+    ''' Value of the optimal assignment of a sketch synthesized by sequential AR, a reference for other synthesizers. '''
+    quotient = paynt.parser.sketch.Sketch.load_sketch(sketch_path, props_path)
+    assignment = paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient).synthesize()
+    return assignment_value(quotient, assignment)
@@ -0,0 +1,52 @@
+import paynt.parser.sketch as sketch
+import paynt.parser.quotient_cache
+
+from helpers.helper import get_sketch_paths
+
+import os
+
+class TestQuotientCache:
+
+    def test_quotient_is_loaded_from_cache(self, tmp_path):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/grid/grid", props_name="easy.props")
+        paynt.parser.quotient_cache.QuotientCache.cache_dir = str(tmp_path)
+
+        # test
+        try:
+            built = sketch.Sketch.load_sketch(sketch_path, props_path)
+            num_entries = len(os.listdir(tmp_path))
+            cached = sketch.Sketch.load_sketch(sketch_path, props_path)
+        finally:
+            paynt.parser.quotient_cache.QuotientCache.cache_dir = None
+
+        # assert
+        assert num_entries == 2
+        assert cached.quotient_mdp.nr_states == built.quotient_mdp.nr_states
+        assert cached.quotient_mdp.nr_choices == built.quotient_mdp.nr_choices
+        assert cached.quotient_mdp.nr_transitions == built.quotient_mdp.nr_transitions
+        assert cached.family.size == built.family.size
+        assert list(cached.coloring.getChoiceToAssignment()) == list(built.coloring.getChoiceToAssignment())
+
+    def test_changed_threshold_hits_cache(self, tmp_path):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/grid/grid", props_name="easy.props")
+        with open(props_path) as file:
+            props = file.read()
+        assert "0.928" in props
+        changed_props_path = tmp_path / "changed.props"
+        changed_props_path.write_text(props.replace("0.928", "0.5"))
+        cache_dir = tmp_path / "cache"
+        paynt.parser.quotient_cache.QuotientCache.cache_dir = str(cache_dir)
+
+        # test
+        try:
+            built = sketch.Sketch.load_sketch(sketch_path, props_path)
+            cached = sketch.Sketch.load_sketch(sketch_path, str(changed_props_path))
+        finally:
+            paynt.parser.quotient_cache.QuotientCache.cache_dir = None
+
+        # assert
+        assert len(os.listdir(cache_dir)) == 2
+        assert cached.quotient_mdp.nr_choices == built.quotient_mdp.nr_choices
+        assert cached.specification.constraints[0].threshold == 0.5
@@ -0,0 +1,76 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.synthesizer_ar
+
+from helpers.helper import get_sketch_paths
+
+import pytest
+
+class TestCheckInPlace:
+
+    def test_in_place_check_matches_dtmc(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/grid/grid", props_name="easy.props")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        spec = quotient.specification
+        assignment = quotient.family.pick_any()
+
+        # test
+        assert quotient.supports_choice_mask_checking(spec)
+        in_place = quotient.check_assignment_in_place(assignment, spec)
+        dtmc = quotient.build_assignment(assignment).check_specification(spec)
+
+        # assert
+        assert in_place is not None
+        assert in_place.constraints_result.sat == dtmc.constraints_result.sat
+        for result,expected in zip(in_place.constraints_result.results, dtmc.constraints_result.results):
+            assert result.sat == expected.sat
+            assert result.value == pytest.approx(expected.value, rel=1e-3)
+
+    def test_improving_assignment_is_left_to_dtmc(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        spec = quotient.specification
+        # an assignment satisfying the constraints
+        assignment = paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient).synthesize()
+        assert assignment is not None
+        dtmc = quotient.build_assignment(assignment).check_specification(spec)
+        assert dtmc.constraints_result.sat
+        value = dtmc.optimality_result.value
+
+        # test
+        assert quotient.supports_choice_mask_checking(spec)
+        spec.optimality.reset()
+        improving = quotient.check_assignment_in_place(assignment, spec)
+        spec.optimality.update_optimum(value)
+        not_improving = quotient.check_assignment_in_place(assignment, spec)
+
+        # assert
+        # without an optimum, the assignment improves it and its value must be computed exactly
+        assert improving is None
+        assert not_improving is not None
+        assert not_improving.optimality_result.improves_optimum is False
+        assert not_improving.accepting_dtmc(spec) == (False, None)
+
+    def test_ar_optimum_matches_dtmc_check(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        double_check_in_place = paynt.synthesizer.synthesizer_ar.SynthesizerAR.double_check_in_place
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        expected = paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient)
+        expected_assignment = expected.synthesize(keep_optimum=True)
+
+        # test
+        paynt.synthesizer.synthesizer_ar.SynthesizerAR.double_check_in_place = True
+        try:
+            quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+            synthesizer = paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient)
+            assignment = synthesizer.synthesize(keep_optimum=True)
+        finally:
+            paynt.synthesizer.synthesizer_ar.SynthesizerAR.double_check_in_place = double_check_in_place
+
+        # assert
+        assert expected_assignment is not None and assignment is not None
+        assert synthesizer.best_assignment_value == expected.best_assignment_value
+        value = quotient.build_assignment(assignment).check_specification(quotient.specification).optimality_result.value
+        assert value == expected.best_assignment_value
@@ -0,0 +1,41 @@
+import paynt.parser.sketch as sketch
+import paynt.family.family
+
+from helpers.helper import get_sketch_paths
+
+import pytest
+
+class TestIncrementalRestriction:
+
+    def test_restriction_of_parent_matches_quotient(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/grid/grid", props_name="easy.props")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        prop = quotient.specification.all_properties()[0]
+        family = quotient.family
+        quotient.build(family)
+        splitter = [hole for hole in range(family.num_holes) if family.hole_num_options(hole) > 1][0]
+        options = family.hole_options(splitter)
+        subfamilies = family.split(splitter, [options[:1], options[1:]])
+        parent_info = paynt.family.family.ParentInfo()
+        parent_info.selected_choices = family.selected_choices
+        parent_info.splitter = splitter
+        parent_info.mdp = family.mdp
+        parent_info.num_unbuilt_subfamilies = len(subfamilies)
+
+        for subfamily in subfamilies:
+            # test
+            expected = subfamily.copy()
+            quotient.build(expected)
+            subfamily.parent_info = parent_info
+            quotient.build(subfamily)
+
+            # assert
+            assert list(subfamily.selected_choices) == list(expected.selected_choices)
+            assert sorted(subfamily.mdp.quotient_state_map) == sorted(expected.mdp.quotient_state_map)
+            assert sorted(subfamily.mdp.quotient_choice_map) == sorted(expected.mdp.quotient_choice_map)
+            value = subfamily.mdp.model_check_property(prop).value
+            assert value == pytest.approx(expected.mdp.model_check_property(prop).value)
+
+        # the parent MDP is released once all subfamilies are built
+        assert parent_info.mdp is None
@@ -0,0 +1,78 @@
+import paynt.parser.sketch as sketch
+import paynt.verification.property
+
+from helpers.helper import get_sketch_paths
+
+import pytest
+
+
+def reference_scores(quotient, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits):
+    ''' Scores of inconsistent holes as computed in Python before the scoring was implemented natively. '''
+    hole_option_to_actions = [
+        [[] for _ in quotient.family.hole_options(hole)] for hole in range(quotient.family.num_holes)
+    ]
+    for choice,hole_options in enumerate(quotient.coloring.getChoiceToAssignment()):
+        for hole,option in hole_options:
+            hole_option_to_actions[hole][option].append(choice)
+
+    quotient_to_restricted_action_map = [None] * quotient.quotient_mdp.nr_choices
+    for choice in range(mdp.nr_choices):
+        quotient_to_restricted_action_map[quotient_choice_map[choice]] = choice
+    choice_to_state = []
+    for state in range(mdp.nr_states):
+        for choice in mdp.transition_matrix.get_rows_for_group(state):
+            choice_to_state.append(state)
+
+    scores = {}
+    for hole,options in inconsistent_assignments.items():
+        difference_sum = 0
+        states_affected = 0
+        edges_0 = hole_option_to_actions[hole][options[0]]
+        for choice_index,choice_0_global in enumerate(edges_0):
+            choice_0 = quotient_to_restricted_action_map[choice_0_global]
+            if choice_0 is None:
+                continue
+            source_state_visits = expected_visits[choice_to_state[choice_0]]
+            if source_state_visits == 0:
+                continue
+            state_values = []
+            for option in options:
+                choice = quotient_to_restricted_action_map[hole_option_to_actions[hole][option][choice_index]]
+                state_values.append(choice_values[choice])
+            difference_sum += (max(state_values) - min(state_values)) * source_state_visits
+            states_affected += 1
+        scores[hole] = 0 if states_affected == 0 else difference_sum / states_affected
+    return scores
+
+
+class TestPomdpScores:
+
+    def test_native_scores_match_python_scores(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("pomdp/maze/tiny")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        quotient.set_imperfect_memory_size(2)
+        family = quotient.family
+        quotient.build(family)
+        mdp = family.mdp
+        prop = quotient.get_property()
+        result = mdp.model_check_property(prop).result
+        choice_values = quotient.choice_values(mdp.model, prop, paynt.verification.property.Property.result_values(result))
+        choices = result.scheduler.compute_action_support(mdp.model.nondeterministic_choice_indices)
+        expected_visits = quotient.compute_expected_visits(mdp.model, prop, choices)
+        # all options of all non-trivial holes are considered inconsistent
+        inconsistent_assignments = {
+            hole:family.hole_options(hole) for hole in range(family.num_holes) if family.hole_num_options(hole) > 1
+        }
+        assert len(inconsistent_assignments) > 0
+
+        # test
+        scores = quotient.estimate_scheduler_difference(
+            mdp.model, mdp.quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
+        expected = reference_scores(
+            quotient, mdp.model, mdp.quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
+
+        # assert
+        assert scores.keys() == expected.keys()
+        for hole,score in expected.items():
+            assert scores[hole] == pytest.approx(score, rel=1e-9, abs=1e-12)
@@ -0,0 +1,55 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.synthesizer_cegis
+import paynt.synthesizer.synthesizer_cegis_multicore
+
+from helpers.helper import get_sketch_paths, assignment_value
+
+import pytest
+
+class TestCEGISMultiCore:
+
+    def test_multicore_cegis_matches_cegis(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        expected = paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS(quotient)
+        expected_assignment = expected.synthesize(keep_optimum=True)
+        SynthesizerMultiCore = paynt.synthesizer.synthesizer_cegis_multicore.SynthesizerCEGISMultiCore
+        num_workers = SynthesizerMultiCore.num_workers
+        SynthesizerMultiCore.num_workers = 2
+
+        # test
+        try:
+            quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+            synthesizer = SynthesizerMultiCore(quotient)
+            assignment = synthesizer.synthesize(keep_optimum=True)
+        finally:
+            SynthesizerMultiCore.num_workers = num_workers
+
+        # assert
+        assert expected_assignment is not None and assignment is not None
+        assert expected.best_assignment_value == pytest.approx(assignment_value(quotient, expected_assignment), rel=1e-4)
+        assert synthesizer.best_assignment_value == pytest.approx(expected.best_assignment_value, rel=1e-4)
+        assert assignment_value(quotient, assignment) == pytest.approx(expected.best_assignment_value, rel=1e-4)
+
+    def test_worker_error_is_raised(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        SynthesizerMultiCore = paynt.synthesizer.synthesizer_cegis_multicore.SynthesizerCEGISMultiCore
+        num_workers = SynthesizerMultiCore.num_workers
+        SynthesizerMultiCore.num_workers = 2
+
+        def analyze_family_assignment_cegis(self, family, assignment):
+            raise RuntimeError("worker failure")
+
+        # test
+        # workers are forked, hence they inherit the failing method
+        SynthesizerMultiCore.analyze_family_assignment_cegis = analyze_family_assignment_cegis
+        try:
+            synthesizer = SynthesizerMultiCore(quotient)
+            with pytest.raises(RuntimeError, match="worker failure"):
+                synthesizer.synthesize()
+        finally:
+            del SynthesizerMultiCore.analyze_family_assignment_cegis
+            SynthesizerMultiCore.num_workers = num_workers
@@ -0,0 +1,79 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.synthesizer_ar
+import paynt.synthesizer.checkpoint
+
+from helpers.helper import get_sketch_paths, assignment_value, get_ar_optimum
+
+import glob
+import pytest
+
+class InterruptedAR(paynt.synthesizer.synthesizer_ar.SynthesizerAR):
+    ''' AR interrupted after analyzing a given number of families. '''
+
+    def __init__(self, quotient, num_families):
+        super().__init__(quotient)
+        self.num_families = num_families
+
+    def resource_limit_reached(self):
+        if self.num_families == 0:
+            return True
+        self.num_families -= 1
+        return False
+
+class TestCheckpoint:
+
+    def setup_method(self):
+        self.path = paynt.synthesizer.checkpoint.Checkpoint.path
+        self.resume = paynt.synthesizer.checkpoint.Checkpoint.resume
+
+    def teardown_method(self):
+        paynt.synthesizer.checkpoint.Checkpoint.path = self.path
+        paynt.synthesizer.checkpoint.Checkpoint.resume = self.resume
+
+    def test_interrupted_ar_is_resumed(self, tmp_path):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        expected_value = get_ar_optimum(sketch_path, props_path)
+        checkpoint_prefix = str(tmp_path / "checkpoint")
+        paynt.synthesizer.checkpoint.Checkpoint.path = checkpoint_prefix
+
+        # test: interrupt AR in the middle of the search and resume it in a fresh process state
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        interrupted = InterruptedAR(quotient, num_families=2)
+        interrupted.synthesize(keep_optimum=True)
+        checkpoint_files = glob.glob(checkpoint_prefix + ".*")
+        explored_before = interrupted.explored
+        paynt.synthesizer.checkpoint.Checkpoint.resume = True
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        resumed = paynt.synthesizer.synthesizer_ar.SynthesizerAR(quotient)
+        assignment = resumed.synthesize(keep_optimum=True)
+
+        # assert
+        assert len(checkpoint_files) == 1
+        assert explored_before < quotient.family.size
+        assert glob.glob(checkpoint_prefix + ".*") == []
+        assert resumed.explored == quotient.family.size
+        assert assignment is not None
+        assert assignment_value(quotient, assignment) == pytest.approx(expected_value, rel=1e-4)
+        assert resumed.best_assignment_value == pytest.approx(expected_value, rel=1e-4)
+
+    def test_checkpoint_of_another_specification_is_ignored(self, tmp_path):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        checkpoint_prefix = str(tmp_path / "checkpoint")
+        paynt.synthesizer.checkpoint.Checkpoint.path = checkpoint_prefix
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        InterruptedAR(quotient, num_families=2).synthesize()
+        checkpoint_files = glob.glob(checkpoint_prefix + ".*")
+
+        # test: a different optimality epsilon yields a different synthesis task
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        quotient.specification.optimality.epsilon = 0.1
+        paynt.synthesizer.checkpoint.Checkpoint.resume = True
+        other = paynt.synthesizer.checkpoint.Checkpoint(InterruptedAR(quotient, 0), quotient.family)
+
+        # assert
+        assert len(checkpoint_files) == 1
+        assert other.path not in checkpoint_files
+        assert other.load() is None
+        assert glob.glob(checkpoint_prefix + ".*") == checkpoint_files
@@ -0,0 +1,112 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.conflict_generator.dtmc
+
+from helpers.helper import get_sketch_paths
+
+import itertools
+
+def check_conflicts_on_members(sketch_path, props_path, num_members, num_generalizations):
+    '''
+    Construct conflicts for several members and check each conflict by Storm: the member as well as members agreeing
+    with it on the conflict must violate the property.
+    :return the number of checked conflicts
+    '''
+    quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+    family = quotient.family
+    quotient.build(family)
+    generator = paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc(quotient)
+    generator.initialize()
+    constraints = quotient.specification.constraints
+    stride = max(1, family.size // num_members)
+    num_checked = 0
+    for combination in itertools.islice(family.all_combinations(), 0, None, stride):
+        assignment = family.construct_assignment(combination)
+        dtmc = quotient.build_assignment(assignment)
+        conflict_requests = [
+            (index, prop, None) for index,prop in enumerate(constraints)
+            if not dtmc.model_check_property(prop).sat
+        ]
+        conflicts = generator.construct_conflicts(family, assignment, dtmc, conflict_requests)
+        for (index,prop,_),conflict in zip(conflict_requests, conflicts):
+            hole_options = [family.hole_options(hole) for hole in range(family.num_holes)]
+            for hole in conflict:
+                hole_options[hole] = assignment.hole_options(hole)
+            generalization = family.assume_options_copy(hole_options)
+            for member in itertools.islice(generalization.all_combinations(), num_generalizations):
+                member = generalization.construct_assignment(member)
+                assert not quotient.build_assignment(member).model_check_property(prop).sat
+            num_checked += 1
+    return num_checked
+
+class TestConflictGeneratorDtmc:
+
+    def test_batch_matches_sequential(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/kydie", props_name="sketch.props")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        family = quotient.family
+        quotient.build(family)
+        generator = paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc(quotient)
+        generator.initialize()
+        assignment = family.pick_any()
+        dtmc = quotient.build_assignment(assignment)
+        constraints = quotient.specification.constraints
+        conflict_requests = [(index, prop, None) for index,prop in enumerate(constraints)]
+        num_threads = paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc.num_threads
+
+        # test
+        try:
+            paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc.num_threads = 1
+            expected = generator.construct_conflicts(family, assignment, dtmc, conflict_requests)
+            paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc.num_threads = 3
+            conflicts = generator.construct_conflicts(family, assignment, dtmc, conflict_requests)
+        finally:
+            paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc.num_threads = num_threads
+
+        # assert
+        assert len(conflicts) == len(constraints)
+        assert [list(conflict) for conflict in conflicts] == [list(conflict) for conflict in expected]
+
+    def test_conflicts_are_sound(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/kydie", props_name="sketch.props")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        family = quotient.family
+        quotient.build(family)
+        generator = paynt.synthesizer.conflict_generator.dtmc.ConflictGeneratorDtmc(quotient)
+        generator.initialize()
+        assignment = family.pick_any()
+        dtmc = quotient.build_assignment(assignment)
+        constraints = quotient.specification.constraints
+        conflict_requests = [
+            (index, prop, None) for index,prop in enumerate(constraints)
+            if not dtmc.model_check_property(prop).sat
+        ]
+
+        # test
+        conflicts = generator.construct_conflicts(family, assignment, dtmc, conflict_requests)
+
+        # assert: members agreeing with the assignment on the conflict violate the property as well
+        for (index,prop,_),conflict in zip(conflict_requests, conflicts):
+            hole_options = [family.hole_options(hole) for hole in range(family.num_holes)]
+            for hole in conflict:
+                hole_options[hole] = assignment.hole_options(hole)
+            member = family.assume_options_copy([[options[-1]] for options in hole_options])
+            assert not quotient.build_assignment(member).model_check_property(prop).sat
+
+    def test_conflicts_match_storm_on_members(self):
+        # setup
+        # values of kydie members lie close to the thresholds, grid members are spread over larger families
+        sketches = [
+            get_sketch_paths("dtmc/kydie", props_name="sketch.props"),
+            get_sketch_paths("dtmc/grid/grid", props_name="easy.props"),
+        ]
+
+        # test
+        num_checked = [
+            check_conflicts_on_members(sketch_path, props_path, num_members=8, num_generalizations=8)
+            for sketch_path,props_path in sketches
+        ]
+
+        # assert
+        assert all(checked > 0 for checked in num_checked)
@@ -0,0 +1,136 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.synthesizer_distributed_ar as distributed
+
+from helpers.helper import get_sketch_paths, assignment_value, get_ar_optimum
+
+import multiprocessing
+import multiprocessing.connection
+import socket
+import threading
+import time
+import pytest
+
+def get_free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+class TestDistributedAR:
+
+    def test_distributed_ar_matches_ar(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        expected_value = get_ar_optimum(sketch_path, props_path)
+        address = distributed.SynthesizerDistributedAR.address
+        distributed.SynthesizerDistributedAR.address = ("localhost", get_free_port())
+
+        # test
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=distributed.run_worker, args=(quotient,), daemon=True) for _ in range(2)]
+        try:
+            synthesizer = distributed.SynthesizerDistributedAR(quotient)
+            # workers keep retrying to connect until the coordinator listens
+            for worker in workers:
+                worker.start()
+            assignment = synthesizer.synthesize(keep_optimum=True)
+        finally:
+            distributed.SynthesizerDistributedAR.address = address
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+
+        # assert
+        assert assignment is not None
+        assert assignment_value(quotient, assignment) == pytest.approx(expected_value, rel=1e-4)
+        assert synthesizer.best_assignment_value == pytest.approx(expected_value, rel=1e-4)
+        assert synthesizer.explored == quotient.family.size
+
+    def test_worker_error_is_raised(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        address = distributed.SynthesizerDistributedAR.address
+        distributed.SynthesizerDistributedAR.address = ("localhost", get_free_port())
+        solve_family = distributed.solve_family
+
+        def failing_solve_family(synthesizer, packed, optimum):
+            raise RuntimeError("worker failure")
+
+        # test
+        # workers are forked, hence they inherit the failing function
+        distributed.solve_family = failing_solve_family
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=distributed.run_worker, args=(quotient,), daemon=True) for _ in range(2)]
+        try:
+            synthesizer = distributed.SynthesizerDistributedAR(quotient)
+            for worker in workers:
+                worker.start()
+            with pytest.raises(RuntimeError, match="worker failure"):
+                synthesizer.synthesize()
+        finally:
+            distributed.solve_family = solve_family
+            distributed.SynthesizerDistributedAR.address = address
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+
+    def test_silent_client_does_not_stall(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        address = distributed.SynthesizerDistributedAR.address
+        handshake_timeout = distributed.SynthesizerDistributedAR.handshake_timeout
+        distributed.SynthesizerDistributedAR.address = ("localhost", get_free_port())
+        distributed.SynthesizerDistributedAR.handshake_timeout = 1
+        silent_connections = []
+
+        def connect_silently():
+            # authenticates, but never identifies itself
+            while True:
+                try:
+                    connection = multiprocessing.connection.Client(
+                        distributed.SynthesizerDistributedAR.address, authkey=distributed.DEFAULT_AUTHKEY)
+                    silent_connections.append(connection)
+                    return
+                except ConnectionRefusedError:
+                    time.sleep(0.1)
+
+        # test
+        context = multiprocessing.get_context("fork")
+        worker = context.Process(target=distributed.run_worker, args=(quotient,), daemon=True)
+        try:
+            synthesizer = distributed.SynthesizerDistributedAR(quotient)
+            threading.Thread(target=connect_silently, daemon=True).start()
+            worker.start()
+            synthesizer.synthesize()
+        finally:
+            distributed.SynthesizerDistributedAR.address = address
+            distributed.SynthesizerDistributedAR.handshake_timeout = handshake_timeout
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+            for connection in silent_connections:
+                connection.close()
+
+        # assert
+        assert synthesizer.explored == quotient.family.size
+
+    def test_authkey_outside_of_loopback(self):
+        loopback = ("localhost", 6000)
+        remote = ("192.0.2.1", 6000)
+
+        # the default key is used only on a loopback interface
+        assert distributed.check_authkey(loopback, None) == distributed.DEFAULT_AUTHKEY
+        with pytest.raises(ValueError):
+            distributed.check_authkey(remote, distributed.DEFAULT_AUTHKEY)
+        with pytest.raises(ValueError):
+            distributed.check_authkey(remote, None)
+        assert distributed.check_authkey(remote, b"secret") == b"secret"
+
+        # the coordinator generates a random key if none is given
+        generated = distributed.coordinator_authkey(remote, None)
+        assert generated not in [None, distributed.DEFAULT_AUTHKEY]
+        assert generated != distributed.coordinator_authkey(remote, None)
@@ -0,0 +1,84 @@
+from paynt.family.family import ParentInfo
+from paynt.synthesizer.frontier import Frontier, PriorityFrontier
+
+
+class FakeFamily:
+
+    def __init__(self, size):
+        self.size = size
+        self.parent_info = None
+        self.refinement_depth = 0
+        self.constraint_indices = None
+
+    def pack(self):
+        return self.size.to_bytes(8, "little")
+
+    def assume_packed_options_copy(self, packed):
+        return FakeFamily(int.from_bytes(packed, "little"))
+
+
+class TestFrontier:
+
+    def test_dfs_order(self):
+        frontier = Frontier.create("dfs")
+        a,b,c = FakeFamily(1), FakeFamily(2), FakeFamily(3)
+        frontier.push([a])
+        frontier.push([b,c], parent=a)
+        assert [frontier.pop() for _ in range(len(frontier))] == [c,b,a]
+
+    def test_largest_family_first(self):
+        frontier = Frontier.create("largest")
+        families = [FakeFamily(size) for size in [2,8,4,8]]
+        frontier.push(families)
+        # ties are broken in the DFS order
+        assert [frontier.pop() for _ in range(len(frontier))] == [families[3],families[1],families[2],families[0]]
+
+    def test_bounded_heap(self):
+        max_size = PriorityFrontier.max_size
+        PriorityFrontier.max_size = 4
+        try:
+            frontier = Frontier.create("largest")
+            sizes = [3,9,1,7,5,8,2,6,4,10]
+            frontier.push([FakeFamily(size) for size in sizes])
+            assert len(frontier.heap) <= 4 and len(frontier) == len(sizes)
+            assert sorted(family.size for family in frontier) == sorted(sizes)
+            # families are explored best-first regardless of whether they were spilled
+            popped = []
+            for _ in range(3):
+                popped.append(frontier.pop().size)
+            frontier.push([FakeFamily(size) for size in [11,0]])
+            while frontier:
+                popped.append(frontier.pop().size)
+            assert popped == [10,9,8,11,7,6,5,4,3,2,1,0]
+        finally:
+            PriorityFrontier.max_size = max_size
+
+    def test_spilled_families_keep_parent_bound(self):
+        # setup
+        max_size = PriorityFrontier.max_size
+        PriorityFrontier.max_size = 2
+        parent_info = ParentInfo()
+        parent_info.optimality_bound = 0.5
+        parent_info.mdp = "parent mdp"
+        parent_info.num_unbuilt_subfamilies = 3
+        families = [FakeFamily(size) for size in [3,2,1]]
+        for family in families:
+            family.parent_info = parent_info
+
+        # test
+        try:
+            frontier = Frontier.create("largest")
+            frontier.push(families)
+            num_spilled = frontier.num_spilled
+            popped = [frontier.pop() for _ in range(len(frontier))]
+        finally:
+            PriorityFrontier.max_size = max_size
+
+        # assert
+        # the spilled family no longer needs the parent MDP and can be pruned by the bound of its parent
+        assert num_spilled == 1
+        assert parent_info.num_unbuilt_subfamilies == 2 and parent_info.mdp is not None
+        assert [family.size for family in popped] == [3,2,1]
+        assert popped[1].parent_info is not parent_info
+        assert popped[1].parent_info.optimality_bound == 0.5 and popped[1].parent_info.mdp is None
+        assert frontier.spill_file is None
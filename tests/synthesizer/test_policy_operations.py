@@ -0,0 +1,25 @@
+from paynt.synthesizer.policy_tree import pack_policy, unpack_policy, policies_are_compatible, merge_policies, \
+    merge_policies_exclusively
+
+
+class TestPolicyOperations:
+
+    def test_pack_unpack(self):
+        policy = pack_policy([0, None, 2, None])
+        assert unpack_policy(policy) == ([0, None, 2, None], [0, 2])
+
+    def test_compatible_policies_are_merged(self):
+        policy1 = pack_policy([0, None, 2, None])
+        policy2 = pack_policy([None, 1, 2, None])
+        assert policies_are_compatible(policy1, policy2)
+        merged = merge_policies(policy1, policy2)
+        assert unpack_policy(merged) == ([0, 1, 2, None], [0, 1, 2])
+
+    def test_incompatible_policies(self):
+        policy1 = pack_policy([0, None, 2])
+        policy2 = pack_policy([1, None, None])
+        assert not policies_are_compatible(policy1, policy2)
+        assert merge_policies(policy1, policy2) is None
+        policy12,policy21 = merge_policies_exclusively(policy1, policy2)
+        assert policy12 == [0, None, 2]
+        assert policy21 == [1, None, 2]
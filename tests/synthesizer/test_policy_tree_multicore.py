@@ -0,0 +1,70 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.policy_tree
+import paynt.synthesizer.policy_tree_multicore
+
+from helpers.helper import get_sketch_paths
+
+import pytest
+
+def sat_members(evaluations):
+    ''' :return hole option combinations of the members that belong to SAT leaves '''
+    members = set()
+    for evaluation in evaluations:
+        if evaluation.sat:
+            members.update(evaluation.family.all_combinations())
+    return members
+
+class TestPolicyTreeMultiCore:
+
+    def test_multicore_policy_tree_matches_sequential(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("archive/atva24-policy-trees/obstacles-demo")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        sequential = paynt.synthesizer.policy_tree.SynthesizerPolicyTree(quotient)
+        SynthesizerMultiCore = paynt.synthesizer.policy_tree_multicore.SynthesizerPolicyTreeMultiCore
+        num_workers = SynthesizerMultiCore.num_workers
+        SynthesizerMultiCore.num_workers = 2
+
+        # test
+        try:
+            expected = sequential.evaluate(print_stats=False)
+            quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+            multicore = SynthesizerMultiCore(quotient)
+            evaluations = multicore.evaluate(print_stats=False)
+        finally:
+            SynthesizerMultiCore.num_workers = num_workers
+
+        # assert
+        # the same members are SAT and every SAT leaf is solved by its policy
+        assert sat_members(evaluations) == sat_members(expected)
+        assert len(sat_members(evaluations)) > 0
+        assert multicore.explored == quotient.family.size
+        prop = quotient.get_property()
+        for evaluation in evaluations:
+            if not evaluation.sat:
+                continue
+            policy,_ = evaluation.policy
+            _,mdp = quotient.fix_and_apply_policy_to_family(evaluation.family, policy)
+            assert mdp.model_check_property(prop, alt=True).sat
+
+    def test_worker_error_is_raised(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("archive/atva24-policy-trees/obstacles-demo")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        SynthesizerMultiCore = paynt.synthesizer.policy_tree_multicore.SynthesizerPolicyTreeMultiCore
+        num_workers = SynthesizerMultiCore.num_workers
+        SynthesizerMultiCore.num_workers = 2
+
+        def verify_family(self, family, game_solver, prop):
+            raise RuntimeError("worker failure")
+
+        # test
+        # workers are forked, hence they inherit the failing method
+        SynthesizerMultiCore.verify_family = verify_family
+        try:
+            multicore = SynthesizerMultiCore(quotient)
+            with pytest.raises(RuntimeError, match="worker failure"):
+                multicore.evaluate(print_stats=False)
+        finally:
+            del SynthesizerMultiCore.verify_family
+            SynthesizerMultiCore.num_workers = num_workers
@@ -0,0 +1,48 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.policy_tree
+
+from helpers.helper import get_sketch_paths
+
+def sat_members(evaluations):
+    ''' :return hole option combinations of the members that belong to SAT leaves '''
+    members = set()
+    for evaluation in evaluations:
+        if evaluation.sat:
+            members.update(evaluation.family.all_combinations())
+    return members
+
+def evaluate(natively):
+    sketch_path, props_path = get_sketch_paths("archive/atva24-policy-trees/obstacles-demo")
+    quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+    assert quotient.supports_property_choice_mask_checking(quotient.get_property())
+    if not natively:
+        quotient.supports_property_choice_mask_checking = lambda prop: False
+    synthesizer = paynt.synthesizer.policy_tree.SynthesizerPolicyTree(quotient)
+    evaluations = synthesizer.evaluate(print_stats=False)
+    return quotient, synthesizer, evaluations
+
+class TestPolicyTreePostprocessing:
+
+    def test_native_postprocessing_matches_storm(self):
+        # setup
+        _, expected, expected_evaluations = evaluate(natively=False)
+        expected_mdps_model_checked = paynt.synthesizer.policy_tree.PolicyTreeNode.mdps_model_checked
+
+        # test
+        quotient, synthesizer, evaluations = evaluate(natively=True)
+        mdps_model_checked = paynt.synthesizer.policy_tree.PolicyTreeNode.mdps_model_checked
+
+        # assert
+        assert sat_members(evaluations) == sat_members(expected_evaluations)
+        prop = quotient.get_property()
+        for evaluation in evaluations:
+            if not evaluation.sat:
+                continue
+            policy,_ = evaluation.policy
+            _,mdp = quotient.fix_and_apply_policy_to_family(evaluation.family, policy)
+            assert mdp.model_check_property(prop, alt=True).sat
+        assert synthesizer.stat.num_leaves_merged == expected.stat.num_leaves_merged
+        assert synthesizer.stat.num_policies_merged == expected.stat.num_policies_merged
+        # candidates are checked in batches, each of which can exceed the sequential checks by less than its size
+        assert mdps_model_checked <= expected_mdps_model_checked + \
+            synthesizer.stat.num_nodes * paynt.synthesizer.policy_tree.PolicyTreeNode.candidates_per_batch
@@ -0,0 +1,79 @@
+import paynt.parser.sketch as sketch
+import paynt.synthesizer.synthesizer_ar
+import paynt.synthesizer.synthesizer_portfolio
+
+from helpers.helper import get_sketch_paths, assignment_value, get_ar_optimum
+
+import ctypes
+import math
+import multiprocessing
+import pytest
+
+class TestPortfolio:
+
+    def test_portfolio_matches_ar(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        expected_value = get_ar_optimum(sketch_path, props_path)
+
+        # test
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        synthesizer = paynt.synthesizer.synthesizer_portfolio.SynthesizerPortfolio(quotient)
+        assignment = synthesizer.synthesize(keep_optimum=True)
+
+        # assert
+        assert synthesizer.winner in paynt.synthesizer.synthesizer_portfolio.SynthesizerPortfolio.engines
+        assert assignment is not None
+        assert assignment_value(quotient, assignment) == pytest.approx(expected_value, rel=1e-4)
+        assert synthesizer.best_assignment_value == pytest.approx(expected_value, rel=1e-4)
+
+    def test_engine_errors_are_raised(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        SynthesizerPortfolio = paynt.synthesizer.synthesizer_portfolio.SynthesizerPortfolio
+        engines = SynthesizerPortfolio.engines
+        SynthesizerPortfolio.engines = ["ar"]
+        SynthesizerAR = paynt.synthesizer.synthesizer_ar.SynthesizerAR
+        original_synthesize_one = SynthesizerAR.synthesize_one
+
+        def synthesize_one(self, family):
+            raise RuntimeError("engine failure")
+
+        # test
+        # engines are forked, hence they inherit the failing method
+        SynthesizerAR.synthesize_one = synthesize_one
+        try:
+            synthesizer = SynthesizerPortfolio(quotient)
+            with pytest.raises(RuntimeError, match="engine failure"):
+                synthesizer.synthesize()
+        finally:
+            SynthesizerAR.synthesize_one = original_synthesize_one
+            SynthesizerPortfolio.engines = engines
+
+    def test_optimum_is_shared_between_processes(self):
+        # setup
+        sketch_path, props_path = get_sketch_paths("dtmc/coin")
+        quotient = sketch.Sketch.load_sketch(sketch_path, props_path)
+        optimality = quotient.specification.optimality
+        assert optimality.minimizing
+        shared_optimum = multiprocessing.Value(ctypes.c_double, math.nan)
+        optimality.share_optimum(shared_optimum)
+        context = multiprocessing.get_context("fork")
+
+        def publish(optimum):
+            optimality.update_optimum(optimum)
+            optimality.publish_optimum()
+
+        # test
+        for optimum in [5.0, 7.0]:
+            process = context.Process(target=publish, args=(optimum,))
+            process.start()
+            process.join()
+
+        # assert: the worse optimum was not published and the better one is adopted on the next check
+        assert shared_optimum.value == 5.0
+        assert optimality.optimum is None
+        assert not optimality.improves_optimum(6.0)
+        assert optimality.optimum == 5.0
+        assert optimality.improves_optimum(4.0)
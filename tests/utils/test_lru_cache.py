@@ -0,0 +1,39 @@
+from paynt.utils.lru_cache import LruCache
+
+
+class TestLruCache:
+
+    def test_hits_and_misses(self):
+        cache = LruCache(100)
+        assert cache.get("a") is None
+        cache.put("a", 1, 10)
+        assert cache.get("a") == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_eviction_by_memory(self):
+        cache = LruCache(100)
+        cache.put("a", 1, 40)
+        cache.put("b", 2, 40)
+        cache.get("a")
+        # "b" is the least recently used item
+        cache.put("c", 3, 40)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.memory_used == 80
+        assert cache.evictions == 1
+
+    def test_eviction_by_number_of_items(self):
+        cache = LruCache(100, max_items=2)
+        cache.put("a", 1, 1)
+        cache.put("b", 2, 1)
+        cache.get("a")
+        cache.put("c", 3, 1)
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_oversized_item(self):
+        cache = LruCache(100)
+        cache.put("a", 1, 200)
+        assert len(cache) == 0
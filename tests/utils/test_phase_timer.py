@@ -0,0 +1,40 @@
+from paynt.utils.timer import PhaseTimer
+
+
+class TestPhaseTimer:
+
+    def test_nested_phases(self):
+        # setup
+        since = PhaseTimer.snapshot()
+
+        # test
+        with PhaseTimer.phase("outer"):
+            with PhaseTimer.phase("inner"):
+                pass
+            with PhaseTimer.phase("inner"):
+                pass
+
+        # assert
+        summary = PhaseTimer.summary(since=since)
+        assert summary["outer"]["calls"] == 1
+        assert summary["outer/inner"]["calls"] == 2
+        assert summary["outer"]["time"] >= summary["outer/inner"]["time"]
+
+    def test_nested_synthesis_keeps_timings(self):
+        # setup
+        outer_since = PhaseTimer.snapshot()
+        with PhaseTimer.phase("build"):
+            pass
+
+        # test: a synthesizer started later reports only its own phases
+        inner_since = PhaseTimer.snapshot()
+        with PhaseTimer.phase("build"):
+            pass
+        with PhaseTimer.phase("split"):
+            pass
+
+        # assert
+        inner = PhaseTimer.summary(since=inner_since)
+        assert inner["build"]["calls"] == 1 and inner["split"]["calls"] == 1
+        outer = PhaseTimer.summary(since=outer_since)
+        assert outer["build"]["calls"] == 2 and outer["split"]["calls"] == 1